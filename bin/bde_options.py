@@ -0,0 +1,26 @@
+#!/usr/bin/env python
+
+from pylibinit import addlibpath
+addlibpath.add_lib_path()
+
+from bdebuild.meta import main
+
+
+if __name__ == '__main__':
+    main.main()
+
+# -----------------------------------------------------------------------------
+# Copyright 2026 Bloomberg Finance L.P.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ----------------------------- END-OF-FILE -----------------------------------
@@ -5,13 +5,34 @@ from __future__ import print_function
 import argparse
 import collections
 import errno
+import hashlib
 import json
 import os
 import platform
 import shutil
 import subprocess
 import sys
+import threading
+import time
 import multiprocessing
+import multiprocessing.pool
+
+try:
+    import queue # Python 3
+except ImportError:
+    import Queue as queue # Python 2
+
+from pylibinit import addlibpath
+addlibpath.add_lib_path()
+
+from bdebuild.actions import graph as actiongraph
+from bdebuild.cmakebuild import affected
+from bdebuild.cmakebuild import buildgc
+from bdebuild.cmakebuild import cmakecache
+from bdebuild.cmakebuild import ninjalog
+from bdebuild.cmakebuild import timing
+from bdebuild.common import blderror
+from bdebuild.common import sysutil
 
 ####################################################################
 # MSVC environment setup routines
@@ -45,10 +66,11 @@ def find_vcvars(version):
     else:
         raise FileNotFoundError(batpath)
 
-def get_msvc_env(version, bitness):
+def get_msvc_env(version, bitness, bat_file=None):
     result = {}
 
-    bat_file = find_vcvars(version)
+    if not bat_file:
+        bat_file = find_vcvars(version)
     arch = 'x86' if bitness == 32 else 'x86_amd64'
     process = subprocess.Popen([bat_file, arch, "&&", "set"],
                         stdout=subprocess.PIPE,
@@ -67,6 +89,90 @@ def get_msvc_env(version, bitness):
 
     return result
 
+class MsvcEnvCache:
+    """ Snapshot of the MSVC environment stored in the build directory.
+
+    Running vswhere and vcvarsall.bat takes several seconds, so the variables
+    set by vcvarsall.bat are stored in the build directory and reused for as
+    long as the MSVC version, the bitness, the toolchain file and the
+    vcvarsall.bat script stay the same.
+    """
+    FILENAME = 'bde_msvc_env.json'
+
+    def __init__(self, build_dir):
+        self.path = os.path.join(build_dir, MsvcEnvCache.FILENAME)
+
+    @staticmethod
+    def file_mtime(path):
+        return os.path.getmtime(path) if path and os.path.isfile(path) else None
+
+    def load(self, key):
+        """ Return the cached variables for the specified key, or None if
+        there is no valid snapshot.
+        """
+        if not os.path.isfile(self.path):
+            return None
+        try:
+            with open(self.path) as f:
+                snapshot = json.load(f)
+        except ValueError:
+            return None
+
+        if snapshot.get('key') != key:
+            return None
+        vcvars = snapshot.get('vcvars')
+        if MsvcEnvCache.file_mtime(vcvars) != snapshot.get('vcvars_mtime'):
+            return None
+        return snapshot.get('variables')
+
+    def save(self, key, vcvars, variables):
+        snapshot = {'key': key,
+                    'vcvars': vcvars,
+                    'vcvars_mtime': MsvcEnvCache.file_mtime(vcvars),
+                    'variables': variables}
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(snapshot, f)
+        sysutil.replace_file(tmp_path, self.path)
+
+def get_cached_msvc_env(build_dir, version, bitness, toolchain):
+    """ Return the current environment updated with the MSVC environment,
+    using the snapshot stored in build_dir if it is still valid.
+    """
+    cache = MsvcEnvCache(build_dir)
+    # 'configure' passes the toolchain given on the command line and 'build'
+    # the one recorded in CMakeCache.txt, which may be spelled differently.
+    if toolchain:
+        toolchain = os.path.normcase(os.path.realpath(toolchain))
+    key = {'version': version,
+           'bitness': bitness,
+           'toolchain': toolchain,
+           'toolchain_mtime': MsvcEnvCache.file_mtime(toolchain)}
+
+    variables = cache.load(key)
+    if variables is None:
+        vcvars = find_vcvars(version)
+        msvc_env = get_msvc_env(version, bitness, vcvars)
+
+        # Only store the variables set by vcvarsall.bat, so that later changes
+        # to the rest of the environment are picked up.
+        variables = {k: v for k, v in msvc_env.items()
+                     if os.environ.get(k) != v}
+        cache.save(key, vcvars, variables)
+
+    if bytes is str:
+        # The json module reads back as unicode the str it wrote as UTF-8 on
+        # Python 2, which cannot be passed in the environment of a child
+        # process.
+        variables = dict(
+            (x if isinstance(x, str) else x.encode('utf-8') for x in item)
+            for item in variables.items())
+
+    env = dict(os.environ)
+    # Environment variable names are case insensitive on Windows.
+    env.update((k.upper(), v) for k, v in variables.items())
+    return env
+
 ####################################################################
 
 def enum(*sequential, **named):
@@ -159,17 +265,24 @@ class Options:
 
         self.compiler = args.compiler if args.compiler else uplid_comp
         self.test_regex = args.regex
-        self.wafstyleout = args.wafstyleout
+        self.diagnostics = args.diagnostics
+        self.wafstyleout = args.wafstyleout or args.diagnostics
+        self.unity = args.unity
+        self.unity_batch_size = args.unity_batch_size
+        self.pch = args.pch
 
         self.generator = args.generator if hasattr(args, 'generator') else None
 
         self.targets = args.targets
+        self.changed_since = args.changed_since
         self.tests = args.tests
         self.jobs = JobsOptions(args.jobs)
         self.timeout = args.timeout
         self.xml_report = args.xml_report
         self.keep_going = args.keep_going
         self.verbose = args.verbose
+        self.timing_report = args.timing_report
+        self.timing_top = args.timing_top
 
         self.install_dir = \
             replace_path_sep( \
@@ -179,6 +292,14 @@ class Options:
                              required= 'install' in args.cmd))
 
         self.component = args.component
+        self.incremental = args.incremental
+
+        self.max_size = args.max_size
+        self.dry_run = args.dry_run
+
+        self.actions_file = args.actions_file
+
+        self.runner = ProcessRunner(args.timestamps, args.log)
 
 class Platform:
     MsvcVersion = collections.namedtuple(
@@ -214,14 +335,33 @@ class Platform:
         return [options.generator] if options.generator else ['Ninja']
 
     @staticmethod
-    def generator_env(options):
+    def generator_env(options, toolchain=None):
         host_platform = platform.system()
         if 'Ninja' == Platform.generator(options)[0] and 'Windows' == host_platform:
-            return get_msvc_env(Platform.msvcVersionMap[options.compiler].version,
-                64 if options.ufid and '64' in options.ufid else 32)
+            return get_cached_msvc_env(
+                options.build_dir,
+                Platform.msvcVersionMap[options.compiler].version,
+                64 if options.ufid and '64' in options.ufid else 32,
+                toolchain)
         else:
             return os.environ
 
+    @staticmethod
+    def toolchain_file(options):
+        if options.dpkg_build:
+            return os.path.join(options.cmake_module_path,
+                                'toolchains/dpkg/production.cmake')
+
+        if options.toolchain:
+            if os.path.isfile(options.toolchain):
+                return options.toolchain
+            elif os.path.isfile(os.path.join(options.cmake_module_path, options.toolchain + '.cmake')):
+                return os.path.join(options.cmake_module_path,
+                                    options.toolchain + '.cmake')
+            else:
+                raise RuntimeError('Invalid toolchain file is specified: ' + options.toolchain )
+        return None
+
     @staticmethod
     def generator_choices():
         host_platform = platform.system()
@@ -273,25 +413,126 @@ class Platform:
         else:
             return 'all'
 
-def run_command(cmd, cwd=None):
-    p = subprocess.Popen(cmd,
-                         stdout=subprocess.PIPE,
-                         stderr=subprocess.PIPE,
-                         cwd=cwd)
-    (out, err) = p.communicate()
-    ret = p.returncode
+class ProcessRunner:
+    """ Run child processes, streaming their output line by line.
 
-    if ret:
-        print("{}".format(out), file=sys.stdout)
-        print("{}".format(err), file=sys.stderr)
+    The stdout and stderr of the child are read by two threads and passed
+    through a bounded queue to the calling thread, which writes every line
+    as soon as it arrives to the console and, if a log file is specified, to
+    the log file.  Lines written to the log file are prefixed with a
+    timestamp and the phase ('configure', 'build', 'test' or 'install') of
+    the command; console lines are prefixed the same way if 'timestamps' is
+    set.  Several commands can be run concurrently from different threads.
+    """
+    MAX_LINE = 64 * 1024
+    MAX_QUEUED_LINES = 1024
 
-    return ret
+    def __init__(self, timestamps=False, log_file=None):
+        self.timestamps = timestamps
+        self.log = open(log_file, 'ab') if log_file else None
+        self.lock = threading.Lock()
+
+    def close(self):
+        if self.log:
+            self.log.close()
+            self.log = None
+
+    @staticmethod
+    def prefix(phase):
+        now = time.time()
+        return '{}.{:03d} [{}] '.format(
+            time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(now)),
+            int(now * 1000) % 1000,
+            phase).encode('ascii')
+
+    def write(self, phase, line, stream=None):
+        """ Write a line of output of the specified phase.
+        """
+        stream = stream or sys.stdout
+        if not isinstance(line, bytes):
+            line = line.encode(getattr(stream, 'encoding', None) or 'utf-8',
+                               'replace')
+        if not line.endswith(b'\n'):
+            line += b'\n'
+        self._write(phase, line, stream, True)
+
+    def _write(self, phase, data, stream, line_start):
+        """ Write the specified bytes of output of the specified phase,
+        prefixed if they start a line.  The output of the child processes is
+        written unchanged: decoding it could fail on Python 2, and the
+        encoding of the output of a compiler is not known anyway.
+        """
+        prefix = self.prefix(phase) if line_start else b''
+        with self.lock:
+            # The binary buffer of a text stream on Python 3, and the stream
+            # itself on Python 2.
+            stream.flush()
+            out = getattr(stream, 'buffer', stream if bytes is str else None)
+            if out is None:
+                stream.write((prefix + data if self.timestamps else data).decode(
+                    getattr(stream, 'encoding', None) or 'utf-8', 'replace'))
+                stream.flush()
+            else:
+                out.write(prefix + data if self.timestamps else data)
+                out.flush()
+            if self.log:
+                self.log.write(prefix + data)
+                self.log.flush()
+
+    @staticmethod
+    def _read_pipe(pipe, stream, lines):
+        with pipe:
+            for chunk in iter(lambda: pipe.readline(ProcessRunner.MAX_LINE),
+                              b''):
+                lines.put((stream, chunk))
+        lines.put((stream, None))
+
+    def run(self, cmd, phase, cwd=None, env=None):
+        """ Run the specified command, raising CalledProcessError if it
+        fails.
+        """
+        p = subprocess.Popen(cmd,
+                             stdout=subprocess.PIPE,
+                             stderr=subprocess.PIPE,
+                             cwd=cwd,
+                             env=env)
+
+        lines = queue.Queue(ProcessRunner.MAX_QUEUED_LINES)
+        readers = [threading.Thread(target=ProcessRunner._read_pipe,
+                                    args=(pipe, stream, lines))
+                   for pipe, stream in [(p.stdout, sys.stdout),
+                                        (p.stderr, sys.stderr)]]
+        for reader in readers:
+            reader.daemon = True
+            reader.start()
+
+        # Lines longer than MAX_LINE are read in several chunks: only the
+        # chunk starting a line is prefixed, and only the end of the output
+        # gets a newline if it lacks one.
+        line_start = dict((stream, True) for stream in (sys.stdout,
+                                                        sys.stderr))
+        open_pipes = len(readers)
+        while open_pipes:
+            stream, chunk = lines.get()
+            if chunk is None:
+                open_pipes -= 1
+                if not line_start[stream]:
+                    self._write(phase, b'\n', stream, False)
+                continue
+            self._write(phase, chunk, stream, line_start[stream])
+            line_start[stream] = chunk.endswith(b'\n')
+
+        for reader in readers:
+            reader.join()
+        ret = p.wait()
+        if ret:
+            raise subprocess.CalledProcessError(ret, cmd)
 
 
 def wrapper():
     parser = argparse.ArgumentParser(prog=os.path.basename(sys.argv[0]))
     parser.add_argument('cmd', nargs='+',
-                        choices=['configure', 'build', 'install'])
+                        choices=['configure', 'build', 'install', 'gc', 'export'])
 
     parser.add_argument('--build_dir',
                         help='Path to the build directory. If not specified, the build '
@@ -311,6 +552,15 @@ def wrapper():
                              'for this build. If "--refroot" is specified, this '
                              'prefix is relative to the refroot (default="/opt/bb").')
 
+    parser.add_argument('--log',
+                        help='Append the output of all commands to the specified '
+                             'file, with each line prefixed by a timestamp and the '
+                             'command phase.')
+
+    parser.add_argument('--timestamps', action='store_true',
+                        help='Prefix each line of the console output with a '
+                             'timestamp and the command phase.')
+
     group = parser.add_argument_group('configure', 'Options for the "configure" command')
     group.add_argument('-u', '--ufid',
                        help='Unified Flag IDentifier (e.g. "opt_exc_mt"). See bde-tools documentation.')
@@ -341,6 +591,23 @@ def wrapper():
                        help='Generate build output in "waf-style" for parsing by automated '
                             'build tools.')
 
+    group.add_argument('--diagnostics', action='store_true',
+                       help='Record the compiler diagnostics into the build '
+                            'directory for querying with bde_diagnostics.py '
+                            '(implies "--wafstyleout").')
+
+    group.add_argument('--unity', action='store_true',
+                       help='Group the components of each package into batched '
+                            '("unity") translation units.')
+
+    group.add_argument('--unity-batch-size', type=int,
+                       help='Maximum number of components in a single unity '
+                            'translation unit (default: 8).')
+
+    group.add_argument('--pch', choices=['package', 'group'],
+                       help='Generate a precompiled header per package or per '
+                            'package group for the libraries and test drivers.')
+
     genChoices = Platform.generator_choices()
     if len(genChoices) > 1:
         group.add_argument('-G', choices=genChoices, dest='generator',
@@ -352,6 +619,12 @@ def wrapper():
                       help='Comma-separated list of build targets (e.g. "bsl", '
                            '"bslma", or "bslma_testallocator").')
 
+    group.add_argument('--changed-since', metavar='GIT_REV',
+                       help='Only build (and run) the test drivers affected by '
+                            'the changes since the specified git revision, '
+                            'according to the package dependencies. Overrides '
+                            '"--targets".')
+
     group.add_argument('--tests', choices=['build', 'run'],
                        help='Select whether to build or run the tests. Tests are not '
                             'built by default.')
@@ -365,29 +638,72 @@ def wrapper():
     group.add_argument('--xml-report', action='store_true',
                        help='Generate XML report when running tests.')
 
+    group.add_argument('--timing-report', action='store_true',
+                       help='Print a timing report of the build and write it to '
+                            '"build_timing.json" and "build_timing.trace.json" '
+                            '(Chrome trace format) in the build directory '
+                            '(Ninja only).')
+
+    group.add_argument('--timing-top', type=int, default=10,
+                       help='Number of the slowest compiles and links in the '
+                            'timing report (default: 10).')
+
     group = parser.add_argument_group('install', 'Options for the "install" command')
 
     group.add_argument('--install_dir',
                        help='Specify the installation directory.')
 
-    group.add_argument('--component',
-                       help='The name of the component. The build system creates following '
+    group.add_argument('--component', type=lambda x: x.split(','),
+                       help='Comma-separated list of components to install '
+                            'in parallel. The build system creates following '
                             'components for a package group or standalone package "X": '
                             '"X", "X-headers", "X-meta", "X-pkgconfig", which install '
                             'the library, headers, metadata, and pkg-config files respectively.'
                             'See bde-tools documentation for more details.')
 
+    group.add_argument('--incremental', action='store_true',
+                       help='Only copy files whose content changed since the last '
+                            'install into the install directory, hardlinking where '
+                            'possible.')
+
+    group = parser.add_argument_group('gc', 'Options for the "gc" command')
+
+    group.add_argument('--max-size', type=buildgc.parse_size,
+                       help='Size budget of the build artefacts (e.g. "20G"). '
+                            'The least recently used outputs of the build are '
+                            'removed until the remaining artefacts fit in the '
+                            'budget.')
+
+    group.add_argument('--dry-run', action='store_true',
+                       help='Only report the artefacts that would be removed.')
+
+    group = parser.add_argument_group('export',
+                                      'Options for the "export" command')
+
+    group.add_argument('--actions-file',
+                       help='Path to the exported action graph (default: '
+                            '"bde_actions.json" in the build directory).')
+
     args = parser.parse_args()
     options = Options(args)
 
-    if 'configure' in args.cmd:
-        configure(options)
+    try:
+        if 'configure' in args.cmd:
+            configure(options)
+
+        if 'build' in args.cmd:
+            build(options)
+
+        if 'install' in args.cmd:
+            install(options)
 
-    if 'build' in args.cmd:
-        build(options)
+        if 'gc' in args.cmd:
+            gc(options)
 
-    if 'install' in args.cmd:
-        install(options)
+        if 'export' in args.cmd:
+            export(options)
+    finally:
+        options.runner.close()
     return
 
 
@@ -427,23 +743,24 @@ def configure(options):
                      '-DBDE_LOG_LEVEL=' + Platform.cmake_verbosity(options.verbose),
                      '-DBUILD_BITNESS=' + ('64' if '64' in options.ufid else '32'),
                      '-DBDE_USE_WAFSTYLEOUT=' + ('ON' if options.wafstyleout else 'OFF' ),
+                     '-DBDE_WAFSTYLEOUT_DIAGNOSTICS=' + ('ON' if options.diagnostics else 'OFF'),
+                     '-DBDE_USE_UNITY_BUILD=' + ('ON' if options.unity else 'OFF'),
+                     '-DBDE_PRECOMPILED_HEADERS=' + (options.pch.upper() if options.pch else 'OFF'),
                      '-DCMAKE_INSTALL_PREFIX=' + options.prefix,
                      '-DCMAKE_INSTALL_LIBDIR=' + ('lib64' if '64' in options.ufid else 'lib'),
                      '-DBDE_TEST_REGEX=' + (options.test_regex if options.test_regex else ''),
                     ]
 
-    if options.dpkg_build:
-        configure_cmd.append('-DCMAKE_TOOLCHAIN_FILE=' +
-            os.path.join(options.cmake_module_path, 'toolchains/dpkg/production.cmake'))
-    else:
-        if options.toolchain:
-            if os.path.isfile(options.toolchain):
-                configure_cmd.append('-DCMAKE_TOOLCHAIN_FILE=' + options.toolchain)
-            elif os.path.isfile(os.path.join(options.cmake_module_path, options.toolchain + '.cmake')):
-                configure_cmd.append('-DCMAKE_TOOLCHAIN_FILE=' +
-                    os.path.join(options.cmake_module_path, options.toolchain + '.cmake'))
-            else:
-                raise RuntimeError('Invalid toolchain file is specified: ' + options.toolchain )
+    if options.unity_batch_size:
+        configure_cmd.append('-DBDE_UNITY_BUILD_BATCH_SIZE=' +
+                             str(options.unity_batch_size))
+
+    toolchain = Platform.toolchain_file(options)
+    if toolchain:
+        # cmake runs in the build directory: pass the toolchain file found
+        # from the current directory as an absolute path.
+        toolchain = os.path.abspath(toolchain)
+        configure_cmd.append('-DCMAKE_TOOLCHAIN_FILE=' + toolchain)
 
     # Use of '+' is mandatory here.
     cmakePrefixPath = os.path.join(str(options.refroot or '/') +
@@ -454,31 +771,27 @@ def configure(options):
     if options.refroot:
         configure_cmd.append('-DDISTRIBUTION_REFROOT:PATH=' + options.refroot)
 
-    print('Configuration cmd:')
-    print(' '.join(configure_cmd))
-    subprocess.check_call(configure_cmd, cwd = options.build_dir,
-        env=Platform.generator_env(options))
+    options.runner.write('configure', 'Configuration cmd:')
+    options.runner.write('configure', ' '.join(configure_cmd))
+    options.runner.run(configure_cmd, 'configure', cwd = options.build_dir,
+        env=Platform.generator_env(options, toolchain))
 
 class CacheInfo:
+    """ Build configuration recorded in the CMake cache of a build directory.
+    All entries of the cache are available through 'cache'.
+    """
     def __init__(self, build_dir):
-        self.generator = None
-        self.multiconfig = False
-        self.build_type = None
-
-        cacheFileName = os.path.join(build_dir, 'CMakeCache.txt')
-        if not os.path.isfile(cacheFileName):
+        if not os.path.isfile(cmakecache.cache_path(build_dir)):
             raise RuntimeError('The project build configuration not found in ' + build_dir)
 
-        for line in open(cacheFileName):
-            if line.startswith('CMAKE_GENERATOR:'):
-                self.generator = line.strip().split('=')[1]
-            elif line.startswith('CMAKE_CONFIGURATION_TYPES:'):
-                self.multiconfig = True
-            elif line.startswith('CMAKE_BUILD_TYPE:'):
-                self.build_type = line.strip().split('=')[1]
+        self.cache = cmakecache.load(build_dir)
+        self.generator = self.cache.get('CMAKE_GENERATOR')
+        self.multiconfig = 'CMAKE_CONFIGURATION_TYPES' in self.cache
+        self.build_type = self.cache.get('CMAKE_BUILD_TYPE')
+        self.toolchain = self.cache.get('CMAKE_TOOLCHAIN_FILE')
 
 
-def build_target(target, build_dir, extra_args, environ):
+def build_target(target, build_dir, extra_args, environ, runner):
     build_cmd = ['cmake', '--build', build_dir]
     if target:
         build_cmd += ['--target', target]
@@ -486,29 +799,12 @@ def build_target(target, build_dir, extra_args, environ):
     # filter out empty extra_args or Ninja wont like it
     build_cmd += [arg for arg in extra_args if arg]
 
-    subprocess.check_call(build_cmd, env=environ)
+    runner.run(build_cmd, 'build', env=environ)
 
-def build(options):
-    """ Build
+def build_targets(target_list, options, extra_args, environ, built_targets):
+    """ Build the specified targets, appending the names of the generator
+    targets to 'built_targets' ('all' for the default target).
     """
-    cache_info = CacheInfo(options.build_dir)
-    options.generator = cache_info.generator
-    env = Platform.generator_env(options)
-    extra_args = []
-    if cache_info.multiconfig:
-        extra_args += ['--config', cache_info.build_type]
-    extra_args += ['--', Platform.generator_jobs_arg(options.generator, options)]
-
-    if options.verbose and options.generator == 'Ninja':
-        extra_args += [ '-v' ]
-
-    if options.keep_going:
-        if options.generator == 'Ninja':
-            extra_args += [ '-k', '100' ]
-        elif options.generator == 'Unix Makefiles':
-            extra_args += [ '-k' ]
-
-    target_list = options.targets if options.targets else ['all']
     for target in target_list:
         main_target = None
         test_target = None
@@ -522,21 +818,113 @@ def build(options):
                 main_target = target
 
         if main_target:
+            built_targets.append(main_target)
             if main_target == 'all':
                 main_target = None
             try:
-                build_target(main_target, options.build_dir, extra_args, env)
+                build_target(main_target, options.build_dir, extra_args, environ,
+                             options.runner)
             except:
                 if not options.keep_going:
                     raise
 
         if test_target:
+            built_targets.append(test_target)
             try:
-                build_target(test_target, options.build_dir, extra_args, env)
+                build_target(test_target, options.build_dir, extra_args, environ,
+                             options.runner)
             except:
                 if not options.keep_going:
                     raise
 
+def write_timing_report(options, ninja_log_offset, built_targets):
+    """ Print the timing report of the build and write it in the JSON and
+    Chrome trace formats into the build directory.
+
+    The critical path is computed from the Ninja build graph of the
+    'built_targets', or approximated from the log if the graph cannot be read.
+    """
+    if options.generator != 'Ninja':
+        print('Timing report is only available for the Ninja generator.',
+              file=sys.stderr)
+        return
+
+    try:
+        report = timing.TimingReport.from_build_dir(options.build_dir,
+                                                    ninja_log_offset)
+    except blderror.MissingFileError:
+        # Nothing was ever built in the build directory.
+        print('No timing data: {} has no Ninja log.'.format(options.build_dir),
+              file=sys.stderr)
+        return
+
+    try:
+        graph = ninjalog.read_graph(options.build_dir,
+                                    [t for t in built_targets if t != 'all'])
+    except (OSError, subprocess.CalledProcessError):
+        graph = None
+
+    report.print_summary(options.timing_top, graph)
+
+    for fileName, data in [
+            ('build_timing.json', report.to_dict(options.timing_top, graph)),
+            ('build_timing.trace.json', report.to_chrome_trace())]:
+        path = os.path.join(options.build_dir, fileName)
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=1)
+        print('Timing report written to {}'.format(path))
+
+def build(options):
+    """ Build
+    """
+    cache_info = CacheInfo(options.build_dir)
+    options.generator = cache_info.generator
+    env = Platform.generator_env(options, cache_info.toolchain)
+    extra_args = []
+    if cache_info.multiconfig:
+        extra_args += ['--config', cache_info.build_type]
+    extra_args += ['--', Platform.generator_jobs_arg(options.generator, options)]
+
+    if options.verbose and options.generator == 'Ninja':
+        extra_args += [ '-v' ]
+
+    if options.keep_going:
+        if options.generator == 'Ninja':
+            extra_args += [ '-k', '100' ]
+        elif options.generator == 'Unix Makefiles':
+            extra_args += [ '-k' ]
+
+    if options.changed_since:
+        source_dir = cache_info.cache.get('CMAKE_HOME_DIRECTORY', os.getcwd())
+        changed_targets = affected.changed_since(
+            source_dir, options.changed_since,
+            lambda msg: options.runner.write('build', msg))
+        if changed_targets is None:
+            options.runner.write('build',
+                                 'Changes since {} affect the whole project.'.
+                                 format(options.changed_since))
+            options.targets = None
+        elif not changed_targets:
+            options.runner.write('build',
+                                 'No targets affected by changes since {}.'.
+                                 format(options.changed_since))
+            return
+        else:
+            options.runner.write('build',
+                                 'Targets affected by changes since {}: {}'.
+                                 format(options.changed_since,
+                                        ','.join(changed_targets)))
+            options.targets = changed_targets
+
+    target_list = options.targets if options.targets else ['all']
+    ninja_log_offset = ninjalog.log_size(options.build_dir)
+    built_targets = []
+    try:
+        build_targets(target_list, options, extra_args, env, built_targets)
+    finally:
+        if options.timing_report:
+            write_timing_report(options, ninja_log_offset, built_targets)
+
     if 'run' == options.tests:
         test_cmd = ['ctest',
                     '--output-on-failure',
@@ -560,11 +948,138 @@ def build(options):
             test_cmd += ['-L', test_pattern]
 
         try:
-            subprocess.check_call(test_cmd, cwd = options.build_dir)
+            options.runner.run(test_cmd, 'test', cwd = options.build_dir)
         except:
             if not options.keep_going:
                 raise
 
+def install_component(component, options, cache_info, destdir):
+    """ Install a single component (or everything if component is None)
+    into destdir.
+    """
+    install_cmd = ['cmake',
+                   '-DCMAKE_INSTALL_PREFIX=' + options.prefix]
+    if component:
+        install_cmd += ['-DCOMPONENT=' + component]
+
+    if cache_info.multiconfig:
+        install_cmd += ['-DCMAKE_INSTALL_CONFIG_NAME=' + cache_info.build_type]
+
+    install_cmd += ['-P', 'cmake_install.cmake']
+
+    environ = dict(os.environ)
+    environ['DESTDIR'] = destdir
+
+    options.runner.write('install', 'Install cmd:')
+    options.runner.write('install', ' '.join(install_cmd))
+
+    options.runner.run(install_cmd, 'install', cwd = options.build_dir,
+                       env = environ)
+
+def file_hash(path):
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+class InstallManifest:
+    """ Content hashes of the files installed into an install directory.
+
+    The manifest is stored in the build directory and maps the path of each
+    installed file (relative to the install directory) to the size, mtime and
+    content hash of its staged copy.
+    """
+    FILENAME = 'bde_install_manifest.json'
+
+    def __init__(self, build_dir, install_dir):
+        self.path = os.path.join(build_dir, InstallManifest.FILENAME)
+        self.install_dir = install_dir
+        self.all_entries = {}
+        if os.path.isfile(self.path):
+            try:
+                with open(self.path) as f:
+                    self.all_entries = json.load(f)
+            except ValueError:
+                # A corrupt manifest only costs a full re-install.
+                self.all_entries = {}
+        self.entries = self.all_entries.setdefault(install_dir, {})
+
+    def save(self):
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.all_entries, f)
+        sysutil.replace_file(tmp_path, self.path)
+
+def installed_files(build_dir, component):
+    """ Return the paths, relative to the DESTDIR of the install, of the files
+    installed by the last install of the specified component (or of
+    everything if component is None), as listed in the install manifest
+    written by cmake.
+    """
+    name = ('install_manifest_{}.txt'.format(component) if component
+            else 'install_manifest.txt')
+    rel_paths = []
+    with open(os.path.join(build_dir, name)) as f:
+        for line in f:
+            # The paths do not include the DESTDIR (nor the drive on
+            # Windows, which cmake drops when installing into a DESTDIR).
+            path = os.path.splitdrive(os.path.normpath(line.strip()))[1]
+            path = path.lstrip(os.sep)
+            if path:
+                rel_paths.append(path)
+    return rel_paths
+
+def sync_staged_files(stage_dir, install_dir, manifest, rel_paths):
+    """ Copy the specified files of stage_dir (relative paths) that changed
+    since the last install into install_dir, hardlinking where possible.
+    Return the number of files and bytes that were copied and skipped.
+    """
+    stats = collections.Counter()
+    for rel in rel_paths:
+        src = os.path.join(stage_dir, rel)
+        dst = os.path.join(install_dir, rel)
+        mkdir_if_not_present(os.path.dirname(dst))
+
+        if os.path.islink(src):
+            link = os.readlink(src)
+            if os.path.islink(dst) and os.readlink(dst) == link:
+                stats['skipped_files'] += 1
+                continue
+            if os.path.lexists(dst):
+                os.remove(dst)
+            os.symlink(link, dst)
+            stats['copied_files'] += 1
+            continue
+
+        st = os.stat(src)
+        entry = manifest.entries.get(rel)
+        if entry and entry['size'] == st.st_size and \
+                entry['mtime'] == st.st_mtime:
+            digest = entry['hash']
+        else:
+            digest = file_hash(src)
+
+        if entry and entry['hash'] == digest and \
+                os.path.isfile(dst) and \
+                os.path.getsize(dst) == st.st_size:
+            stats['skipped_files'] += 1
+            stats['skipped_bytes'] += st.st_size
+        else:
+            if os.path.lexists(dst):
+                os.remove(dst)
+            try:
+                os.link(src, dst)
+            except OSError:
+                shutil.copy2(src, dst)
+            stats['copied_files'] += 1
+            stats['copied_bytes'] += st.st_size
+
+        manifest.entries[rel] = {'size': st.st_size,
+                                 'mtime': st.st_mtime,
+                                 'hash': digest}
+    return stats
+
 def install(options):
     """ Install
     """
@@ -574,24 +1089,130 @@ def install(options):
     if not options.prefix:
         options.prefix="/"
 
-    install_cmd = ['cmake',
-                   '-DCMAKE_INSTALL_PREFIX=' + options.prefix]
-    if options.component:
-        install_cmd += ['-DCOMPONENT=' + options.component]
-
     cache_info = CacheInfo(options.build_dir)
-    if cache_info.multiconfig:
-        install_cmd += ['-DCMAKE_INSTALL_CONFIG_NAME=' + cache_info.build_type]
-
-    install_cmd += ['-P', 'cmake_install.cmake']
-
-    environ = os.environ
-    environ['DESTDIR'] = os.path.abspath(options.install_dir)
+    install_dir = os.path.abspath(options.install_dir)
+    components = options.component if options.component else [None]
+
+    # With incremental install, cmake installs into a persistent staging
+    # directory (where it skips up-to-date files) and only the files of the
+    # installed components whose content changed are propagated into the
+    # install directory.
+    if options.incremental:
+        destdir = os.path.join(os.path.abspath(options.build_dir),
+                               '_install_stage')
+    else:
+        destdir = install_dir
 
-    print('Install cmd:')
-    print(' '.join(install_cmd))
+    if len(components) > 1:
+        pool = multiprocessing.pool.ThreadPool(
+            options.jobs.count or multiprocessing.cpu_count())
+        try:
+            pool.map(lambda c: install_component(c, options, cache_info, destdir),
+                     components)
+        finally:
+            pool.close()
+    else:
+        install_component(components[0], options, cache_info, destdir)
+
+    if options.incremental:
+        # The staging directory is shared by all components and install
+        # directories: only sync the files installed by this invocation.
+        rel_paths = set()
+        for component in components:
+            rel_paths.update(installed_files(options.build_dir, component))
+        manifest = InstallManifest(options.build_dir, install_dir)
+        stats = sync_staged_files(destdir, install_dir, manifest,
+                                  sorted(rel_paths))
+        manifest.save()
+        options.runner.write(
+            'install',
+            'Installed {} files ({} bytes), skipped {} unchanged files '
+            '({} bytes).'.format(stats['copied_files'],
+                                 stats['copied_bytes'],
+                                 stats['skipped_files'],
+                                 stats['skipped_bytes']))
+
+def gc(options):
+    """ Remove the artefacts of the build directory that are not outputs of
+    the current build graph and, with a size budget, the least recently used
+    outputs that do not fit in the budget.
+    """
+    cache_info = CacheInfo(options.build_dir)
 
-    subprocess.check_call(install_cmd, cwd = options.build_dir, env = environ)
+    outputs = None
+    if cache_info.generator == 'Ninja':
+        try:
+            outputs = buildgc.current_outputs(options.build_dir)
+        except (OSError, subprocess.CalledProcessError) as e:
+            raise RuntimeError('Cannot read the build graph: {}'.format(e))
+    else:
+        options.runner.write('gc', 'Orphaned build outputs can only be found '
+                                   'with the Ninja generator, only removing '
+                                   'old test results.')
+
+    plan = buildgc.plan(options.build_dir, outputs, options.max_size)
+
+    if options.verbose:
+        for artefact in plan.orphans:
+            options.runner.write('gc', 'orphaned: {} ({})'.format(
+                artefact.path, sysutil.format_size(artefact.size)))
+        for artefact in plan.evicted:
+            options.runner.write('gc', 'evicted:  {} ({})'.format(
+                artefact.path, sysutil.format_size(artefact.size)))
+
+    options.runner.write(
+        'gc',
+        '{} orphaned artefacts ({}), {} evicted to fit in the budget ({}), '
+        '{} kept.'.format(
+            len(plan.orphans),
+            sysutil.format_size(sum(a.size for a in plan.orphans)),
+            len(plan.evicted),
+            sysutil.format_size(sum(a.size for a in plan.evicted)),
+            sysutil.format_size(plan.kept_size)))
+
+    if options.dry_run or not plan.artefacts:
+        return
+
+    freed, errors = buildgc.remove_artefacts(plan, options.jobs.count)
+    for path, error in errors:
+        options.runner.write('gc', 'Cannot remove {}: {}'.format(path, error),
+                             sys.stderr)
+    options.runner.write('gc', 'Freed {}.'.format(sysutil.format_size(freed)))
+
+    # Drop the entries of the removed outputs from the Ninja log.
+    if outputs is not None:
+        try:
+            options.runner.run(['ninja', '-C', options.build_dir,
+                                '-t', 'recompact'], 'gc')
+        except subprocess.CalledProcessError:
+            pass
+
+def export(options):
+    """ Export the compile and link actions of the build into a
+    self-contained action graph, which can be run with bde_actions.py.
+    """
+    cache_info = CacheInfo(options.build_dir)
+    ninja = cache_info.generator == 'Ninja'
+    if not ninja:
+        options.runner.write('export', 'Link actions and the header inputs '
+                                       'of compiles can only be exported with '
+                                       'the Ninja generator.', sys.stderr)
+
+    action_graph = actiongraph.export_actions(options.build_dir, ninja)
+    path = options.actions_file or os.path.join(options.build_dir,
+                                                'bde_actions.json')
+    action_graph.save(path)
+
+    incomplete = sum(1 for a in action_graph.actions.values()
+                     if not a.complete)
+    options.runner.write('export', 'Exported {} actions to {}.'.format(
+        len(action_graph.actions), path))
+    if incomplete:
+        options.runner.write('export',
+                             '{} compiles have unknown header inputs and '
+                             'will not be cached. Build them with Ninja '
+                             'before exporting to record their '
+                             'headers.'.format(incomplete))
 
 if __name__ == '__main__':
     try:
@@ -0,0 +1,195 @@
+## bde_precompiled_headers.cmake
+## -----------------------------
+#
+#  This CMake module generates precompiled headers for packages or package
+#  groups and attaches them to the library and test driver targets.
+#
+## OVERVIEW
+## --------
+# o bde_precompiled_headers_setup_uors: attach precompiled headers to the UORs.
+#
+## ========================================================================= ##
+
+include(bde_include_guard)
+bde_include_guard()
+
+include(bde_interface_target)
+include(bde_log)
+include(bde_struct)
+include(bde_utils)
+
+set(BDE_PRECOMPILED_HEADERS "OFF" CACHE STRING
+    "Generate precompiled headers per package (PACKAGE) or per package group (GROUP)")
+set_property(CACHE BDE_PRECOMPILED_HEADERS PROPERTY STRINGS OFF PACKAGE GROUP)
+
+# :: internal_pch_create_target ::
+# -----------------------------------------------------------------------------
+# Create an object library named 'pchTarget' that builds the precompiled
+# header from the specified 'headers' using the build requirements of all
+# packages in the specified 'uor'.  This gives the precompiled header access to
+# every include directory that its headers might need.
+function(internal_pch_create_target pchTarget uor headers)
+    bde_assert_no_extra_args()
+
+    # The object library needs a source to determine the language of the
+    # precompiled header.
+    set(stubSource "${CMAKE_BINARY_DIR}/${pchTarget}.cpp")
+    file(GENERATE OUTPUT ${stubSource} CONTENT "// Generated by BDE build system\n")
+    add_library(${pchTarget} OBJECT EXCLUDE_FROM_ALL ${stubSource})
+
+    bde_struct_get_field(packages ${uor} PACKAGES)
+    foreach(package IN LISTS packages)
+        bde_struct_get_field(packageInterface ${package} INTERFACE_TARGET)
+        bde_interface_target_name(privateRequirements ${packageInterface} PRIVATE)
+        target_link_libraries(${pchTarget} PRIVATE ${privateRequirements})
+    endforeach()
+
+    target_precompile_headers(${pchTarget} PRIVATE ${headers})
+endfunction()
+
+# :: internal_pch_reuse ::
+# -----------------------------------------------------------------------------
+# Make each of the specified targets reuse the precompiled header built by
+# 'pchTarget'.
+function(internal_pch_reuse pchTarget)
+    foreach(target IN LISTS ARGN)
+        if(TARGET ${target})
+            target_precompile_headers(${target} REUSE_FROM ${pchTarget})
+        endif()
+    endforeach()
+endfunction()
+
+function(internal_pch_package_obj_targets retTargets packages)
+    bde_assert_no_extra_args()
+
+    set(targets)
+    foreach(package IN LISTS packages)
+        bde_struct_get_field(packageName ${package} NAME)
+        if(TARGET ${packageName}-obj)
+            list(APPEND targets ${packageName}-obj)
+        endif()
+    endforeach()
+    bde_return(${targets})
+endfunction()
+
+function(internal_pch_setup_packages uor)
+    bde_assert_no_extra_args()
+
+    bde_struct_get_field(uorName ${uor} NAME)
+    bde_struct_get_field(uorTarget ${uor} TARGET)
+    bde_struct_get_field(packages ${uor} PACKAGES)
+
+    set(allHeaders)
+    set(pchTargets)
+    foreach(package IN LISTS packages)
+        bde_struct_get_field(headers ${package} HEADERS)
+        if(NOT headers)
+            continue()
+        endif()
+
+        bde_struct_get_field(packageName ${package} NAME)
+        bde_struct_get_field(tests ${package} TEST_TARGETS)
+        bde_log(VERBOSE "[${packageName}] Precompiling package headers")
+
+        internal_pch_create_target(${packageName}-pch ${uor} "${headers}")
+        internal_pch_reuse(${packageName}-pch ${packageName}-obj ${tests})
+        list(APPEND allHeaders ${headers})
+        list(APPEND pchTargets ${packageName}-pch)
+    endforeach()
+
+    internal_pch_package_obj_targets(objTargets "${packages}")
+    if(objTargets OR NOT pchTargets)
+        return()
+    endif()
+
+    # Without package libraries the sources of all packages are compiled by
+    # the UOR target, which can only reuse a single precompiled header: the
+    # one of its package, or one with the headers of all its packages.
+    list(LENGTH pchTargets numPchTargets)
+    if(numPchTargets EQUAL 1)
+        internal_pch_reuse(${pchTargets} ${uorTarget})
+    else()
+        bde_log(VERBOSE "[${uorName}] Precompiling package group headers")
+        internal_pch_create_target(${uorName}-pch ${uor} "${allHeaders}")
+        internal_pch_reuse(${uorName}-pch ${uorTarget})
+    endif()
+endfunction()
+
+function(internal_pch_setup_group uor)
+    bde_assert_no_extra_args()
+
+    bde_struct_get_field(uorName ${uor} NAME)
+    bde_struct_get_field(uorTarget ${uor} TARGET)
+    bde_struct_get_field(packages ${uor} PACKAGES)
+
+    set(headers)
+    set(tests)
+    foreach(package IN LISTS packages)
+        bde_struct_get_field(packageHeaders ${package} HEADERS)
+        bde_struct_get_field(packageTests ${package} TEST_TARGETS)
+        list(APPEND headers ${packageHeaders})
+        list(APPEND tests ${packageTests})
+    endforeach()
+
+    if(NOT headers)
+        return()
+    endif()
+
+    bde_log(VERBOSE "[${uorName}] Precompiling package group headers")
+
+    internal_pch_create_target(${uorName}-pch ${uor} "${headers}")
+
+    internal_pch_package_obj_targets(objTargets "${packages}")
+    if(NOT objTargets)
+        # Without package libraries the sources are compiled by the UOR target.
+        set(objTargets ${uorTarget})
+    endif()
+    internal_pch_reuse(${uorName}-pch ${objTargets} ${tests})
+endfunction()
+
+# :: bde_precompiled_headers_setup_uors ::
+# -----------------------------------------------------------------------------
+# Attach precompiled headers to the package libraries and the test drivers of
+# the specified 'uors' according to 'BDE_PRECOMPILED_HEADERS':
+#
+#   o PACKAGE: each package gets a precompiled header with all its component
+#              headers.  It is shared by the package library and the package
+#              test drivers.  Without package libraries, the UOR library gets
+#              a precompiled header with all component headers of its
+#              packages.
+#   o GROUP:   each UOR gets a single precompiled header with all component
+#              headers of its packages.  It is shared by all libraries and test
+#              drivers of the UOR.
+function(bde_precompiled_headers_setup_uors uors)
+    bde_assert_no_extra_args()
+
+    if(NOT BDE_PRECOMPILED_HEADERS OR BDE_PRECOMPILED_HEADERS STREQUAL "OFF")
+        return()
+    endif()
+
+    if(CMAKE_VERSION VERSION_LESS 3.16)
+        bde_log(
+            NORMAL
+            "Precompiled headers require CMake 3.16 or later. Ignoring."
+        )
+        return()
+    endif()
+
+    if(NOT BDE_PRECOMPILED_HEADERS MATCHES "^(PACKAGE|GROUP)$")
+        message(
+            FATAL_ERROR
+            "Invalid BDE_PRECOMPILED_HEADERS value: ${BDE_PRECOMPILED_HEADERS}. \
+            Valid values are OFF, PACKAGE and GROUP."
+        )
+    endif()
+
+    bde_log(NORMAL "Precompiled headers enabled (${BDE_PRECOMPILED_HEADERS}).")
+
+    foreach(uor IN LISTS uors)
+        if(BDE_PRECOMPILED_HEADERS STREQUAL "PACKAGE")
+            internal_pch_setup_packages(${uor})
+        else()
+            internal_pch_setup_group(${uor})
+        endif()
+    endforeach()
+endfunction()
@@ -0,0 +1,127 @@
+## bde_unity_build.cmake
+## ---------------------
+#
+#  This CMake module groups the components of each package into batched
+#  ("unity" or "jumbo") translation units to avoid re-parsing the same headers
+#  for every component.
+#
+## OVERVIEW
+## --------
+# o bde_unity_build_exclude:     never batch the specified components.
+# o bde_unity_build_setup_uors:  enable unity builds for the specified UORs.
+#
+## ========================================================================= ##
+
+include(bde_include_guard)
+bde_include_guard()
+
+include(bde_log)
+include(bde_struct)
+include(bde_utils)
+
+option(BDE_USE_UNITY_BUILD "Group package components into unity translation units" OFF)
+set(BDE_UNITY_BUILD_BATCH_SIZE 8 CACHE STRING
+    "Maximum number of components in a single unity translation unit")
+set(BDE_UNITY_BUILD_EXCLUDE "" CACHE STRING
+    "List of regular expressions matching components that must be compiled on their own")
+
+# :: bde_unity_build_exclude ::
+# -----------------------------------------------------------------------------
+# Mark the specified components as known to conflict with other components of
+# the same package (e.g. because of file-scope macros or colliding names in
+# unnamed namespaces).  The sources of these components are always compiled
+# as separate translation units.  This function is meant to be called from
+# the local customization file of a package or a package group.
+function(bde_unity_build_exclude)
+    set_property(GLOBAL APPEND PROPERTY BDE_UNITY_BUILD_EXCLUDED_COMPONENTS ${ARGN})
+endfunction()
+
+function(internal_unity_build_is_excluded retExcluded componentName)
+    bde_assert_no_extra_args()
+
+    get_property(excluded GLOBAL PROPERTY BDE_UNITY_BUILD_EXCLUDED_COMPONENTS)
+    if("${componentName}" IN_LIST excluded)
+        bde_return(TRUE)
+    endif()
+
+    foreach(re IN LISTS BDE_UNITY_BUILD_EXCLUDE)
+        if("${componentName}" MATCHES "${re}")
+            bde_return(TRUE)
+        endif()
+    endforeach()
+
+    bde_return(FALSE)
+endfunction()
+
+# :: bde_unity_build_setup_target ::
+# -----------------------------------------------------------------------------
+# Enable unity build for the specified 'target'.  The sources of the excluded
+# components are skipped from the batching and compiled individually.
+function(bde_unity_build_setup_target target)
+    bde_assert_no_extra_args()
+
+    get_target_property(type ${target} TYPE)
+    if(type STREQUAL "INTERFACE_LIBRARY")
+        return()
+    endif()
+
+    get_target_property(sources ${target} SOURCES)
+    foreach(source IN LISTS sources)
+        if(source MATCHES "^\\$<" OR NOT source MATCHES "\\.(c|cpp)$")
+            # Skip object files generator expressions and headers.
+            continue()
+        endif()
+
+        get_filename_component(componentName ${source} NAME_WE)
+        internal_unity_build_is_excluded(excluded ${componentName})
+        if(excluded)
+            bde_log(VERBOSE "[${target}] Excluding ${componentName} from unity build")
+            set_source_files_properties(
+                ${source} PROPERTIES SKIP_UNITY_BUILD_INCLUSION ON
+            )
+        endif()
+    endforeach()
+
+    set_target_properties(
+        ${target}
+        PROPERTIES
+            UNITY_BUILD ON
+            UNITY_BUILD_BATCH_SIZE ${BDE_UNITY_BUILD_BATCH_SIZE}
+    )
+endfunction()
+
+# :: bde_unity_build_setup_uors ::
+# -----------------------------------------------------------------------------
+# Enable unity build for all package object libraries and the library targets
+# of the specified 'uors'.  This function does nothing unless
+# 'BDE_USE_UNITY_BUILD' is set.  Test drivers are not affected.
+function(bde_unity_build_setup_uors uors)
+    bde_assert_no_extra_args()
+
+    if(NOT BDE_USE_UNITY_BUILD)
+        return()
+    endif()
+
+    if(CMAKE_VERSION VERSION_LESS 3.16)
+        bde_log(
+            NORMAL
+            "Unity build requires CMake 3.16 or later. Building components individually."
+        )
+        return()
+    endif()
+
+    bde_log(NORMAL "Unity build enabled (batch size: ${BDE_UNITY_BUILD_BATCH_SIZE}).")
+
+    foreach(uor IN LISTS uors)
+        bde_struct_get_field(packages ${uor} PACKAGES)
+        foreach(package IN LISTS packages)
+            bde_struct_get_field(packageName ${package} NAME)
+            if(TARGET ${packageName}-obj)
+                bde_unity_build_setup_target(${packageName}-obj)
+            endif()
+        endforeach()
+
+        bde_struct_get_field(uorTarget ${uor} TARGET)
+        bde_unity_build_setup_target(${uorTarget})
+    endforeach()
+endfunction()
@@ -5,8 +5,10 @@ include(GNUInstallDirs)
 
 include(bde_external_dependencies)
 include(bde_log)
+include(bde_precompiled_headers)
 include(bde_virtual_function)
 include(bde_ufid)
+include(bde_unity_build)
 include(bde_utils)
 
 include(layers/base) # Include the base layer for the whole workspace
@@ -50,6 +52,8 @@ macro(bde_process_workspace)
     endforeach()
 
     bde_resolve_uor_dependencies("${allUORs}")
+    bde_unity_build_setup_uors("${allUORs}")
+    bde_precompiled_headers_setup_uors("${allUORs}")
     bde_create_test_metatarget(metaT "${allTestTargets}" all)
     bde_workspace_summary()
 endmacro()
@@ -95,5 +99,7 @@ function(bde_workspace_summary)
     bde_log(NORMAL " Canonical UFID...: ${bde_canonical_ufid}")
     bde_log(NORMAL " Install UFID.....: ${bde_install_ufid}")
     bde_log(NORMAL " Install lib path.: ${CMAKE_INSTALL_LIBDIR}")
+    bde_log(NORMAL " Unity build......: ${BDE_USE_UNITY_BUILD}")
+    bde_log(NORMAL " Precompiled hdrs.: ${BDE_PRECOMPILED_HEADERS}")
     bde_log(NORMAL "=========================================")
 endfunction()
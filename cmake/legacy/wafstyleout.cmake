@@ -7,14 +7,31 @@ find_package(PythonInterp REQUIRED)
 
 function(internal_setup_wafstyleout)
     set(absolutePyFilename ${CMAKE_CURRENT_LIST_DIR}/wafstyleout.py)
-    set_property(GLOBAL PROPERTY RULE_LAUNCH_COMPILE "${PYTHON_EXECUTABLE} ${absolutePyFilename}")
-    set_property(GLOBAL PROPERTY RULE_LAUNCH_LINK "${PYTHON_EXECUTABLE} ${absolutePyFilename}")
+    if(CMAKE_HOST_UNIX)
+        # Only start the interpreter for the commands that print something.
+        set(launcher ${CMAKE_CURRENT_LIST_DIR}/wafstyleout.sh ${PYTHON_EXECUTABLE})
+    else()
+        # The /showIncludes output has to be filtered for every compile.
+        set(launcher ${PYTHON_EXECUTABLE} ${absolutePyFilename})
+    endif()
+
+    set(buildLauncher ${launcher})
+    if(BDE_WAFSTYLEOUT_DIAGNOSTICS)
+        list(APPEND buildLauncher
+             "--diagnostics=${CMAKE_BINARY_DIR}/bde_diagnostics.jsonl")
+    endif()
+    string(REPLACE ";" " " launcherString "${buildLauncher}")
+
+    set_property(GLOBAL PROPERTY RULE_LAUNCH_COMPILE "${launcherString}")
+    set_property(GLOBAL PROPERTY RULE_LAUNCH_LINK "${launcherString}")
         # The compiler/linker launchers need a string
-	set_property(GLOBAL PROPERTY BDE_RULE_LAUNCH_TEST ${PYTHON_EXECUTABLE} ${absolutePyFilename})
+	set_property(GLOBAL PROPERTY BDE_RULE_LAUNCH_TEST ${launcher})
         # The test launcher needs a list
 endfunction()
 
 option(BDE_USE_WAFSTYLEOUT "Use waf-style output wrapper" OFF)
+option(BDE_WAFSTYLEOUT_DIAGNOSTICS
+       "Record the diagnostics of the compiles and links in the build directory" OFF)
 if (BDE_USE_WAFSTYLEOUT)
     internal_setup_wafstyleout() # Call immediately for correctness of ${CMAKE_CURRENT_LIST_DIR}
 endif()
@@ -1,10 +1,32 @@
 #!/usr/bin/env python
 
+# Usage:
+#   wafstyleout.py <command> [<args>...]
+#       Run the command and report its output in "waf-style".
+#   wafstyleout.py --report <exit status> <command> [<args>...] < output
+#       Report the output of a command that was already run (e.g. by the
+#       wafstyleout.sh fast path, which only starts Python when a command
+#       prints something).
+#
+#   Both forms accept a leading '--diagnostics=<file>' option, with which the
+#   reported diagnostics are also appended as structured records to the
+#   specified diagnostics store (see bdebuild.diagnostics).
+#
+# Only the modules needed on every invocation are imported at startup, as
+# this script runs around every compile and link.
+
+import os
 import subprocess
 import sys
-import os
-import argparse
-import platform
+import threading
+
+INCLUDE_NOTE = b'Note: including file:'
+
+# Maximum size of the diagnostics kept from each output stream of a command.
+# The remainder is dropped, so that the memory used by the wrapper does not
+# depend on how much the command prints.
+MAX_MSG_SIZE = int(os.environ.get('BDE_WAFSTYLEOUT_MAX_MSG_SIZE', 1 << 20))
+MAX_LINE_SIZE = 64 * 1024
 
 def unicodeWrite(out, str):
     try:
@@ -16,74 +38,166 @@ def unicodeWrite(out, str):
         else:
             out.write(bytes.decode(out.encoding or 'ascii', 'replace'))
 
-try:
-    p = subprocess.Popen(sys.argv[1:], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-    (out, err) = p.communicate()
-except Exception as e:
-    print('Execution failure: %s' % str(e))
-    sys.exit(-1)
+def command_paths(cmd):
+    """Return the input and the output of a compile or link command."""
+    import argparse
 
-includes = ''
-msg = ''
-if out:
-    out = out.decode(sys.stdout.encoding or 'ascii', 'replace')
-    includes = '\n'.join([l for l in out.split(os.linesep) if l.startswith('Note: including file:')])+'\n'
-    out = '\n'.join([l for l in out.split(os.linesep) if not l.startswith('Note: including file:')])
-    msg = msg + out
-
-unicodeWrite(sys.stdout, includes) # Ninja relies on result of /showIncludes when compiling with cl
-
-if err:
-    err = err.decode(sys.stderr.encoding or 'ascii', 'replace')
-    msg = msg + err
-
-if msg:
     parser = argparse.ArgumentParser()
     parser.add_argument('-o')
     parser.add_argument('-c')
-    (args, unparsed) = parser.parse_known_args(sys.argv[2:])
+    (args, unparsed) = parser.parse_known_args(cmd[1:])
 
-    src_str = None
-    for opt in [args.c, args.o]:
-        if opt:
-            src_str = opt
-            break
+    output = args.o
+    for arg in unparsed:
+        for outArg in ['/out:', '/Fo']:
+            if not output and arg.startswith(outArg):
+                output = arg[len(outArg):]
+    return args.c, output
 
-    if not src_str:
-        linkOutArg = '/out:'
-        for arg in unparsed:
-            if arg.startswith(linkOutArg):
-                src_str = arg[len(linkOutArg):]
-                break
+def source_name(cmd):
+    (source, output) = command_paths(cmd)
 
+    src_str = source or output
     if not src_str:
-        src_str = sys.argv[-1]
+        src_str = cmd[-1]
 
     try:
         src_str = os.path.basename(src_str)
     except:
         pass
+    return src_str
+
+def record_diagnostics(store_path, cmd, marker_str, msg):
+    """Append the diagnostics in 'msg' to the diagnostics store."""
+    try:
+        libPath = os.path.join(os.path.dirname(os.path.realpath(__file__)),
+                               os.pardir, os.pardir, 'lib', 'python')
+        sys.path.insert(0, os.path.normpath(libPath))
+        from bdebuild.diagnostics import store
+
+        (source, output) = command_paths(cmd)
+        records = store.parse(msg, os.getcwd())
+        if not records:
+            records = [store.unparsed_record(msg, marker_str.lower())]
+        store.DiagnosticsStore(store_path).append(
+            records,
+            os.path.abspath(source) if source else None,
+            os.path.abspath(output) if output else None)
+    except Exception as e:
+        unicodeWrite(sys.stderr, u'Failed to record diagnostics: {}\n'.format(e))
+
+class BoundedBuffer(object):
+    """Accumulate lines of output up to 'MAX_MSG_SIZE' bytes."""
+
+    def __init__(self):
+        self.lines = []
+        self.size = 0
+        self.dropped = 0
+
+    def append(self, line):
+        if self.size + len(line) > MAX_MSG_SIZE:
+            self.dropped += len(line)
+        else:
+            self.lines.append(line)
+            self.size += len(line)
+
+    def text(self, encoding):
+        text = b''.join(self.lines).decode(encoding, 'replace')
+        text = text.replace('\r\n', '\n')
+        if self.dropped:
+            text += '... {} bytes of output omitted ...\n'.format(self.dropped)
+        return text
+
+def read_lines(stream):
+    """Return an iterator over the lines of a binary stream as they arrive.
+    Lines longer than 'MAX_LINE_SIZE' are split.
+    """
+    return iter(lambda: stream.readline(MAX_LINE_SIZE), b'')
+
+def report(cmd, returncode, msg, diagnostics=None):
+    src_str = source_name(cmd)
 
     # The Visual Studio compiler always prints name of the input source
     # file when compiling and "Creating library <file>.lib and object
     # <file>.exp" when linking an executable. We try to ignore those
     # outputs using a heuristic.
-    if p.returncode == 0 and (
+    if returncode == 0 and (
             msg.strip() == src_str or
             msg.strip().startswith('Creating library ')):
-        sys.exit(p.returncode)
+        return
 
-    if p.returncode == 0:
+    if returncode == 0:
         marker_str = 'WARNING'
     else:
-        if 'bde_runtest' in sys.argv[2]:
+        if len(cmd) > 1 and 'bde_runtest' in cmd[1]:
             marker_str = 'TEST'
         else:
             marker_str = 'ERROR'
 
     # This logic handles unicode in the output.
-    status_str = u'{}[{} ({})] <<<<<<<<<<\n{}>>>>>>>>>>\n'.format('\n' if platform.system() == 'Windows' else '', src_str, marker_str, msg)
+    status_str = u'{}[{} ({})] <<<<<<<<<<\n{}>>>>>>>>>>\n'.format('\n' if os.name == 'nt' else '', src_str, marker_str, msg)
 
     unicodeWrite(sys.stderr, status_str)
 
-sys.exit(p.returncode)
+    if diagnostics:
+        record_diagnostics(diagnostics, cmd, marker_str, msg)
+
+def run(cmd, diagnostics=None):
+    try:
+        p = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    except Exception as e:
+        print('Execution failure: %s' % str(e))
+        sys.exit(-1)
+
+    # stderr is drained by a thread while stdout is filtered by this one, so
+    # that the command never blocks on a full pipe.
+    err = BoundedBuffer()
+    def read_err():
+        for line in read_lines(p.stderr):
+            err.append(line)
+    err_reader = threading.Thread(target=read_err)
+    err_reader.daemon = True
+    err_reader.start()
+
+    # Ninja relies on result of /showIncludes when compiling with cl, so the
+    # include notes are forwarded straight away.
+    stdout = sys.stdout.buffer if hasattr(sys.stdout, 'buffer') else sys.stdout
+    out = BoundedBuffer()
+    for line in read_lines(p.stdout):
+        if line.startswith(INCLUDE_NOTE):
+            stdout.write(line if line.endswith(b'\n') else line + b'\n')
+        else:
+            out.append(line)
+    stdout.flush()
+
+    err_reader.join()
+    p.wait()
+
+    msg = (out.text(sys.stdout.encoding or 'ascii') +
+           err.text(sys.stderr.encoding or 'ascii'))
+    if msg:
+        report(cmd, p.returncode, msg, diagnostics)
+
+    return p.returncode
+
+def main(argv):
+    diagnostics = None
+    if argv and argv[0].startswith('--diagnostics='):
+        diagnostics = argv[0][len('--diagnostics='):]
+        argv = argv[1:]
+
+    if argv[:1] == ['--report']:
+        returncode = int(argv[1])
+        stdin = sys.stdin.buffer if hasattr(sys.stdin, 'buffer') else sys.stdin
+        buf = BoundedBuffer()
+        for line in read_lines(stdin):
+            buf.append(line)
+        msg = buf.text(sys.stderr.encoding or 'ascii')
+        if msg:
+            report(argv[2:], returncode, msg, diagnostics)
+        return returncode
+
+    return run(argv, diagnostics)
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,45 @@
+#!/bin/sh
+
+# Fast path of wafstyleout.py for POSIX hosts.
+#
+# Usage: wafstyleout.sh <python> [--diagnostics=<file>] <command> [<args>...]
+#
+# Most compiles and links print nothing, and starting a Python interpreter
+# around each of them dominates the cost of the wrapper.  This script runs the
+# command itself and only starts Python to report the output of the commands
+# that print something.  The compilers on these hosts write the header
+# dependencies to a depfile, so stdout and stderr can be merged.
+#
+# The output is written to a temporary file rather than kept in the shell, so
+# that the memory used by the wrapper does not grow with the output, which
+# Python reads line by line.
+
+python=$1
+shift
+
+diagnostics=
+case $1 in
+    --diagnostics=*)
+        diagnostics=$1
+        shift
+        ;;
+esac
+
+# Name the file after the PID of the shell to avoid running mktemp for every
+# command, unless the file already exists.
+tmp=${TMPDIR:-/tmp}/wafstyleout.$$
+if ! (umask 077 && set -C && : > "$tmp") 2>/dev/null; then
+    tmp=$(mktemp "${TMPDIR:-/tmp}/wafstyleout.XXXXXX") || exit 1
+fi
+trap 'rm -f "$tmp"' EXIT
+trap 'exit 130' HUP INT TERM
+
+"$@" > "$tmp" 2>&1
+status=$?
+
+if [ ! -s "$tmp" ]; then
+    exit $status
+fi
+
+"$python" "$(dirname "$0")/wafstyleout.py" ${diagnostics:+"$diagnostics"} \
+    --report $status "$@" < "$tmp"
@@ -0,0 +1,281 @@
+"""Local executor of action graphs.
+
+The actions are run by a pool of worker processes, as soon as the actions
+producing their inputs have completed.  Before running an action, a worker
+computes its key from its command, its working directory, its outputs and the
+content of all of its inputs.  If the content store has a result for the key,
+the outputs are restored from the store instead of running the command;
+otherwise the command is run and its outputs are added to the store.
+
+The paths inside the build directory are made relative to it in the keys and
+in the results stored, so that the build directories of the same sources can
+share a store.
+
+Incomplete actions (whose inputs are not all known) are always run, and their
+outputs are not stored.
+"""
+
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+import subprocess
+import sys
+import time
+
+try:
+    import queue  # Python 3
+except ImportError:
+    import Queue as queue  # Python 2
+
+from bdebuild.actions import store
+
+_digests = None
+
+
+class ActionStatus(object):
+    """This class enumerates over the results of actions.
+    """
+    CACHED = 'cached'
+    BUILT = 'built'
+    FAILED = 'failed'
+    SKIPPED = 'skipped'
+
+
+def _init_worker(path):
+    sys.path[:] = path
+
+
+def relative_path(path, build_dir):
+    """Return a path relative to the build directory if it is inside it, and
+    unchanged otherwise.
+    """
+    if not build_dir:
+        return path
+    try:
+        rel_path = os.path.relpath(path, build_dir)
+    except ValueError:
+        # On another drive.
+        return path
+    if rel_path == os.pardir or rel_path.startswith(os.pardir + os.sep):
+        return path
+    return rel_path
+
+
+def relative_command(command, build_dir):
+    """Return a command with the build directory replaced by a placeholder.
+    """
+    if not build_dir:
+        return command
+    return re.sub(re.escape(build_dir) + r'(?=$|[\\/\s"\'])', '<build_dir>',
+                  command)
+
+
+def action_key(action, digests, build_dir=None):
+    """Return the key of an action.
+
+    Args:
+        action (dict): The action.
+        digests (DigestCache): The digests of the files.
+        build_dir (str, optional): The build directory.  The paths inside it
+            are made relative to it.
+
+    Raises:
+        OSError: An input does not exist.
+    """
+    data = {'command': relative_command(action['command'], build_dir),
+            'cwd': relative_path(action['cwd'], build_dir),
+            'outputs': [relative_path(o, build_dir)
+                        for o in action['outputs']],
+            'inputs': [[relative_path(i, build_dir), digests.digest(i)]
+                       for i in action['inputs']]}
+    return hashlib.sha256(json.dumps(data, sort_keys=True).encode(
+        'utf-8')).hexdigest()
+
+
+def run_action(action, store_root, use_cache=True, build_dir=None):
+    """Run an action, or restore its outputs from the content store.
+
+    This function runs in the worker processes.
+
+    Args:
+        action (dict): The action.
+        store_root (str): The directory of the content store.
+        use_cache (bool): Whether to look up the result of the action in the
+            store before running it.
+        build_dir (str, optional): The build directory of the action.  The
+            results stored can be restored into other build directories.
+
+    Returns:
+        dict with the 'id', 'status', 'log' and 'duration' of the action.
+    """
+    global _digests
+    if _digests is None:
+        _digests = store.DigestCache()
+
+    start = time.time()
+    result = {'id': action['id'], 'log': ''}
+    content_store = store.ContentStore(store_root)
+
+    key = None
+    if action['complete']:
+        try:
+            key = action_key(action, _digests, build_dir)
+        except OSError as e:
+            result['status'] = ActionStatus.FAILED
+            result['log'] = 'Missing input: %s\n' % e
+            result['duration'] = time.time() - start
+            return result
+
+    if key and use_cache:
+        cached = content_store.get_result(key)
+        if cached and all(content_store.get_file(
+                o['digest'], os.path.join(build_dir or '', path),
+                o['executable'])
+                for path, o in sorted(cached['outputs'].items())):
+            result['status'] = ActionStatus.CACHED
+            result['log'] = cached['log']
+            result['duration'] = time.time() - start
+            return result
+
+    p = subprocess.Popen(action['command'], shell=True, cwd=action['cwd'],
+                         stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    out = p.communicate()[0].decode('utf-8', 'replace')
+    result['log'] = out
+    result['duration'] = time.time() - start
+    if p.returncode != 0:
+        result['status'] = ActionStatus.FAILED
+        return result
+
+    result['status'] = ActionStatus.BUILT
+    if key:
+        outputs = {}
+        for path in action['outputs']:
+            if not os.path.isfile(path):
+                return result
+            outputs[relative_path(path, build_dir)] = {
+                'digest': content_store.put_file(path, _digests.digest(path)),
+                'executable': os.access(path, os.X_OK)}
+        content_store.put_result(key, {'outputs': outputs, 'log': out})
+    return result
+
+
+def _run_action_safely(action, store_root, use_cache=True, build_dir=None):
+    # Python 2 pools have no error callback: report the errors as failures.
+    try:
+        return run_action(action, store_root, use_cache, build_dir)
+    except Exception as e:
+        return {'id': action['id'], 'log': '%s\n' % e, 'duration': 0,
+                'status': ActionStatus.FAILED}
+
+
+class Executor(object):
+    """Run the actions of an action graph in parallel.
+
+    Attributes:
+        graph (ActionGraph): The action graph.
+        store_root (str): The directory of the content store.
+        jobs (int): The number of worker processes.
+        keep_going (bool): Whether to keep running the actions that do not
+            depend on failed actions.
+        use_cache (bool): Whether to restore outputs from the store.
+    """
+
+    def __init__(self, graph, store_root, jobs=None, keep_going=False,
+                 use_cache=True):
+        self.graph = graph
+        self.store_root = store_root
+        self.jobs = jobs or multiprocessing.cpu_count()
+        self.keep_going = keep_going
+        self.use_cache = use_cache
+
+    def run(self, ids=None, report=None):
+        """Run the specified actions and the actions they depend on.
+
+        Args:
+            ids (list of str, optional): The actions to run.  All actions are
+                run if not specified.
+            report (callable, optional): Called with the index of each
+                completed action, the number of actions and its result.
+
+        Returns:
+            dict of action identifier to result (see 'run_action').
+        """
+        selected = (self.graph.closure(ids) if ids
+                    else set(self.graph.actions))
+        remaining = dict((id_, len(self.graph.actions[id_].deps))
+                         for id_ in selected)
+        dependents = dict((id_, []) for id_ in selected)
+        for id_ in selected:
+            for dep in self.graph.actions[id_].deps:
+                dependents[dep].append(id_)
+
+        ready = sorted(id_ for id_, count in remaining.items() if not count)
+        results = {}
+        done = queue.Queue()
+        running = 0
+        failed = False
+
+        pool = multiprocessing.Pool(self.jobs, _init_worker, (sys.path,))
+        try:
+            while ready or running:
+                while ready and not (failed and not self.keep_going):
+                    action = self.graph.actions[ready.pop()].to_dict()
+                    pool.apply_async(_run_action_safely,
+                                     (action, self.store_root, self.use_cache,
+                                      self.graph.build_dir),
+                                     callback=done.put)
+                    running += 1
+                if not running:
+                    break
+
+                result = done.get()
+                running -= 1
+                results[result['id']] = result
+                if report:
+                    report(len(results), len(selected), result)
+
+                if result['status'] == ActionStatus.FAILED:
+                    failed = True
+                    self._skip_dependents(result['id'], dependents, results)
+                    continue
+                for id_ in dependents[result['id']]:
+                    remaining[id_] -= 1
+                    if not remaining[id_] and id_ not in results:
+                        ready.append(id_)
+        finally:
+            pool.close()
+            pool.join()
+
+        for id_ in selected:
+            if id_ not in results:
+                results[id_] = {'id': id_, 'status': ActionStatus.SKIPPED,
+                                'log': '', 'duration': 0}
+        return results
+
+    def _skip_dependents(self, id_, dependents, results):
+        todo = list(dependents[id_])
+        while todo:
+            dependent = todo.pop()
+            if dependent not in results:
+                results[dependent] = {'id': dependent,
+                                      'status': ActionStatus.SKIPPED,
+                                      'log': '', 'duration': 0}
+                todo.extend(dependents[dependent])
+
+# -----------------------------------------------------------------------------
+# Copyright 2026 Bloomberg Finance L.P.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ----------------------------- END-OF-FILE -----------------------------------
@@ -0,0 +1,326 @@
+"""Self-contained graph of the build actions of a build directory.
+
+The graph lists, for every compile and link of the build, the command to run,
+its working directory, all of its inputs (sources, headers, objects,
+libraries and the tools the command runs) and its outputs.  It can be executed
+without CMake or Ninja, e.g. by the local executor of this package.
+
+The compile actions come from the ``compile_commands.json`` exported by CMake.
+With the Ninja generator, the header inputs of the compiles come from the
+dependencies recorded by Ninja (``ninja -t deps``), and the link actions and
+their inputs come from the Ninja build graph.  The header inputs of a compile
+are only known once it was built by Ninja; actions whose inputs are not fully
+known are marked as incomplete.
+"""
+
+import json
+import os
+import re
+import shlex
+import subprocess
+import sys
+
+try:
+    from shlex import quote as shell_quote  # Python 3
+except ImportError:
+    from pipes import quote as shell_quote  # Python 2
+
+from bdebuild.cmakebuild import ninjalog
+from bdebuild.cmakebuild import timing
+from bdebuild.common import blderror
+from bdebuild.common import sysutil
+
+GRAPH_VERSION = 1
+
+_DEPS_HEADER_RE = re.compile(r'^(?P<output>.+): #deps \d+, deps mtime \d+ '
+                             r'\((?P<state>[A-Z]+)\)$')
+
+
+class ActionKind(object):
+    """This class enumerates over the kinds of actions.
+    """
+    COMPILE = 'compile'
+    LINK = 'link'
+
+
+class Action(object):
+    """A single command of the build.
+
+    Attributes:
+        id (str): Identifier of the action (its first output, relative to
+            the build directory).
+        kind (str): The kind of the action.
+        command (str): The shell command.
+        cwd (str): The working directory of the command.
+        inputs (list of str): Absolute paths of the inputs.
+        outputs (list of str): Absolute paths of the outputs.
+        complete (bool): Whether all inputs are known.
+        deps (list of str): Identifiers of the actions producing the inputs.
+    """
+
+    def __init__(self, id_, kind, command, cwd, inputs, outputs,
+                 complete=True):
+        self.id = id_
+        self.kind = kind
+        self.command = command
+        self.cwd = cwd
+        self.inputs = inputs
+        self.outputs = outputs
+        self.complete = complete
+        self.deps = []
+
+    def to_dict(self):
+        return {'id': self.id,
+                'kind': self.kind,
+                'command': self.command,
+                'cwd': self.cwd,
+                'inputs': self.inputs,
+                'outputs': self.outputs,
+                'complete': self.complete,
+                'deps': self.deps}
+
+    @classmethod
+    def from_dict(cls, d):
+        action = cls(d['id'], d['kind'], d['command'], d['cwd'], d['inputs'],
+                     d['outputs'], d['complete'])
+        action.deps = d['deps']
+        return action
+
+    def __repr__(self):
+        return '%s %s' % (self.kind, self.id)
+
+
+class ActionGraph(object):
+    """The graph of the actions of a build directory.
+
+    Attributes:
+        build_dir (str): Absolute path of the build directory.
+        actions (dict of str to Action): The actions, by identifier.
+    """
+
+    def __init__(self, build_dir, actions):
+        self.build_dir = build_dir
+        self.actions = dict((a.id, a) for a in actions)
+        self._link()
+
+    def _link(self):
+        producers = {}
+        for action in self.actions.values():
+            for output in action.outputs:
+                producers[output] = action.id
+        for action in self.actions.values():
+            action.deps = sorted(set(producers[i] for i in action.inputs
+                                     if i in producers) - set([action.id]))
+
+    def closure(self, ids):
+        """Return the identifiers of the specified actions and of all actions
+        they depend on.
+
+        Raises:
+            BldError: One of the actions does not exist.
+        """
+        result = set()
+        todo = list(ids)
+        while todo:
+            id_ = todo.pop()
+            if id_ in result:
+                continue
+            if id_ not in self.actions:
+                raise blderror.BldError('Unknown action: %s' % id_)
+            result.add(id_)
+            todo.extend(self.actions[id_].deps)
+        return result
+
+    def to_dict(self):
+        return {'version': GRAPH_VERSION,
+                'build_dir': self.build_dir,
+                'actions': [self.actions[id_].to_dict()
+                            for id_ in sorted(self.actions)]}
+
+    def save(self, path):
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=1, sort_keys=True)
+        sysutil.replace_file(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """Load an action graph.
+
+        Raises:
+            MissingFileError: The file does not exist.
+            BldError: The file is not an action graph of a supported version.
+        """
+        if not os.path.isfile(path):
+            raise blderror.MissingFileError('Cannot find %s' % path)
+        with open(path) as f:
+            try:
+                data = json.load(f)
+            except ValueError as e:
+                raise blderror.BldError('Invalid action graph %s: %s' %
+                                        (path, e))
+        if data.get('version') != GRAPH_VERSION:
+            raise blderror.BldError('Unsupported action graph version in %s' %
+                                    path)
+        graph = cls(data['build_dir'], [])
+        graph.actions = dict((d['id'], Action.from_dict(d))
+                             for d in data['actions'])
+        return graph
+
+
+def _run_ninja(build_dir, args):
+    out = subprocess.check_output(['ninja', '-C', build_dir] + args)
+    if not isinstance(out, str):
+        out = out.decode(sys.stdout.encoding or 'iso8859-1')
+    return out
+
+
+def _abs_path(path, cwd):
+    return os.path.normpath(os.path.join(cwd, path))
+
+
+def command_output(command):
+    """Return the output of a compile command ('-o' or '/Fo'), or None."""
+    args = shlex.split(command, posix=os.name != 'nt')
+    for i, arg in enumerate(args):
+        if arg == '-o' and i + 1 < len(args):
+            return args[i + 1]
+        if arg.startswith(('/Fo', '-Fo')) and len(arg) > 3:
+            return arg[3:]
+    return None
+
+
+def command_tools(command):
+    """Return the absolute paths of the executables run by a command."""
+    tools = []
+    for arg in shlex.split(command, posix=os.name != 'nt'):
+        if (os.path.isabs(arg) and os.path.isfile(arg) and
+                os.access(arg, os.X_OK) and arg not in tools):
+            tools.append(arg)
+    return tools
+
+
+def read_ninja_deps(build_dir):
+    """Return the dependencies recorded by Ninja for each output that is up
+    to date.
+
+    Returns:
+        dict of absolute output path to list of absolute input paths
+    """
+    deps = {}
+    current = None
+    for line in _run_ninja(build_dir, ['-t', 'deps']).splitlines():
+        m = _DEPS_HEADER_RE.match(line)
+        if m:
+            current = None
+            if m.group('state') == 'VALID':
+                current = []
+                deps[_abs_path(m.group('output'), build_dir)] = current
+        elif line.startswith(' ') and current is not None:
+            current.append(_abs_path(line.strip(), build_dir))
+    return deps
+
+
+def _compile_actions(build_dir, header_deps):
+    compdb = os.path.join(build_dir, 'compile_commands.json')
+    if not os.path.isfile(compdb):
+        raise blderror.MissingFileError(
+            'Cannot find %s. Configure the build with '
+            'CMAKE_EXPORT_COMPILE_COMMANDS enabled.' % compdb)
+    with open(compdb) as f:
+        entries = json.load(f)
+
+    actions = []
+    for entry in entries:
+        cwd = entry['directory']
+        command = entry.get('command') or ' '.join(
+            shell_quote(a) for a in entry['arguments'])
+        output = entry.get('output') or command_output(command)
+        if not output:
+            continue
+        output = _abs_path(output, cwd)
+        source = _abs_path(entry['file'], cwd)
+
+        inputs = [source]
+        headers = header_deps.get(output)
+        if headers is not None:
+            inputs.extend(h for h in headers if h not in inputs)
+        inputs.extend(t for t in command_tools(command) if t not in inputs)
+
+        actions.append(Action(os.path.relpath(output, build_dir),
+                              ActionKind.COMPILE, command, cwd, inputs,
+                              [output], headers is not None))
+    return actions
+
+
+def _link_actions(build_dir, known_outputs):
+    entries = json.loads(_run_ninja(build_dir, ['-t', 'compdb']))
+    links = [e for e in entries
+             if e.get('command') and e.get('output') and
+             timing.edge_kind(e['output']) == 'link']
+    if not links:
+        return []
+
+    graph = ninjalog.read_graph(build_dir, [e['output'] for e in links])
+    link_outputs = set(_abs_path(e['output'], e['directory']) for e in links)
+
+    actions = []
+    for entry in links:
+        cwd = entry['directory']
+        output = _abs_path(entry['output'], cwd)
+        inputs = []
+        for i in sorted(graph.get(entry['output'], ())):
+            path = _abs_path(i, build_dir)
+            # Skip the phony targets of the build graph.
+            if (path in known_outputs or path in link_outputs or
+                    os.path.isfile(path)):
+                inputs.append(path)
+        inputs.extend(t for t in command_tools(entry['command'])
+                      if t not in inputs)
+        actions.append(Action(os.path.relpath(output, build_dir),
+                              ActionKind.LINK, entry['command'], cwd, inputs,
+                              [output]))
+    return actions
+
+
+def export_actions(build_dir, ninja=True):
+    """Export the action graph of a build directory.
+
+    Args:
+        build_dir (str): The build directory.
+        ninja (bool): Whether the build directory uses the Ninja generator.
+            Otherwise, only the compile actions are exported, and they are
+            all incomplete.
+
+    Returns:
+        ActionGraph
+
+    Raises:
+        MissingFileError: There is no compilation database in the build
+            directory.
+        OSError: Ninja cannot be run.
+        CalledProcessError: Ninja failed.
+    """
+    build_dir = os.path.abspath(build_dir)
+    header_deps = read_ninja_deps(build_dir) if ninja else {}
+    actions = _compile_actions(build_dir, header_deps)
+    if ninja:
+        known_outputs = set(o for a in actions for o in a.outputs)
+        actions.extend(_link_actions(build_dir, known_outputs))
+    return ActionGraph(build_dir, actions)
+
+# -----------------------------------------------------------------------------
+# Copyright 2026 Bloomberg Finance L.P.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ----------------------------- END-OF-FILE -----------------------------------
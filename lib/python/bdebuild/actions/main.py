@@ -0,0 +1,112 @@
+"""Run the actions of a build action graph exported by cmake_build.py.
+"""
+
+from __future__ import print_function
+
+import argparse
+import collections
+import os
+import sys
+
+from bdebuild.actions import executor
+from bdebuild.actions import graph
+from bdebuild.common import blderror
+
+
+def main():
+    """Run the actions of an action graph with the local executor.  Exit with
+    a return code 1 if the graph cannot be loaded or if an action failed.
+    """
+    args = get_cmdline_options().parse_args()
+
+    try:
+        action_graph = graph.ActionGraph.load(args.graph)
+        targets = None
+        if args.targets:
+            targets = [os.path.relpath(os.path.abspath(t),
+                                       action_graph.build_dir)
+                       if os.path.isabs(t) else t for t in args.targets]
+            action_graph.closure(targets)
+    except blderror.BldError as e:
+        print('Error: %s' % e, file=sys.stderr)
+        sys.exit(1)
+
+    store_root = args.store or os.path.join(action_graph.build_dir,
+                                            'bde_action_store')
+    runner = executor.Executor(action_graph, store_root, args.jobs,
+                               args.keep_going, not args.no_cache)
+
+    def report(index, total, result):
+        if result['status'] != executor.ActionStatus.SKIPPED or args.verbose:
+            print('[%d/%d] %s %s (%.2fs)' % (index, total, result['status'],
+                                              result['id'],
+                                              result['duration']))
+        if result['log']:
+            print(result['log'], end='' if result['log'].endswith('\n')
+                  else '\n')
+        sys.stdout.flush()
+
+    results = runner.run(targets, report)
+
+    counts = collections.Counter(r['status'] for r in results.values())
+    print('%d actions: %s' % (len(results), ', '.join(
+        '%d %s' % (counts[s], s) for s in [executor.ActionStatus.BUILT,
+                                           executor.ActionStatus.CACHED,
+                                           executor.ActionStatus.FAILED,
+                                           executor.ActionStatus.SKIPPED])))
+
+    if counts[executor.ActionStatus.FAILED]:
+        sys.exit(1)
+
+
+def get_cmdline_options():
+    """Get the command line options.
+
+    Returns:
+        ArgumentParser
+    """
+    parser = argparse.ArgumentParser(
+        prog=os.path.basename(sys.argv[0]),
+        description='Run the actions of a build action graph exported by '
+                    '"cmake_build.py export" with a pool of worker processes, '
+                    'restoring the outputs of the actions whose inputs did '
+                    'not change from a content-addressed store.')
+    parser.add_argument('graph',
+                        help='Path to the action graph.')
+    parser.add_argument('-t', '--targets', type=lambda x: x.split(','),
+                        help='Comma-separated list of the outputs to build '
+                             '(relative to the build directory), e.g. '
+                             '"libbsl.a,bslma_allocator.t". Everything is '
+                             'built by default.')
+    parser.add_argument('-j', '--jobs', type=int, default=0,
+                        help='Number of worker processes (default: number of '
+                             'CPUs).')
+    parser.add_argument('--store',
+                        help='Path to the content store, which can be shared '
+                             'by the executors of several build directories '
+                             '(default: "bde_action_store" in the build '
+                             'directory).')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Run all actions, only adding their outputs to '
+                             'the store.')
+    parser.add_argument('-k', '--keep-going', action='store_true',
+                        help='Keep going after an action failed.')
+    parser.add_argument('-v', '--verbose', action='store_true',
+                        help='Also list the skipped actions.')
+    return parser
+
+# -----------------------------------------------------------------------------
+# Copyright 2026 Bloomberg Finance L.P.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ----------------------------- END-OF-FILE -----------------------------------
@@ -0,0 +1,161 @@
+"""Content-addressed store of the outputs of build actions.
+
+The store is a directory with two parts:
+
+- ``cas/``: The content of the outputs, in files named after the SHA-256
+  digest of their content.
+- ``ac/``: The action cache, which maps the key of an action (a digest of its
+  command and of the content of its inputs) to the digests of its outputs and
+  the text it printed.
+
+Every file is written to a temporary file first and then renamed, so that any
+number of executor processes can share a store.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import stat
+import tempfile
+
+from bdebuild.common import sysutil
+
+_CHUNK_SIZE = 1 << 20
+
+
+def file_digest(path):
+    """Return the SHA-256 digest of the content of a file."""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(_CHUNK_SIZE), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _makedirs(path):
+    # Other executors may create the same directory concurrently.
+    if not os.path.isdir(path):
+        try:
+            os.makedirs(path)
+        except OSError:
+            if not os.path.isdir(path):
+                raise
+
+
+class DigestCache(object):
+    """Memoize the digests of files by their size and modification time.
+    """
+
+    def __init__(self):
+        self._digests = {}
+
+    def digest(self, path):
+        st = os.stat(path)
+        key = (path, st.st_size, st.st_mtime)
+        digest = self._digests.get(key)
+        if digest is None:
+            digest = file_digest(path)
+            self._digests[key] = digest
+        return digest
+
+
+class ContentStore(object):
+    """A content-addressed store of action outputs.
+
+    Attributes:
+        root (str): The directory of the store.
+    """
+
+    def __init__(self, root):
+        self.root = os.path.abspath(root)
+
+    def _path(self, kind, digest):
+        return os.path.join(self.root, kind, digest[:2], digest)
+
+    def _write_atomic(self, path, write):
+        dir_name = os.path.dirname(path)
+        _makedirs(dir_name)
+        fd, tmp_path = tempfile.mkstemp(dir=dir_name, prefix='.tmp')
+        try:
+            os.chmod(tmp_path, 0o644)
+            with os.fdopen(fd, 'wb') as f:
+                write(f)
+            sysutil.replace_file(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def put_file(self, path, digest=None):
+        """Add the content of a file to the store and return its digest."""
+        digest = digest or file_digest(path)
+        blob_path = self._path('cas', digest)
+        if not os.path.isfile(blob_path):
+            def write(f):
+                with open(path, 'rb') as src:
+                    shutil.copyfileobj(src, f, _CHUNK_SIZE)
+            self._write_atomic(blob_path, write)
+        return digest
+
+    def get_file(self, digest, path, executable=False):
+        """Write the content with the specified digest to a file.
+
+        Returns:
+            False if the content is not in the store.
+        """
+        blob_path = self._path('cas', digest)
+        if not os.path.isfile(blob_path):
+            return False
+        dir_name = os.path.dirname(path)
+        if dir_name:
+            _makedirs(dir_name)
+
+        # The output is copied rather than linked, so that a command updating
+        # it in place cannot corrupt the store.
+        tmp_path = path + '.tmp%d' % os.getpid()
+        shutil.copyfile(blob_path, tmp_path)
+        if executable:
+            mode = os.stat(tmp_path).st_mode
+            os.chmod(tmp_path,
+                     mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+        sysutil.replace_file(tmp_path, path)
+        return True
+
+    def get_result(self, key):
+        """Return the cached result of the action with the specified key, or
+        None.
+        """
+        path = self._path('ac', key)
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (IOError, OSError, ValueError):
+            return None
+
+    def put_result(self, key, result):
+        """Cache the result of the action with the specified key.
+
+        Args:
+            key (str): The key of the action.
+            result (dict): The 'outputs' (dict of path to dict with the
+                'digest' and 'executable' fields) and 'log' of the action.
+        """
+        data = json.dumps(result, sort_keys=True).encode('utf-8')
+        self._write_atomic(self._path('ac', key), lambda f: f.write(data))
+
+# -----------------------------------------------------------------------------
+# Copyright 2026 Bloomberg Finance L.P.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ----------------------------- END-OF-FILE -----------------------------------
@@ -18,7 +18,8 @@ def get_option_parser():
                      [-c COMPILER] 
                      [-t UFID]
                      [-b BUILD_DIR]
-                     [-i INSTALL_DIR])
+                     [-i INSTALL_DIR]
+                     [--refresh])
 
 set  : set environment variables (default)
 unset: unset environment variables
@@ -42,7 +43,12 @@ list : list available compilers in the following order:
         (('b', 'build-dir'),
          {'type': 'string',
           'default': None,
-          'help': 'build directory'})
+          'help': 'build directory'}),
+        (('refresh',),
+         {'action': 'store_true',
+          'default': False,
+          'help': 'detect the compilers again instead of using the cached '
+                  'list ($XDG_CACHE_HOME/bde-tools/compilerinfo.json)'})
     ]
     options += optionsutil.get_ufid_cmdline_options()
     cmdlineutil.add_options(parser, options)
@@ -3,15 +3,19 @@
 
 from __future__ import print_function
 
+import hashlib
 import json
+import multiprocessing.pool
 import re
 import os
 import string
 import sys
 import subprocess
+import time
 
 from bdebuild.common import blderror
 from bdebuild.common import mixins
+from bdebuild.common import sysutil
 
 from bdebuild.meta import optiontypes
 from bdebuild.meta import optionsutil
@@ -145,10 +149,114 @@ def get_compilerinfos(hostname, uplid, file_):
     return infos
 
 
+def get_cache_path():
+    """Return the path to the compiler information cache.
+
+    This is $XDG_CACHE_HOME/bde-tools/compilerinfo.json, where XDG_CACHE_HOME
+    defaults to ~/.cache.
+    """
+    return os.path.join(sysutil.get_cache_dir(), 'compilerinfo.json')
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
+class CompilerInfoCache(object):
+    """A persistent cache of the compilers found on a machine.
+
+    The cache entries are keyed on the hostname, the UPLID, the PATH, the
+    modification times of the PATH directories (which change when a compiler
+    is installed or removed) and the modification times of the configuration
+    files.  An entry is also invalidated when the modification time of one of
+    its compiler executables changes.
+
+    Attributes:
+        path (str): Path to the cache file.
+        max_entries (int): Maximum number of entries kept in the cache file,
+            which may be shared by several machines.
+    """
+
+    def __init__(self, path=None, max_entries=16):
+        self.path = path or get_cache_path()
+        self.max_entries = max_entries
+
+    @staticmethod
+    def make_key(hostname, uplid, config_paths, path=None):
+        """Return the key of the cache entry of the specified configuration.
+        """
+        if path is None:
+            path = os.environ.get('PATH', '')
+        dirs = [d.strip('"') for d in path.split(os.pathsep) if d]
+        data = [hostname, str(uplid), path,
+                [_mtime(d) for d in dirs],
+                [[p, _mtime(p)] for p in config_paths if p]]
+        return hashlib.sha1(json.dumps(data).encode('utf-8')).hexdigest()
+
+    def _read(self):
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (IOError, OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def load(self, key):
+        """Return the list of CompilerInfo objects cached for the specified
+        key, or None if there is no valid entry.
+        """
+        entry = self._read().get(key)
+        if not entry:
+            return None
+        for path, mtime in entry['mtimes']:
+            if _mtime(path) != mtime:
+                return None
+        return [CompilerInfo(**info) for info in entry['infos']]
+
+    def save(self, key, infos):
+        """Cache the list of CompilerInfo objects for the specified key.
+        Failures to write the cache are ignored.
+        """
+        paths = set()
+        for info in infos:
+            for path in (info.c_path, info.cxx_path):
+                if path:
+                    paths.add(path)
+                    paths.add(os.path.realpath(path))
+
+        data = self._read()
+        data[key] = {'time': time.time(),
+                     'mtimes': [[p, _mtime(p)] for p in sorted(paths)],
+                     'infos': [vars(info) for info in infos]}
+        for old_key in sorted(data, key=lambda k: data[k].get('time', 0))[
+                :max(len(data) - self.max_entries, 0)]:
+            del data[old_key]
+
+        tmp_path = '%s.%d.tmp' % (self.path, os.getpid())
+        try:
+            dir_name = os.path.dirname(self.path)
+            if not os.path.isdir(dir_name):
+                os.makedirs(dir_name)
+            with open(tmp_path, 'w') as f:
+                json.dump(data, f)
+            sysutil.replace_file(tmp_path, self.path)
+        except Exception:
+            try:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+            except OSError:
+                pass
+
+
 def get_command_output(args):
     try:
-        output = subprocess.check_output(args, stderr=subprocess.STDOUT).translate(None, '\n')
-        return output
+        output = subprocess.check_output(args, stderr=subprocess.STDOUT)
+        if not isinstance(output, str):
+            output = output.decode(sys.stdout.encoding or 'iso8859-1')
+        return output.replace('\n', '')
     except Exception as e:
         pass
     return None
@@ -161,142 +269,117 @@ def get_compiler_version(compiler_type, cxx_path):
 
     if 'clang' == compiler_type:
         version = get_command_output([cxx_path, '--version'])
-        m = re.search('version\s+(\S+)\s+', version)
+        m = re.search('version\s+(\S+)\s+', version or '')
         version = m.group(1) if m else '0.0.0'
 
     return version
 
 
-def detect_installed_compilers(uplid):
+# The families of compilers detected on the PATH, by UPLID mask.  The
+# compilers of a family are the executables named after its C and C++
+# compiler names, optionally followed by a version suffix (e.g. "g++-10").
+DEFAULT_COMPILER_FAMILIES = [
+    ('unix-linux-', [
+        {'type': 'gcc', 'c_name': 'gcc', 'cxx_name': 'g++',
+         'toolchain': 'gcc-default'},
+        {'type': 'clang', 'c_name': 'clang', 'cxx_name': 'clang++',
+         'toolchain': 'clang-default'}]),
+    ('unix-darwin-', [
+        {'type': 'clang', 'c_name': 'clang', 'cxx_name': 'clang++',
+         'toolchain': 'clang-default'}])
+]
+
+_VERSION_SUFFIX_RE = re.compile(r'^-(\d+(?:\.\d+)*)$')
+
+
+def find_compiler_candidates(families, path=None):
+    """Find the compilers of the specified families on the PATH.
+
+    Args:
+        families (list of dict): The compiler families, with the 'type',
+            'c_name', 'cxx_name' and 'toolchain' of each.
+        path (str, optional): The search path (default: the PATH environment
+            variable).
+
+    Returns:
+        list of (family, c_path, cxx_path), with the compilers of each family
+        ordered by version, unversioned compilers first.
+    """
+    if path is None:
+        path = os.environ.get('PATH', '')
+    dirs = [d.strip('"') for d in path.split(os.pathsep) if d]
+
+    # The versioned compilers are found by listing the PATH directories once.
+    suffixes = [set() for _ in families]
+    for dir_ in dirs:
+        try:
+            names = os.listdir(dir_)
+        except OSError:
+            continue
+        for name in names:
+            for idx, family in enumerate(families):
+                prefix = family['cxx_name']
+                if name.startswith(prefix):
+                    m = _VERSION_SUFFIX_RE.match(name[len(prefix):])
+                    if m:
+                        suffixes[idx].add(name[len(prefix):])
+
+    candidates = []
+    for family, family_suffixes in zip(families, suffixes):
+        def version_key(suffix):
+            return [int(v) for v in suffix[1:].split('.')]
+
+        for suffix in [''] + sorted(family_suffixes, key=version_key):
+            c_path = sysutil.which(family['c_name'] + suffix, path)
+            cxx_path = sysutil.which(family['cxx_name'] + suffix, path)
+            if c_path and cxx_path:
+                candidates.append((family, c_path, cxx_path))
+    return candidates
+
+
+def detect_installed_compilers(uplid, path=None, jobs=None):
     """Find installed system compilers. This function is expected to work
        primarily on Linux/Darwin in OSS environment.
 
+    The compilers are found by scanning the PATH, and their versions are
+    probed concurrently.
+
     Args:
         uplid (str): UPLID of the machine to be matched.
+        path (str, optional): The search path (default: the PATH environment
+            variable).
+        jobs (int, optional): The number of concurrent version probes.
 
     Returns:
         list of matched CompilerInfo objects.
     """
-
-    default_config=''' [ { "uplid": "unix-linux-",
-                           "compilers": [
-                               {
-                                   "type":      "gcc",
-                                   "c_name":    "gcc",
-                                   "cxx_name":  "g++",
-                                   "toolchain": "gcc-default"
-                               },
-                               {
-                                   "type":      "gcc",
-                                   "c_name":    "gcc-5",
-                                   "cxx_name":  "g++-5",
-                                   "toolchain": "gcc-default"
-                               },
-                               {
-                                   "type":      "gcc",
-                                   "c_name":    "gcc-6",
-                                   "cxx_name":  "g++-6",
-                                   "toolchain": "gcc-default"
-                               },
-                               {
-                                   "type":      "gcc",
-                                   "c_name":    "gcc-7",
-                                   "cxx_name":  "g++-7",
-                                   "toolchain": "gcc-default"
-                               },
-                               {
-                                   "type":      "gcc",
-                                   "c_name":    "gcc-8",
-                                   "cxx_name":  "g++-8",
-                                   "toolchain": "gcc-default"
-                               },
-                               {
-                                   "type":      "gcc",
-                                   "c_name":    "gcc-9",
-                                   "cxx_name":  "g++-9",
-                                   "toolchain": "gcc-default"
-                               },
-                               {
-                                   "type":      "gcc",
-                                   "c_name":    "gcc-10",
-                                   "cxx_name":  "g++-10",
-                                   "toolchain": "gcc-default"
-                               },
-                               {
-                                   "type":      "clang",
-                                   "c_name":    "clang",
-                                   "cxx_name":  "clang++",
-                                   "toolchain": "clang-default"
-                               },
-                               {
-                                   "type":      "clang",
-                                   "c_name":    "clang-7",
-                                   "cxx_name":  "clang++-7",
-                                   "toolchain": "clang-default"
-                               },
-                               {
-                                   "type":      "clang",
-                                   "c_name":    "clang-8",
-                                   "cxx_name":  "clang++-8",
-                                   "toolchain": "clang-default"
-                               },
-                               {
-                                   "type":      "clang",
-                                   "c_name":    "clang-9",
-                                   "cxx_name":  "clang++-9",
-                                   "toolchain": "clang-default"
-                               },
-                               {
-                                   "type":      "clang",
-                                   "c_name":    "clang-10",
-                                   "cxx_name":  "clang++-10",
-                                   "toolchain": "clang-default"
-                               }
-                            ]
-                          },
-                          { "uplid": "unix-darwin-",
-                            "compilers": [
-                                {
-                                   "type":      "clang",
-                                   "c_name":    "clang",
-                                   "cxx_name":  "clang++",
-                                   "toolchain": "clang-default"
-                                }
-                            ]
-                          }
-                        ]
-    '''
-
-    loaded_value = json.loads(default_config)
-    matched_obj = None
-    for obj in loaded_value:
-        uplid_mask = optiontypes.Uplid.from_str(obj['uplid'])
-        if not optionsutil.match_uplid(uplid, uplid_mask):
-            continue
-
-        matched_obj = obj
-        break
-
-    if not matched_obj:
+    families = None
+    for uplid_str, uplid_families in DEFAULT_COMPILER_FAMILIES:
+        uplid_mask = optiontypes.Uplid.from_str(uplid_str)
+        if optionsutil.match_uplid(uplid, uplid_mask):
+            families = uplid_families
+            break
+
+    if not families:
         return []
 
-    infos = []
-
-    for compiler in matched_obj['compilers']:
-        c_path = get_command_output(['which', compiler['c_name'] ])
-        cxx_path = get_command_output(['which', compiler['cxx_name'] ])
-
-        if (c_path and os.path.exists(c_path) 
-            and cxx_path and os.path.isfile(cxx_path)):
-            version = get_compiler_version(compiler['type'], cxx_path)
+    candidates = find_compiler_candidates(families, path)
+    if not candidates:
+        return []
 
-            if 'toolchain' in compiler:
-                toolchain = compiler['toolchain']
-            else:
-                toolchain = None
+    pool = multiprocessing.pool.ThreadPool(jobs or len(candidates))
+    try:
+        versions = pool.map(
+            lambda c: get_compiler_version(c[0]['type'], c[2]), candidates)
+    finally:
+        pool.close()
 
-            info = CompilerInfo(compiler['type'], version, c_path, cxx_path, toolchain, None)
-            infos.append(info)
+    infos = []
+    for (family, c_path, cxx_path), version in zip(candidates, versions):
+        if not version:
+            continue
+        infos.append(CompilerInfo(family['type'], version, c_path, cxx_path,
+                                  family.get('toolchain'), None))
 
     return infos
 
@@ -63,7 +63,7 @@ def program():
         unset_command()
         sys.exit(0)
 
-    compiler_infos = get_compilerinfos()
+    compiler_infos = get_compilerinfos(options.refresh)
 
     if not compiler_infos:
         print('No valid compilers on this machine.', file=sys.stderr)
@@ -117,26 +117,42 @@ def find_installdir(version):
             return cl['installationPath']
     return None
 
-def get_compilerinfos():
+def get_compilerinfos(refresh=False):
+    """Return the available compilers.
+
+    On unix platforms, the compilers are cached (see
+    'compilerinfo.CompilerInfoCache') unless 'refresh' is True.
+    """
     os_type, os_name, cpu_type, os_ver = get_os_info()
     if os_type != 'windows':
         uplid = optiontypes.Uplid(os_type, os_name, cpu_type, os_ver)
 
-        config_path = compilerinfo.get_user_config_path()
+        user_config_path = compilerinfo.get_user_config_path()
+        system_config_path = compilerinfo.get_system_config_path()
+
+        cache = compilerinfo.CompilerInfoCache()
+        cache_key = cache.make_key(platform.node(), uplid,
+                                   [user_config_path, system_config_path])
+        if not refresh:
+            compiler_infos = cache.load(cache_key)
+            if compiler_infos is not None:
+                return compiler_infos
+
         user_compiler_infos = []
-        if config_path:
-            with open(config_path, 'r') as f:
+        if user_config_path:
+            with open(user_config_path, 'r') as f:
                 user_compiler_infos = compilerinfo.get_compilerinfos(
                                                      platform.node(), uplid, f)
 
-        config_path = compilerinfo.get_system_config_path()
         system_compiler_infos = []
-        if config_path:
-            with open(config_path, 'r') as f:
+        if system_config_path:
+            with open(system_config_path, 'r') as f:
                 system_compiler_infos = compilerinfo.get_compilerinfos(
                                                      platform.node(), uplid, f)
 
-        return user_compiler_infos + system_compiler_infos + compilerinfo.detect_installed_compilers(uplid)
+        compiler_infos = user_compiler_infos + system_compiler_infos + compilerinfo.detect_installed_compilers(uplid)
+        cache.save(cache_key, compiler_infos)
+        return compiler_infos
     else:
         compiler_infos = []
         for v in msvcversions.versions:
@@ -0,0 +1,281 @@
+"""Compute the test targets affected by a change.
+
+Changed files are mapped to packages and components using the ``.mem`` and
+``.dep`` metadata of the repository, and the change is propagated to the
+dependents of the changed packages:
+
+- A change to a test driver only affects the test driver itself.
+- A change to any other file of a package (or to its metadata) affects all
+  test drivers of the package, of the packages of the same package group
+  that depend on it (directly or not), and of all units of release that
+  depend on its unit of release (directly or not).
+- A change to the metadata of a package group affects all of its packages.
+- Test drivers are also affected by the changes to the units listed in their
+  ``.t.dep`` files.
+
+Changes to tracked files outside of any unit of release (e.g. the CMake files
+of the project) cannot be attributed and affect everything.  Untracked files
+outside of any unit of release (e.g. logs) are ignored.
+"""
+
+import collections
+import glob
+import os
+import subprocess
+import sys
+
+from bdebuild.meta import repoloadutil
+
+_TEST_DRIVER_EXTS = ('.t.cpp', '.t.c')
+
+
+def _run_git(args, cwd):
+    out = subprocess.check_output(['git'] + args, cwd=cwd)
+    if not isinstance(out, str):
+        out = out.decode(sys.stdout.encoding or 'utf-8')
+    return out
+
+
+def _git_files(dirs, args):
+    toplevels = set(_run_git(['rev-parse', '--show-toplevel'], d).strip()
+                    for d in dirs)
+    files = set()
+    for top in toplevels:
+        files.update(os.path.realpath(os.path.join(top, f))
+                     for f in _run_git(args, top).splitlines() if f)
+    return files
+
+
+def changed_files(dirs, rev):
+    """Return the tracked files changed since the specified git revision.
+
+    Committed, staged and unstaged changes are all considered.
+
+    Args:
+        dirs (list of str): Directories inside the git repositories to check.
+        rev (str): The git revision.
+
+    Returns:
+        set of absolute paths
+
+    Raises:
+        CalledProcessError: One of the directories is not in a git repository
+            or the revision does not exist.
+    """
+    return _git_files(dirs, ['diff', '--name-only', rev, '--'])
+
+
+def untracked_files(dirs):
+    """Return the untracked files that are not ignored by git.
+
+    Args:
+        dirs (list of str): Directories inside the git repositories to check.
+
+    Returns:
+        set of absolute paths
+
+    Raises:
+        CalledProcessError: One of the directories is not in a git
+            repository.
+    """
+    return _git_files(dirs, ['ls-files', '--others', '--exclude-standard'])
+
+
+def component_test_drivers(package, component):
+    """Return the test driver sources of a component."""
+    base = os.path.join(package.path, component)
+    drivers = []
+    for ext in _TEST_DRIVER_EXTS:
+        drivers.extend(glob.glob(base + ext))
+        drivers.extend(glob.glob(base + '.*' + ext))
+    return drivers
+
+
+class ChangeSet(object):
+    """Packages and components changed by a set of files.
+
+    Attributes:
+        packages (set of str): Packages whose library changed.
+        test_drivers (dict of str to set of str): Components whose test
+            drivers changed, by package.
+        unknown (list of str): Changed files that do not belong to any
+            unit of release.
+        ignored (list of str): Untracked files that do not belong to any
+            unit of release.
+    """
+
+    def __init__(self, repo, files, untracked=()):
+        """Initialize the object with the changed files.
+
+        Args:
+            repo (RepoContext): The repository.
+            files (set of str): Absolute paths of the changed files.
+            untracked (set of str, optional): Absolute paths of the changed
+                files that are not tracked by git.
+        """
+        self.packages = set()
+        self.test_drivers = collections.defaultdict(set)
+        self.unknown = []
+        self.ignored = []
+
+        package_dirs = dict((os.path.realpath(p.path), p)
+                            for p in repo.packages.values())
+        group_dirs = dict((os.path.realpath(g.path), g)
+                          for g in repo.package_groups.values())
+
+        for path in sorted(files):
+            dir_name, file_name = os.path.split(path)
+            package = package_dirs.get(dir_name)
+            if package:
+                component = file_name.split('.')[0]
+                if (component in package.mem and
+                        file_name.endswith(_TEST_DRIVER_EXTS)):
+                    self.test_drivers[package.name].add(component)
+                else:
+                    self.packages.add(package.name)
+                continue
+
+            if self._add_uor_file(path, package_dirs, group_dirs):
+                continue
+            if path in untracked:
+                self.ignored.append(path)
+            else:
+                self.unknown.append(path)
+
+    def _add_uor_file(self, path, package_dirs, group_dirs):
+        # Walk up the directory tree to find the innermost unit containing
+        # the file.
+        dir_name = os.path.dirname(path)
+        while True:
+            if dir_name in package_dirs:
+                self.packages.add(package_dirs[dir_name].name)
+                return True
+            if dir_name in group_dirs:
+                self.packages.update(group_dirs[dir_name].mem)
+                return True
+            parent = os.path.dirname(dir_name)
+            if parent == dir_name:
+                return False
+            dir_name = parent
+
+
+def affected_packages(repo, changed_packages):
+    """Return the packages affected by the changes to the specified
+    packages.
+
+    Args:
+        repo (RepoContext): The repository.
+        changed_packages (set of str): Names of the changed packages.
+
+    Returns:
+        set of str
+    """
+    rdeps = collections.defaultdict(set)
+    uor_rdeps = collections.defaultdict(set)
+    for package in repo.packages.values():
+        if package.group:
+            for dep in package.dep:
+                rdeps[dep].add(package.name)
+    for uor_name in repo.uor_names():
+        for dep in repo.uor_dep(uor_name):
+            uor_rdeps[dep].add(uor_name)
+
+    def closure(start, edges):
+        result = set(start)
+        todo = list(start)
+        while todo:
+            for n in edges.get(todo.pop(), ()):
+                if n not in result:
+                    result.add(n)
+                    todo.append(n)
+        return result
+
+    packages = closure(changed_packages, rdeps)
+    changed_uors = set(repo.packages[p].uor_name for p in packages
+                       if p in repo.packages)
+    for uor_name in closure(changed_uors, uor_rdeps) - changed_uors:
+        packages.update(p.name for p in repo.uor_packages(uor_name))
+
+    # Test drivers depending on the affected units.
+    affected_units = packages | closure(changed_uors, uor_rdeps)
+    for group in repo.package_groups.values():
+        if group.test_dep & affected_units:
+            packages.update(group.mem)
+    for package in repo.packages.values():
+        if package.test_dep & affected_units:
+            packages.add(package.name)
+
+    return packages
+
+
+def affected_test_targets(repo, files, untracked=(), log=None):
+    """Return the test targets affected by the specified changed files.
+
+    Args:
+        repo (RepoContext): The repository.
+        files (set of str): Absolute paths of the changed files.
+        untracked (set of str, optional): Absolute paths of the changed
+            files that are not tracked by git.  Those that cannot be
+            attributed to a unit of release are ignored.
+        log (callable, optional): Called with a message for each ignored
+            file.
+
+    Returns:
+        Sorted list of test target names (e.g. "bslma.t" or
+        "bslma_allocator.t"), or None if some tracked files cannot be
+        attributed to a unit of release, in which case everything is
+        affected.
+    """
+    changes = ChangeSet(repo, set(files) | set(untracked), untracked)
+    if log:
+        for path in changes.ignored:
+            log('Ignoring untracked file outside of any unit of release: '
+                '%s' % path)
+    if changes.unknown:
+        return None
+
+    packages = affected_packages(repo, changes.packages)
+
+    targets = set()
+    for name in packages:
+        package = repo.packages.get(name)
+        if package and any(component_test_drivers(package, c)
+                           for c in package.mem):
+            targets.add(name + '.t')
+
+    for name, components in changes.test_drivers.items():
+        if name in packages:
+            continue
+        package = repo.packages[name]
+        targets.update(c + '.t' for c in components
+                       if component_test_drivers(package, c))
+
+    return sorted(targets)
+
+
+def changed_since(source_dir, rev, log=None):
+    """Return the test targets of the projects in 'source_dir' affected by
+    the changes since the specified git revision, including the untracked
+    files, or None if everything is affected (see 'affected_test_targets').
+    """
+    roots = repoloadutil.find_project_roots(source_dir)
+    repo = repoloadutil.load_repo(roots)
+    files = changed_files(roots or [source_dir], rev)
+    untracked = untracked_files(roots or [source_dir])
+    return affected_test_targets(repo, files, untracked, log)
+
+# -----------------------------------------------------------------------------
+# Copyright 2026 Bloomberg Finance L.P.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ----------------------------- END-OF-FILE -----------------------------------
@@ -0,0 +1,346 @@
+"""Garbage collection of the artefacts of a build directory.
+
+Long-lived build directories accumulate the objects, test drivers and
+libraries of components that were removed or renamed, and the results of old
+test runs.  An artefact is orphaned if it is not an output of the current
+build graph:
+
+- The outputs recorded in the Ninja log that are no longer produced by any
+  edge of the build graph (``ninja -t targets all``) are orphaned.
+- So are the objects, libraries and executables found in the build directory
+  that are not outputs of the build graph, e.g. those built before the Ninja
+  log was recompacted.  The debug and linker files that are not declared as
+  outputs, e.g. the PDBs written by MSVC, are kept as long as the objects or
+  the binary they belong to are current outputs.
+- Test results are orphaned, except those of the latest CTest run and the
+  test cost data of CTest.
+
+Orphaned artefacts can always be removed.  Under a size budget, the least
+recently used current outputs are removed as well, until the artefacts of the
+build directory fit in the budget; they are rebuilt when they are needed
+again.
+"""
+
+import multiprocessing.pool
+import os
+import re
+import subprocess
+import sys
+
+from bdebuild.cmakebuild import ninjalog
+from bdebuild.cmakebuild import timing
+from bdebuild.common import blderror
+
+_DEBUG_EXTS = ('.pdb', '.ilk', '.exp', '.gch', '.pch')
+_STALE_LOG_RE = re.compile(r'^LastTests?(?:Failed)?_(?P<tag>[^.]+)\.log$')
+_SIZE_RE = re.compile(r'^(?P<value>\d+(?:\.\d+)?)\s*(?P<unit>[KMGT]?)i?B?$',
+                      re.IGNORECASE)
+_SIZE_UNITS = {'': 1, 'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30, 'T': 1 << 40}
+
+
+def parse_size(text):
+    """Parse a size such as "500M" or "20G" (powers of 1024) into bytes.
+
+    Raises:
+        ValueError: The size is not valid.
+    """
+    m = _SIZE_RE.match(text.strip())
+    if not m:
+        raise ValueError('Invalid size: %s' % text)
+    return int(float(m.group('value')) * _SIZE_UNITS[m.group('unit').upper()])
+
+
+def is_artefact(path):
+    """Return whether the specified file is a build artefact (an object, a
+    library, an executable or their debug information).
+    """
+    return (timing.edge_kind(path) in ('compile', 'link') or
+            path.endswith(_DEBUG_EXTS))
+
+
+class Artefact(object):
+    """A file of the build directory.
+
+    Attributes:
+        path (str): Path relative to the build directory.
+        size (int): Size in bytes.
+        last_used (float): Time of the last access or modification.
+    """
+
+    def __init__(self, path, size, last_used):
+        self.path = path
+        self.size = size
+        self.last_used = last_used
+
+    def __repr__(self):
+        return '%s (%d bytes)' % (self.path, self.size)
+
+
+def _stat_artefact(build_dir, rel_path):
+    try:
+        st = os.stat(os.path.join(build_dir, rel_path))
+    except OSError:
+        return None
+    return Artefact(rel_path, st.st_size, max(st.st_atime, st.st_mtime))
+
+
+def current_outputs(build_dir):
+    """Return the outputs of the current build graph of a Ninja build
+    directory.
+
+    Returns:
+        set of normalized paths, relative to the build directory
+
+    Raises:
+        OSError: Ninja cannot be run.
+        CalledProcessError: Ninja failed.
+    """
+    out = subprocess.check_output(['ninja', '-C', build_dir,
+                                   '-t', 'targets', 'all'])
+    if not isinstance(out, str):
+        out = out.decode(sys.stdout.encoding or 'iso8859-1')
+
+    outputs = set()
+    for line in out.splitlines():
+        path, sep, _ = line.rpartition(': ')
+        if sep:
+            outputs.add(os.path.normpath(path))
+    return outputs
+
+
+def logged_outputs(build_dir):
+    """Return the outputs recorded in the Ninja log of a build directory, or
+    an empty set if there is no log.
+    """
+    try:
+        entries = ninjalog.read_entries(build_dir)
+    except blderror.MissingFileError:
+        return set()
+    return set(os.path.normpath(o) for e in entries for o in e.outputs)
+
+
+def _is_cmake_internal(rel_dir):
+    # The compiler identification and try_compile projects of CMake.
+    parts = rel_dir.split(os.sep)
+    return (len(parts) >= 2 and parts[0] == 'CMakeFiles' and
+            (re.match(r'^\d+(\.\d+)+$', parts[1]) or
+             parts[1] in ('CMakeTmp', 'CMakeScratch')))
+
+
+def find_artefacts(build_dir):
+    """Return the artefacts found in a build directory.
+
+    The CMake internal directories and the staging directory of incremental
+    installs are skipped.
+
+    Returns:
+        dict of relative path to Artefact
+    """
+    artefacts = {}
+    for root, dirs, files in os.walk(build_dir):
+        rel_root = os.path.relpath(root, build_dir)
+        if rel_root == '.':
+            rel_root = ''
+            dirs[:] = [d for d in dirs if d not in ('_install_stage',
+                                                    'Testing')]
+        if _is_cmake_internal(rel_root):
+            dirs[:] = []
+            continue
+        for name in files:
+            rel_path = os.path.join(rel_root, name)
+            if is_artefact(name):
+                artefact = _stat_artefact(build_dir, rel_path)
+                if artefact:
+                    artefacts[rel_path] = artefact
+    return artefacts
+
+
+def _is_undeclared_output_of(rel_path, outputs, compile_dirs):
+    # The PDBs of the objects of a target (e.g. "CMakeFiles/<t>.dir/vc140.pdb")
+    # and those of a binary ("<t>.pdb" next to "<t>.exe").
+    rel_dir = os.path.dirname(rel_path)
+    if rel_dir in compile_dirs:
+        return True
+    stem = os.path.splitext(rel_path)[0]
+    return any(stem + ext in outputs for ext in ('.exe', '.dll', ''))
+
+
+def stale_test_results(build_dir):
+    """Return the files of the CTest results of a build directory, except
+    those of the latest run.
+
+    The files of the "Temporary" directory are kept, except the logs of
+    previous dashboard runs ("LastTest_<tag>.log"), as CTest uses the latest
+    logs and its test cost data ("CTestCostData.txt") to schedule tests.
+    """
+    testing_dir = os.path.join(build_dir, 'Testing')
+    if not os.path.isdir(testing_dir):
+        return []
+
+    latest = None
+    tag_path = os.path.join(testing_dir, 'TAG')
+    if os.path.isfile(tag_path):
+        with open(tag_path) as f:
+            latest = f.readline().strip()
+
+    results = []
+    temporary_dir = os.path.join(testing_dir, 'Temporary')
+    if os.path.isdir(temporary_dir):
+        for file_name in os.listdir(temporary_dir):
+            m = _STALE_LOG_RE.match(file_name)
+            if m and m.group('tag') != latest:
+                artefact = _stat_artefact(
+                    build_dir, os.path.join('Testing', 'Temporary', file_name))
+                if artefact:
+                    results.append(artefact)
+
+    for name in os.listdir(testing_dir):
+        if (name in (latest, 'Temporary') or
+                not os.path.isdir(os.path.join(testing_dir, name))):
+            continue
+        for root, _, files in os.walk(os.path.join(testing_dir, name)):
+            for file_name in files:
+                artefact = _stat_artefact(
+                    build_dir,
+                    os.path.relpath(os.path.join(root, file_name), build_dir))
+                if artefact:
+                    results.append(artefact)
+    return results
+
+
+class GcPlan(object):
+    """The artefacts to remove from a build directory.
+
+    Attributes:
+        build_dir (str): The build directory.
+        orphans (list of Artefact): Artefacts that are not outputs of the
+            current build graph.
+        evicted (list of Artefact): Current outputs removed to fit in the
+            size budget, least recently used first.
+        kept_size (int): Size of the artefacts kept.
+    """
+
+    def __init__(self, build_dir, orphans, evicted, kept_size):
+        self.build_dir = build_dir
+        self.orphans = orphans
+        self.evicted = evicted
+        self.kept_size = kept_size
+
+    @property
+    def artefacts(self):
+        return self.orphans + self.evicted
+
+    @property
+    def size(self):
+        return sum(a.size for a in self.artefacts)
+
+
+def plan(build_dir, outputs=None, max_size=None):
+    """Find the artefacts to remove from a build directory.
+
+    Args:
+        build_dir (str): The build directory.
+        outputs (set of str, optional): The outputs of the current build
+            graph, relative to the build directory.  Only the stale test
+            results are orphaned if not specified.
+        max_size (int, optional): The size budget of the artefacts of the
+            build directory, in bytes.
+
+    Returns:
+        GcPlan
+    """
+    artefacts = find_artefacts(build_dir)
+    orphans = stale_test_results(build_dir)
+
+    if outputs is not None:
+        logged = logged_outputs(build_dir)
+        for rel_path in logged - outputs:
+            # Only consider the artefacts inside the build directory, not e.g.
+            # the outputs of custom commands written into the source tree.
+            if (os.path.isabs(rel_path) or rel_path == os.pardir or
+                    rel_path.startswith(os.pardir + os.sep) or
+                    not is_artefact(rel_path)):
+                continue
+            if rel_path not in artefacts:
+                artefact = _stat_artefact(build_dir, rel_path)
+                if artefact:
+                    artefacts[rel_path] = artefact
+        compile_dirs = set(os.path.dirname(o) for o in outputs
+                           if timing.edge_kind(o) == 'compile')
+        for rel_path in list(artefacts):
+            if rel_path in outputs:
+                continue
+            if (rel_path.endswith(_DEBUG_EXTS) and rel_path not in logged and
+                    _is_undeclared_output_of(rel_path, outputs,
+                                             compile_dirs)):
+                continue
+            orphans.append(artefacts.pop(rel_path))
+
+    kept = sorted(artefacts.values(), key=lambda a: a.last_used)
+    kept_size = sum(a.size for a in kept)
+    evicted = []
+    if max_size is not None:
+        while kept and kept_size > max_size:
+            artefact = kept.pop(0)
+            evicted.append(artefact)
+            kept_size -= artefact.size
+
+    orphans.sort(key=lambda a: a.path)
+    return GcPlan(build_dir, orphans, evicted, kept_size)
+
+
+def remove_artefacts(gc_plan, jobs=None):
+    """Remove the artefacts of a plan in parallel, and the directories left
+    empty.
+
+    Returns:
+        The number of bytes freed (int), and the list of (path, OSError) of
+        the artefacts that could not be removed.
+    """
+    def remove(artefact):
+        try:
+            os.remove(os.path.join(gc_plan.build_dir, artefact.path))
+        except OSError as e:
+            if not os.path.lexists(os.path.join(gc_plan.build_dir,
+                                                artefact.path)):
+                return artefact.size, None
+            return 0, (artefact.path, e)
+        return artefact.size, None
+
+    pool = multiprocessing.pool.ThreadPool(jobs or multiprocessing.cpu_count())
+    try:
+        results = pool.map(remove, gc_plan.artefacts)
+    finally:
+        pool.close()
+
+    # Prune the directories left empty, deepest first.
+    dirs = set()
+    for artefact in gc_plan.artefacts:
+        d = os.path.dirname(artefact.path)
+        while d:
+            dirs.add(d)
+            d = os.path.dirname(d)
+    for d in sorted(dirs, key=lambda d: d.count(os.sep), reverse=True):
+        try:
+            os.rmdir(os.path.join(gc_plan.build_dir, d))
+        except OSError:
+            pass
+
+    return (sum(size for size, _ in results),
+            [error for _, error in results if error])
+
+# -----------------------------------------------------------------------------
+# Copyright 2026 Bloomberg Finance L.P.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ----------------------------- END-OF-FILE -----------------------------------
@@ -0,0 +1,167 @@
+"""Read the CMake cache of a build directory.
+
+Each entry of ``CMakeCache.txt`` has the form::
+
+    <name>:<type>=<value>
+
+where the name may be quoted if it contains a colon.  Lines starting with
+``//`` or ``#`` are comments.  The file is parsed in a single pass and the
+result is memoised on the modification time and size of the file, so that the
+cache is only read again after CMake rewrites it.
+"""
+
+import os
+import re
+
+from bdebuild.common import blderror
+
+CMAKE_CACHE = 'CMakeCache.txt'
+
+_ENTRY_RE = re.compile(r'^(?:"(?P<qname>[^"]*)"|(?P<name>[^:=]+))'
+                       r'(?::(?P<type>[A-Z]+))?=(?P<value>.*)$')
+_FALSE_VALUES = ('', '0', 'OFF', 'NO', 'FALSE', 'N', 'IGNORE', 'NOTFOUND')
+
+_memo = {}
+
+
+def to_bool(value):
+    """Return the boolean value of a CMake constant."""
+    upper = value.upper()
+    return not (upper in _FALSE_VALUES or upper.endswith('-NOTFOUND'))
+
+
+class CacheEntry(object):
+    """An entry of the CMake cache.
+
+    Attributes:
+        type_ (str): The CMake type of the entry (e.g. 'BOOL', 'STRING',
+            'PATH', 'FILEPATH', 'INTERNAL' or 'STATIC').
+        raw_value (str): The value as stored in the cache.
+    """
+
+    def __init__(self, type_, raw_value):
+        self.type_ = type_
+        self.raw_value = raw_value
+
+    @property
+    def value(self):
+        """Return the value of the entry: a bool for 'BOOL' entries and a
+        string for all others.
+        """
+        if self.type_ == 'BOOL':
+            return to_bool(self.raw_value)
+        return self.raw_value
+
+    def __repr__(self):
+        return 'CacheEntry(%s, %r)' % (self.type_, self.raw_value)
+
+
+class CMakeCache(object):
+    """The entries of a CMake cache.
+
+    Attributes:
+        path (str): Path of the cache file.
+        entries (dict of str to CacheEntry): The cache entries.
+    """
+
+    def __init__(self, path, entries):
+        self.path = path
+        self.entries = entries
+
+    def get(self, name, default=None):
+        """Return the typed value of the entry 'name', or 'default' if there
+        is no such entry.
+        """
+        entry = self.entries.get(name)
+        return entry.value if entry else default
+
+    def get_type(self, name):
+        """Return the CMake type of the entry 'name', or None if there is no
+        such entry.
+        """
+        entry = self.entries.get(name)
+        return entry.type_ if entry else None
+
+    def __contains__(self, name):
+        return name in self.entries
+
+    def __getitem__(self, name):
+        return self.entries[name].value
+
+    def __len__(self):
+        return len(self.entries)
+
+
+def cache_path(build_dir):
+    return os.path.join(build_dir, CMAKE_CACHE)
+
+
+def parse(lines):
+    """Parse the lines of a CMake cache.
+
+    Args:
+        lines (iterable of str): The lines of the cache file.
+
+    Returns:
+        dict of str to CacheEntry
+    """
+    entries = {}
+    for line in lines:
+        if not line or line[0] in '/#\n\r':
+            continue
+        m = _ENTRY_RE.match(line.rstrip('\r\n'))
+        if not m:
+            continue
+        name = m.group('qname')
+        if name is None:
+            name = m.group('name')
+        entries[name] = CacheEntry(m.group('type') or 'UNINITIALIZED',
+                                   m.group('value'))
+    return entries
+
+
+def load(build_dir):
+    """Load the CMake cache of the specified build directory.
+
+    The parsed cache is memoised and reused until the cache file changes.
+
+    Args:
+        build_dir (str): The build directory.
+
+    Returns:
+        CMakeCache
+
+    Raises:
+        MissingFileError: There is no CMake cache in the build directory.
+    """
+    path = os.path.abspath(cache_path(build_dir))
+    try:
+        st = os.stat(path)
+    except OSError:
+        raise blderror.MissingFileError('Cannot find %s' % path)
+
+    stamp = (st.st_mtime, st.st_size)
+    memo = _memo.get(path)
+    if memo and memo[0] == stamp:
+        return memo[1]
+
+    with open(path) as f:
+        cache = CMakeCache(path, parse(f))
+    _memo[path] = (stamp, cache)
+    return cache
+
+# -----------------------------------------------------------------------------
+# Copyright 2026 Bloomberg Finance L.P.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ----------------------------- END-OF-FILE -----------------------------------
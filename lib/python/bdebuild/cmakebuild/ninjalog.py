@@ -0,0 +1,205 @@
+"""Read the Ninja build log and build graph.
+
+Ninja records every edge it runs in the ``.ninja_log`` file of the build
+directory.  Each line (format version 5) has the following tab-separated
+fields::
+
+    <start ms> <end ms> <restat mtime> <output path> <command hash>
+
+The start and end times are relative to the start of the Ninja invocation that
+ran the edge, and an edge with several outputs is recorded once per output.
+"""
+
+import collections
+import os
+import re
+import subprocess
+import sys
+
+from bdebuild.common import blderror
+
+NINJA_LOG = '.ninja_log'
+
+_HEADER_RE = re.compile(r'^# ninja log v(\d+)')
+_GRAPH_NODE_RE = re.compile(r'^"(?P<id>[^"]+)" \[label="(?P<label>[^"]*)"'
+                            r'(?P<edge>, shape=ellipse)?\]$')
+_GRAPH_ARROW_RE = re.compile(r'^"(?P<src>[^"]+)" -> "(?P<dst>[^"]+)"')
+
+
+class NinjaLogEntry(object):
+    """A single edge recorded in the Ninja log.
+
+    Attributes:
+        start (int): Start time in milliseconds.
+        end (int): End time in milliseconds.
+        mtime (int): Recorded mtime of the outputs.
+        outputs (list of str): Outputs of the edge.
+        cmd_hash (str): Hash of the command line.
+    """
+
+    def __init__(self, start, end, mtime, output, cmd_hash):
+        self.start = start
+        self.end = end
+        self.mtime = mtime
+        self.outputs = [output]
+        self.cmd_hash = cmd_hash
+
+    @property
+    def output(self):
+        """Return the first output of the edge."""
+        return self.outputs[0]
+
+    @property
+    def duration(self):
+        return self.end - self.start
+
+    def __repr__(self):
+        return '%s [%d, %d]' % (self.output, self.start, self.end)
+
+
+def log_path(build_dir):
+    return os.path.join(build_dir, NINJA_LOG)
+
+
+def log_size(build_dir):
+    """Return the current size of the Ninja log in the specified build
+    directory, or 0 if there is no log.
+    """
+    path = log_path(build_dir)
+    return os.path.getsize(path) if os.path.isfile(path) else 0
+
+
+def read_entries(build_dir, offset=0):
+    """Read the entries of the Ninja log.
+
+    Args:
+        build_dir (str): The build directory.
+        offset (int, optional): Only read the entries appended after this byte
+            offset.  The whole log is read if Ninja rewrote (recompacted) the
+            log in the meantime.
+
+    Returns:
+        list of NinjaLogEntry in the order they were recorded, with the
+        outputs of multi-output edges merged into a single entry.
+
+    Raises:
+        MissingFileError: There is no Ninja log in the build directory.
+    """
+    path = log_path(build_dir)
+    if not os.path.isfile(path):
+        raise blderror.MissingFileError('Cannot find %s' % path)
+
+    with open(path) as f:
+        header = f.readline()
+        m = _HEADER_RE.match(header)
+        if not m or int(m.group(1)) < 5:
+            raise blderror.BldError('Unsupported Ninja log format: %s' %
+                                    header.strip())
+
+        if offset > f.tell() and offset <= os.path.getsize(path):
+            f.seek(offset)
+
+        entries = []
+        last = None
+        for line in f:
+            fields = line.rstrip('\n').split('\t')
+            if len(fields) != 5:
+                continue
+            start, end, mtime = (int(v) for v in fields[:3])
+            if (last and last.start == start and last.end == end and
+                    last.cmd_hash == fields[4]):
+                last.outputs.append(fields[3])
+                continue
+            last = NinjaLogEntry(start, end, mtime, fields[3], fields[4])
+            entries.append(last)
+
+    return entries
+
+
+def split_runs(entries):
+    """Split log entries into the Ninja invocations that recorded them.
+
+    Ninja records the edges in the order they finish, so the end times of a
+    single invocation never decrease.
+
+    Args:
+        entries (list of NinjaLogEntry): The log entries.
+
+    Returns:
+        list of list of NinjaLogEntry
+    """
+    runs = []
+    prev_end = None
+    for e in entries:
+        if prev_end is None or e.end < prev_end:
+            runs.append([])
+        runs[-1].append(e)
+        prev_end = e.end
+    return runs
+
+
+def read_graph(build_dir, targets=None):
+    """Read the build graph of the specified targets using "ninja -t graph".
+
+    Args:
+        build_dir (str): The build directory.
+        targets (list of str, optional): The targets to read the graph of.
+            The default targets are used if not specified.
+
+    Returns:
+        dict of file path to the set of paths of its direct inputs (including
+        implicit and order-only inputs).
+
+    Raises:
+        OSError: Ninja cannot be run.
+        CalledProcessError: Ninja failed.
+    """
+    cmd = ['ninja', '-C', build_dir, '-t', 'graph'] + (targets or [])
+    out = subprocess.check_output(cmd)
+    if not isinstance(out, str):
+        out = out.decode(sys.stdout.encoding or 'iso8859-1')
+
+    labels = {}
+    edge_nodes = set()
+    preds = collections.defaultdict(set)
+    for line in out.splitlines():
+        m = _GRAPH_NODE_RE.match(line)
+        if m:
+            labels[m.group('id')] = m.group('label')
+            if m.group('edge'):
+                edge_nodes.add(m.group('id'))
+            continue
+        m = _GRAPH_ARROW_RE.match(line)
+        if m:
+            preds[m.group('dst')].add(m.group('src'))
+
+    # Edges with several inputs or outputs are represented by an intermediate
+    # node, whose predecessors are the inputs of the edge.
+    graph = {}
+    for node, label in labels.items():
+        if node in edge_nodes:
+            continue
+        inputs = set()
+        for p in preds.get(node, ()):
+            if p in edge_nodes:
+                inputs.update(labels[i] for i in preds.get(p, ()))
+            else:
+                inputs.add(labels[p])
+        graph[label] = inputs
+    return graph
+
+# -----------------------------------------------------------------------------
+# Copyright 2026 Bloomberg Finance L.P.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ----------------------------- END-OF-FILE -----------------------------------
@@ -0,0 +1,313 @@
+"""Build timing report.
+
+This module turns the edges recorded in the Ninja log into a timing report
+keyed by BDE package and component names.  The report can be written as JSON
+or in the Chrome trace event format (viewable in ``chrome://tracing`` or
+Perfetto).
+"""
+
+from __future__ import print_function
+
+import collections
+import os
+import re
+
+from bdebuild.cmakebuild import ninjalog
+
+_OBJ_EXTS = ('.o', '.obj')
+_LINK_EXTS = ('.a', '.so', '.lib', '.dll', '.exe', '.dylib', '.t', '.tsk')
+_TARGET_DIR_RE = re.compile(r'CMakeFiles[\\/](?P<target>[^\\/]+)\.dir[\\/]')
+
+
+def edge_kind(output):
+    """Return the kind of the edge producing the specified output: 'compile',
+    'link' or 'other'.
+    """
+    if output.endswith(_OBJ_EXTS):
+        return 'compile'
+    name = os.path.basename(output)
+    if name.endswith(_LINK_EXTS) or '.t.' in name or '.tsk.' in name:
+        return 'link'
+    return 'other'
+
+
+def bde_names(output):
+    """Return the BDE package and component names of a build output.
+
+    Objects and test drivers are attributed to their component.  Other outputs
+    (e.g. libraries and unity or precompiled header objects) are attributed to
+    the package of their CMake target and have no component.
+
+    Args:
+        output (str): Path of the build output, relative to the build dir.
+
+    Returns:
+        package (str), component (str or None)
+    """
+    name = os.path.basename(output)
+    stem = name.split('.')[0]
+    m = _TARGET_DIR_RE.search(output)
+
+    if '_' in stem and not stem.startswith(('unity_', 'cmake_pch')):
+        return stem.split('_')[0], stem
+
+    if m:
+        target = m.group('target')
+        target = re.sub(r'(-obj|-pch|\.t)$', '', target)
+        return target.split('_')[0], None
+
+    if stem.startswith('lib') and edge_kind(output) == 'link':
+        stem = stem[3:]
+    return stem, None
+
+
+class TimingReport(object):
+    """Timing report of a build.
+
+    Attributes:
+        edges (list of NinjaLogEntry): The edges of the build, with times
+            relative to the start of the build.
+    """
+
+    def __init__(self, runs):
+        """Initialize the report with the edges of several Ninja invocations.
+
+        Subsequent invocations are laid out one after another.
+
+        Args:
+            runs (list of list of NinjaLogEntry): The Ninja invocations.
+        """
+        self.edges = []
+        offset = 0
+        for run in runs:
+            if not run:
+                continue
+            run_start = min(e.start for e in run)
+            for e in run:
+                e.start += offset - run_start
+                e.end += offset - run_start
+                self.edges.append(e)
+            offset = max(e.end for e in run)
+
+    @classmethod
+    def from_build_dir(cls, build_dir, offset=0):
+        """Create a report from the Ninja log of the specified build dir,
+        only using the entries appended after the specified byte 'offset'.
+        """
+        return cls(ninjalog.split_runs(
+            ninjalog.read_entries(build_dir, offset)))
+
+    def total_time(self):
+        return max(e.end for e in self.edges) if self.edges else 0
+
+    def critical_path(self, graph=None):
+        """Return the critical path of the build.
+
+        The critical path is the chain of dependent edges with the longest
+        total duration.  Without a build graph, the path is approximated by
+        walking back from the last edge to finish, each time choosing the edge
+        that finished last before the current one started.
+
+        Args:
+            graph (dict, optional): The build graph as returned by
+                'ninjalog.read_graph'.
+
+        Returns:
+            list of NinjaLogEntry, in build order.
+        """
+        if not self.edges:
+            return []
+
+        if graph is None:
+            return self._approximate_critical_path()
+
+        by_output = {}
+        for e in self.edges:
+            for o in e.outputs:
+                by_output[o] = e
+
+        # Compute the longest path ending at each node (iteratively, as the
+        # dependency chains can be deeper than the Python recursion limit).
+        best = {}
+        for root in by_output:
+            stack = [(root, False)]
+            while stack:
+                node, expanded = stack.pop()
+                if node in best:
+                    continue
+                deps = graph.get(node, ())
+                if not expanded:
+                    stack.append((node, True))
+                    stack.extend((d, False) for d in deps if d not in best)
+                    continue
+
+                cost, via = 0, None
+                for d in deps:
+                    if d in best and best[d][0] > cost:
+                        cost, via = best[d][0], d
+                e = by_output.get(node)
+                best[node] = (cost + (e.duration if e else 0), via)
+
+        node = max(by_output, key=lambda o: best[o][0])
+        path = []
+        while node is not None:
+            e = by_output.get(node)
+            if e and (not path or path[-1] is not e):
+                path.append(e)
+            node = best[node][1]
+        return list(reversed(path))
+
+    def _approximate_critical_path(self):
+        by_end = sorted(self.edges, key=lambda e: e.end)
+        path = [by_end[-1]]
+        idx = len(by_end) - 1
+        while True:
+            cur = path[-1]
+            while idx >= 0 and by_end[idx].end > cur.start:
+                idx -= 1
+            if idx < 0:
+                break
+            path.append(by_end[idx])
+            idx -= 1
+        return list(reversed(path))
+
+    def slowest(self, kind, count):
+        """Return the 'count' slowest edges of the specified 'kind'."""
+        edges = [e for e in self.edges if edge_kind(e.output) == kind]
+        return sorted(edges, key=lambda e: e.duration, reverse=True)[:count]
+
+    def parallelism(self, interval=1000):
+        """Return the average number of running edges over time.
+
+        Args:
+            interval (int): The sampling interval in milliseconds.
+
+        Returns:
+            list of (time in seconds, average number of running edges)
+        """
+        buckets = collections.defaultdict(int)
+        for e in self.edges:
+            t = e.start
+            while t < e.end:
+                bucket = t // interval
+                bucket_end = min((bucket + 1) * interval, e.end)
+                buckets[bucket] += bucket_end - t
+                t = bucket_end
+
+        nbuckets = (self.total_time() + interval - 1) // interval
+        return [(b * interval / 1000.0, buckets[b] / float(interval))
+                for b in range(nbuckets)]
+
+    def package_totals(self):
+        """Return the total compile and link time per package.
+
+        Returns:
+            dict of package name to dict with the 'compile', 'link' and
+            'other' times in seconds and the number of 'edges'.
+        """
+        totals = {}
+        for e in self.edges:
+            package, _ = bde_names(e.output)
+            t = totals.setdefault(package, {'compile': 0.0,
+                                            'link': 0.0,
+                                            'other': 0.0,
+                                            'edges': 0})
+            t[edge_kind(e.output)] += e.duration / 1000.0
+            t['edges'] += 1
+        return totals
+
+    def to_dict(self, top=10, graph=None):
+        """Return the report as a JSON-serializable dict.
+
+        Args:
+            top (int): Number of the slowest compiles and links to report.
+            graph (dict, optional): The build graph used to compute the
+                critical path.
+        """
+        def edge_dict(e):
+            package, component = bde_names(e.output)
+            return {'output': e.output,
+                    'kind': edge_kind(e.output),
+                    'package': package,
+                    'component': component,
+                    'start': e.start / 1000.0,
+                    'duration': e.duration / 1000.0}
+
+        return {
+            'total_time': self.total_time() / 1000.0,
+            'edges': len(self.edges),
+            'critical_path': [edge_dict(e)
+                              for e in self.critical_path(graph)],
+            'slowest_compiles': [edge_dict(e)
+                                 for e in self.slowest('compile', top)],
+            'slowest_links': [edge_dict(e) for e in self.slowest('link', top)],
+            'parallelism': self.parallelism(),
+            'packages': self.package_totals()
+        }
+
+    def to_chrome_trace(self):
+        """Return the report in the Chrome trace event format.
+
+        Each edge is placed on the first free lane ('tid'), so that the lanes
+        reflect the build parallelism.
+        """
+        events = []
+        lanes = []
+        for e in sorted(self.edges, key=lambda e: e.start):
+            for tid, lane_end in enumerate(lanes):
+                if lane_end <= e.start:
+                    lanes[tid] = e.end
+                    break
+            else:
+                tid = len(lanes)
+                lanes.append(e.end)
+
+            package, component = bde_names(e.output)
+            events.append({'name': component or os.path.basename(e.output),
+                           'cat': edge_kind(e.output),
+                           'ph': 'X',
+                           'ts': e.start * 1000,
+                           'dur': e.duration * 1000,
+                           'pid': 0,
+                           'tid': tid,
+                           'args': {'output': e.output,
+                                    'package': package,
+                                    'component': component}})
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def print_summary(self, top=10, graph=None):
+        """Print a human readable summary of the report."""
+        def print_edges(title, edges):
+            print(title)
+            for e in edges:
+                print('  %8.2fs  %s' % (e.duration / 1000.0, e.output))
+
+        print('Build time: %.2fs (%d edges)' % (self.total_time() / 1000.0,
+                                                len(self.edges)))
+        print_edges('Critical path%s:' % ('' if graph else ' (approximate)'),
+                    self.critical_path(graph))
+        print_edges('Slowest compiles:', self.slowest('compile', top))
+        print_edges('Slowest links:', self.slowest('link', top))
+
+        print('Package totals:')
+        totals = self.package_totals()
+        for package in sorted(totals, key=lambda p: -totals[p]['compile']):
+            t = totals[package]
+            print('  %-20s compile %8.2fs  link %8.2fs  (%d edges)' %
+                  (package, t['compile'], t['link'], t['edges']))
+
+# -----------------------------------------------------------------------------
+# Copyright 2026 Bloomberg Finance L.P.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ----------------------------- END-OF-FILE -----------------------------------
@@ -1,14 +1,20 @@
 """Miscellaneous utilities
 """
 
+import functools
+import hashlib
+import json
 import os
 import platform
 import re
 import subprocess
 import sys
+import tempfile
 
 from bdebuild.common import blderror
 
+PLATFORM_CACHE_FILE = 'platform.json'
+
 
 def shell_command(cmd):
     """Execute and return the output of a shell command.
@@ -37,6 +43,162 @@ def find_program(program):
     return None
 
 
+def which(program, path=None):
+    """Return the full path to the first executable file with the specified
+    name on the PATH, or None.
+
+    Args:
+        program (str): The name of the executable.
+        path (str, optional): The search path (default: the PATH environment
+            variable).
+    """
+    if path is None:
+        path = os.environ.get('PATH', '')
+
+    for dir_ in path.split(os.pathsep):
+        exe_file = os.path.join(dir_.strip('"'), program)
+        if os.path.isfile(exe_file) and os.access(exe_file, os.X_OK):
+            return exe_file
+
+    return None
+
+
+def replace_file(src, dst):
+    """Rename a file, replacing the destination file if it exists.
+
+    The replacement is atomic on POSIX systems.  On Python 2 on Windows, where
+    a file cannot be renamed over an existing one, the destination file is
+    removed first.
+
+    Args:
+        src (str): The path to the file to rename.
+        dst (str): The path to the destination file.
+
+    Raises:
+        OSError
+    """
+    if hasattr(os, 'replace'):
+        os.replace(src, dst)
+        return
+
+    if sys.platform == 'win32' and os.path.exists(dst):
+        os.remove(dst)
+    os.rename(src, dst)
+
+
+def _memoize(func):
+    """Memoize the result of a function without arguments for the process.
+    """
+    results = []
+
+    @functools.wraps(func)
+    def wrapper():
+        if not results:
+            results.append(func())
+        return results[0]
+    return wrapper
+
+
+def get_cache_dir():
+    """Return the path to the cache directory of the tools.
+
+    This is $XDG_CACHE_HOME/bde-tools, where XDG_CACHE_HOME defaults to
+    ~/.cache.
+    """
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(
+        os.path.expanduser('~'), '.cache')
+    return os.path.join(cache_home, 'bde-tools')
+
+
+@_memoize
+def get_boot_key():
+    """Return a key identifying the current boot of the machine.
+
+    The key is made of the boot ID of the kernel where available (Linux), and
+    of the host name and kernel version.
+    """
+    try:
+        with open('/proc/sys/kernel/random/boot_id') as f:
+            boot_id = f.read().strip()
+    except (IOError, OSError):
+        boot_id = None
+
+    if hasattr(os, 'uname'):
+        kernel = list(os.uname())
+    elif hasattr(sys, 'getwindowsversion'):
+        kernel = [platform.node(), list(sys.getwindowsversion())[:5]]
+    else:
+        kernel = [platform.node()]
+    return hashlib.sha1(json.dumps([sys.platform, kernel, boot_id]).encode(
+        'utf-8')).hexdigest()
+
+
+_platform_outputs = None
+
+
+def platform_command_output(cmd):
+    """Return the output of a shell command describing the platform, e.g.
+    "uname -p".
+
+    The output of such a command cannot change until the machine reboots, so
+    it is memoized for the process and persisted in the cache directory,
+    keyed on the current boot (see 'get_boot_key').  Failures to read or
+    write the cache are ignored.
+
+    Args:
+        cmd (str or list of str): The shell command.
+    """
+    global _platform_outputs
+
+    path = os.path.join(get_cache_dir(), PLATFORM_CACHE_FILE)
+    if _platform_outputs is None:
+        _platform_outputs = {}
+        try:
+            with open(path) as f:
+                data = json.load(f)
+            if (data.get('boot') == get_boot_key() and
+                    isinstance(data.get('outputs'), dict)):
+                _platform_outputs = data['outputs']
+        except Exception:
+            pass
+
+    key = json.dumps(cmd)
+    if key in _platform_outputs:
+        out = _platform_outputs[key]
+        # The json module reads unicode strings on Python 2.
+        return out if isinstance(out, str) else out.encode('utf-8')
+
+    out = shell_command(cmd)
+    _platform_outputs[key] = out
+
+    tmp_path = None
+    try:
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path),
+                                        suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump({'boot': get_boot_key(),
+                       'outputs': _platform_outputs}, f)
+        replace_file(tmp_path, path)
+    except Exception:
+        try:
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        except OSError:
+            pass
+    return out
+
+
+def format_size(size):
+    """Return a human readable representation of a size in bytes."""
+    for unit in ['B', 'KiB', 'MiB', 'GiB']:
+        if size < 1024:
+            return '%.1f %s' % (size, unit) if unit != 'B' else '%d B' % size
+        size /= 1024.0
+    return '%.1f TiB' % size
+
+
 def is_int_string(str_):
     """Is a string a representation of a integer value.
     """
@@ -88,20 +250,124 @@ def unversioned_platform():
     return re.split('\d+$', s)[0]
 
 
+@_memoize
 def is_mingw_environment():
     """Return whether the current platform is win32 mingw.
 
     Note that mingw returns "win32" as the platform in other context (e.g.
     'unversioned_platform')
     """
-    try:
-        uname = shell_command('uname')
-    except Exception:
-        return False
+    # The shells of MSYS2, MinGW and Git for Windows set MSYSTEM.
+    if os.environ.get('MSYSTEM'):
+        return True
+
+    if hasattr(os, 'uname'):
+        uname = os.uname()[0]
+    else:
+        try:
+            uname = platform_command_output('uname')
+        except Exception:
+            return False
 
     return -1 != uname.find('MINGW') or -1 != uname.find('MSYS_NT')
 
 
+class Version(object):
+    """A parsed version string, e.g. "4.8.5".
+
+    Versions are compared component by component, the missing components
+    being zeros.  Integer components are compared numerically, and other
+    components only match if they are identical.  Instances are interned per
+    version string and are immutable, so a version string is only parsed once.
+
+    Attributes:
+        string (str): The version string.
+        key (tuple): The components of the version, as integers where
+            possible, without trailing zeros.
+        is_numeric (bool): Whether all components are integers.
+    """
+    __slots__ = ('string', 'key', 'is_numeric')
+
+    _interned = {}
+
+    def __new__(cls, string):
+        if isinstance(string, Version):
+            return string
+
+        version = cls._interned.get(string)
+        if version is not None:
+            return version
+
+        parts = []
+        for part in string.split('.'):
+            parts.append(int(part) if is_int_string(part) else part)
+        while parts and parts[-1] == 0:
+            parts.pop()
+
+        version = object.__new__(cls)
+        object.__setattr__(version, 'string', string)
+        object.__setattr__(version, 'key', tuple(parts))
+        object.__setattr__(version, 'is_numeric',
+                           all(isinstance(p, int) for p in parts))
+        return cls._interned.setdefault(string, version)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('Version objects are immutable')
+
+    def __reduce__(self):
+        return (Version, (self.string,))
+
+    def __eq__(self, other):
+        return isinstance(other, Version) and self.key == other.key
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __repr__(self):
+        return self.string
+
+    def compare(self, other):
+        """Compare this version with another one.
+
+        Returns:
+            -1, 0 or 1 if this version is respectively lower than, equal to or
+            greater than the other one, or None if they have different
+            non-integer components before the first different integer
+            component.
+        """
+        if self.is_numeric and other.is_numeric:
+            return (self.key > other.key) - (self.key < other.key)
+
+        a, b = self.key, other.key
+        for i in range(max(len(a), len(b))):
+            x = a[i] if i < len(a) else 0
+            y = b[i] if i < len(b) else 0
+            if x == y:
+                continue
+            if isinstance(x, int) and isinstance(y, int):
+                return -1 if x < y else 1
+            return None
+        return 0
+
+    def in_range(self, min_version=None, max_version=None):
+        """Determine whether this version is within a specified range.
+
+        Args:
+            min_version (Version, optional): The minimum allowed version.
+            max_version (Version, optional): The maximum allowed version.
+        """
+        if min_version is not None and \
+                self.compare(min_version) not in (0, 1):
+            return False
+        if max_version is not None and \
+                self.compare(max_version) not in (-1, 0):
+            return False
+        return True
+
+
 def match_version_strs(comp_str, match_min_str, match_max_str=None):
     """Determine whether a version string is within a specified range.
 
@@ -114,52 +380,9 @@ def match_version_strs(comp_str, match_min_str, match_max_str=None):
     Returns:
         True if the version being checked is in the specified range.
     """
-    comp_ver = comp_str.split('.')
-    if match_min_str:
-        min_ver = match_min_str.split('.')
-    else:
-        min_ver = comp_ver
-
-    if match_max_str:
-        max_ver = match_max_str.split('.')
-    else:
-        max_ver = comp_ver
-
-    ver_len = max(len(comp_ver), len(min_ver), len(max_ver))
-    for v in (comp_ver, min_ver, max_ver):
-        v.extend(['0'] * (ver_len - len(v)))
-
-    def gen_subvers():
-        i = 0
-        while i < ver_len:
-            yield comp_ver[i], min_ver[i], max_ver[i]
-            i += 1
-
-    if match_min_str:
-        for (comp_subv, min_subv, max_subv) in gen_subvers():
-            if any(not is_int_string(v) for v in
-                   (comp_subv, min_subv)):
-                if comp_subv != min_subv:
-                    return False
-            else:
-                if int(min_subv) < int(comp_subv):
-                    break
-                elif int(comp_subv) < int(min_subv):
-                    return False
-
-    if match_max_str:
-        for (comp_subv, min_subv, max_subv) in gen_subvers():
-            if any(not is_int_string(v) for v in
-                   (comp_subv, max_subv)):
-                if comp_subv != max_subv:
-                    return False
-            else:
-                if int(comp_subv) < int(max_subv):
-                    break
-                elif int(max_subv) < int(comp_subv):
-                    return False
-
-    return True
+    return Version(comp_str).in_range(
+        Version(match_min_str) if match_min_str else None,
+        Version(match_max_str) if match_max_str else None)
 
 
 class CompilerType:
@@ -211,8 +434,11 @@ def get_other_compiler(comp_path, comp_type):
     return os.path.join(dirname, comp_map[name] + tail)
 
 
+@_memoize
 def get_win32_os_info_from_cygwin():
     """Get operating system information for windows from cygwin.
+
+    The result is memoized for the process.
     """
 
     platform_str = unversioned_platform()
@@ -222,7 +448,7 @@ def get_win32_os_info_from_cygwin():
 
     os_type = 'windows'
     os_name = 'windows_nt'
-    out = shell_command('echo $(cmd /c ver)')
+    out = platform_command_output('echo $(cmd /c ver)')
 
     m = re.match(r'\s*Microsoft\s+Windows\s+\[Version\s+(\d+\.\d+)[^\]]+\]',
                  out)
@@ -240,9 +466,14 @@ def get_win32_os_info_from_cygwin():
     return os_type, os_name, cpu_type, os_ver
 
 
+@_memoize
 def get_os_info():
     """Return the operating system information part of the UPLID.
 
+    The result is memoized for the process.  The information is read with
+    'os.uname' and 'platform' where possible, and the commands run otherwise
+    are cached (see 'platform_command_output').
+
     Returns:
         os_type, os_name, cpu_type, os_ver
     """
@@ -264,7 +495,7 @@ def get_os_info():
     def get_aix_os_info():
         os_type = 'unix'
         os_name = 'aix'
-        cpu_type = shell_command(['/bin/uname', '-p']).rstrip()
+        cpu_type = platform_command_output(['/bin/uname', '-p']).rstrip()
         uname = os.uname()
         os_ver = '%s.%s' % (uname[3], uname[2])
 
@@ -273,7 +504,7 @@ def get_os_info():
     def get_sunos_os_info():
         os_type = 'unix'
         os_name = 'sunos'
-        cpu_type = shell_command(['/bin/uname', '-p']).rstrip()
+        cpu_type = platform_command_output(['/bin/uname', '-p']).rstrip()
         uname = os.uname()
         os_ver = uname[2]
 
@@ -0,0 +1,334 @@
+"""Dependency graph of the units of a BDE-style repository.
+
+The graph is built directly from the ``.mem`` and ``.dep`` metadata files,
+either at the level of units of release (package groups, standalone packages
+and applications) or at the level of packages.  Nodes are indexed by integers
+and the edges are stored as adjacency lists of indices, pointing from a node
+to the nodes it depends on.
+"""
+
+import collections
+
+from bdebuild.meta import repounits
+
+
+class NodeType(object):
+    """This class enumerates over the types of graph nodes.
+    """
+    PACKAGE_GROUP = 'package_group'
+    PACKAGE = 'package'
+    STANDALONE_PACKAGE = 'standalone_package'
+    APPLICATION = 'application'
+
+    PACKAGE_TYPE_MAP = {
+        repounits.PackageType.PACKAGE_GROUPED: PACKAGE,
+        repounits.PackageType.PACKAGE_STANDALONE: STANDALONE_PACKAGE,
+        repounits.PackageType.PACKAGE_APPLICATION: APPLICATION
+    }
+
+
+class DependencyGraph(object):
+    """This class represents a dependency graph.
+
+    Attributes:
+        names (list of str): Names of the nodes, by index.
+        types (list of str): Types of the nodes, by index.
+        deps (list of list of int): Indices of the dependencies of each node.
+        index (dict of str to int): Index of each node name.
+        external (dict of str to set of str): Dependencies that are not part
+            of the graph (e.g. units installed in the refroot), by node name.
+    """
+
+    def __init__(self):
+        self.names = []
+        self.types = []
+        self.deps = []
+        self.index = {}
+        self.external = collections.defaultdict(set)
+
+    def __len__(self):
+        return len(self.names)
+
+    def add_node(self, name, type_):
+        """Add a node and return its index.
+        """
+        if name in self.index:
+            return self.index[name]
+        self.index[name] = len(self.names)
+        self.names.append(name)
+        self.types.append(type_)
+        self.deps.append([])
+        return self.index[name]
+
+    def add_edge(self, name, dep_name):
+        """Add a dependency of the node 'name' on the node 'dep_name'.  The
+        dependency is recorded as external if there is no node 'dep_name'.
+        """
+        src = self.index[name]
+        dst = self.index.get(dep_name)
+        if dst is None:
+            self.external[name].add(dep_name)
+        elif dst not in self.deps[src]:
+            self.deps[src].append(dst)
+
+    def dependents(self):
+        """Return the indices of the dependents of each node."""
+        rdeps = [[] for _ in self.names]
+        for src, dsts in enumerate(self.deps):
+            for dst in dsts:
+                rdeps[dst].append(src)
+        return rdeps
+
+    def strongly_connected_components(self):
+        """Return the strongly connected components of the graph.
+
+        The components are returned in reverse topological order, i.e. each
+        component comes after all components it depends on.
+
+        Returns:
+            list of list of int
+        """
+        # Iterative version of Tarjan's algorithm.
+        index = [None] * len(self.names)
+        lowlink = [0] * len(self.names)
+        on_stack = [False] * len(self.names)
+        stack = []
+        sccs = []
+        counter = 0
+
+        for root in range(len(self.names)):
+            if index[root] is not None:
+                continue
+            work = [(root, 0)]
+            while work:
+                node, child_idx = work.pop()
+                if child_idx == 0:
+                    index[node] = lowlink[node] = counter
+                    counter += 1
+                    stack.append(node)
+                    on_stack[node] = True
+
+                recurse = False
+                children = self.deps[node]
+                while child_idx < len(children):
+                    child = children[child_idx]
+                    child_idx += 1
+                    if index[child] is None:
+                        work.append((node, child_idx))
+                        work.append((child, 0))
+                        recurse = True
+                        break
+                    elif on_stack[child]:
+                        lowlink[node] = min(lowlink[node], index[child])
+                if recurse:
+                    continue
+
+                if lowlink[node] == index[node]:
+                    scc = []
+                    while True:
+                        n = stack.pop()
+                        on_stack[n] = False
+                        scc.append(n)
+                        if n == node:
+                            break
+                    sccs.append(sorted(scc))
+
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+        return sccs
+
+    def cycles(self):
+        """Return the groups of nodes that depend on each other.
+
+        Returns:
+            list of list of str
+        """
+        return [[self.names[n] for n in scc]
+                for scc in self.strongly_connected_components()
+                if len(scc) > 1 or scc[0] in self.deps[scc[0]]]
+
+    def levels(self):
+        """Return the level of each node.
+
+        Nodes without dependencies are at level 1, and every other node is one
+        level above its highest dependency.  The nodes of a cycle share the
+        same level.
+
+        Returns:
+            list of int, by node index
+        """
+        levels = [0] * len(self.names)
+        for scc in self.strongly_connected_components():
+            members = set(scc)
+            level = 1 + max([levels[d] for n in scc for d in self.deps[n]
+                             if d not in members] or [0])
+            for n in scc:
+                levels[n] = level
+        return levels
+
+    def level_widths(self):
+        """Return the number of nodes on each level.
+
+        Returns:
+            dict of int to int
+        """
+        return dict(collections.Counter(self.levels()))
+
+    def longest_chain(self):
+        """Return the longest chain of dependencies, from the node that
+        depends on all others in the chain to the one without dependencies.
+
+        The nodes of a cycle count as a single link of the chain.
+
+        Returns:
+            list of str
+        """
+        if not self.names:
+            return []
+
+        length = [0] * len(self.names)
+        nxt = [None] * len(self.names)
+        for scc in self.strongly_connected_components():
+            members = set(scc)
+            best, via = 0, None
+            for n in scc:
+                for d in self.deps[n]:
+                    if d not in members and length[d] > best:
+                        best, via = length[d], d
+            for n in scc:
+                length[n] = best + 1
+                nxt[n] = via
+
+        node = max(range(len(self.names)), key=lambda n: length[n])
+        chain = []
+        while node is not None:
+            chain.append(self.names[node])
+            node = nxt[node]
+        return chain
+
+    def parallelism_ceiling(self):
+        """Return the upper bound of the speedup of building all nodes in
+        parallel over building them one by one, assuming all nodes take the
+        same time: the number of nodes divided by the length of the longest
+        chain.
+        """
+        chain = self.longest_chain()
+        return float(len(self.names)) / len(chain) if chain else 0.0
+
+    def to_dict(self):
+        """Return the graph and its analysis as a JSON-serializable dict."""
+        levels = self.levels()
+        widths = self.level_widths()
+        return {
+            'nodes': [{'name': name,
+                       'type': self.types[i],
+                       'level': levels[i],
+                       'dependencies': sorted(self.names[d]
+                                              for d in self.deps[i]),
+                       'external_dependencies': sorted(
+                           self.external.get(name, ()))}
+                      for i, name in enumerate(self.names)],
+            'cycles': self.cycles(),
+            'levels': max(levels) if levels else 0,
+            'level_widths': widths,
+            'max_level_width': max(widths.values()) if widths else 0,
+            'longest_chain': self.longest_chain(),
+            'parallelism_ceiling': self.parallelism_ceiling()
+        }
+
+    def to_dot(self, name='dependencies'):
+        """Return the graph in the GraphViz dot format, with the nodes of the
+        same level on the same rank.
+        """
+        levels = self.levels()
+        lines = ['digraph "%s" {' % name,
+                 '    rankdir=BT;',
+                 '    node [shape=box];']
+
+        by_level = collections.defaultdict(list)
+        for i, level in enumerate(levels):
+            by_level[level].append(i)
+        for level in sorted(by_level):
+            lines.append('    { rank=same; %s }' %
+                         ' '.join('"%s";' % self.names[i]
+                                  for i in sorted(by_level[level])))
+
+        for i, dsts in enumerate(self.deps):
+            for d in sorted(dsts):
+                lines.append('    "%s" -> "%s";' % (self.names[i],
+                                                    self.names[d]))
+        lines.append('}')
+        return '\n'.join(lines) + '\n'
+
+
+def build_uor_graph(repo):
+    """Build the dependency graph of the units of release of a repository.
+
+    Args:
+        repo (RepoContext): The repository.
+
+    Returns:
+        DependencyGraph
+    """
+    graph = DependencyGraph()
+    for name in sorted(repo.package_groups):
+        graph.add_node(name, NodeType.PACKAGE_GROUP)
+    for name in sorted(repo.packages):
+        package = repo.packages[name]
+        if not package.group:
+            graph.add_node(name, NodeType.PACKAGE_TYPE_MAP[package.type_])
+
+    for name in graph.names:
+        for dep in sorted(repo.uor_dep(name)):
+            graph.add_edge(name, dep)
+    return graph
+
+
+def build_package_graph(repo):
+    """Build the dependency graph of the packages of a repository.
+
+    A grouped package depends on the packages of its group listed in its
+    '.dep' file and on all packages of the units of release its group depends
+    on.
+
+    Args:
+        repo (RepoContext): The repository.
+
+    Returns:
+        DependencyGraph
+    """
+    graph = DependencyGraph()
+    for name in sorted(repo.packages):
+        package = repo.packages[name]
+        graph.add_node(name, NodeType.PACKAGE_TYPE_MAP[package.type_])
+
+    for name in graph.names:
+        package = repo.packages[name]
+        if package.group:
+            for dep in sorted(package.dep):
+                graph.add_edge(name, dep)
+        uor_name = package.uor_name
+        for dep in sorted(repo.uor_dep(uor_name)):
+            dep_packages = repo.uor_packages(dep)
+            if not dep_packages:
+                graph.add_edge(name, dep)
+            for dep_package in dep_packages:
+                graph.add_edge(name, dep_package.name)
+    return graph
+
+# -----------------------------------------------------------------------------
+# Copyright 2026 Bloomberg Finance L.P.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ----------------------------- END-OF-FILE -----------------------------------
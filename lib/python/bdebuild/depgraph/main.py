@@ -0,0 +1,127 @@
+"""Export and analyze the dependency graph of BDE-style repositories.
+"""
+
+from __future__ import print_function
+
+import argparse
+import json
+import os
+import sys
+
+from bdebuild.common import blderror
+from bdebuild.depgraph import graph
+from bdebuild.meta import repoloadutil
+
+
+def main():
+    """Print the dependency graph of the repositories in the specified source
+    directory in the requested format.  Exit with a return code 1 if the
+    metadata cannot be loaded, or if '--check' is specified and the graph has
+    cycles.
+    """
+    args = get_cmdline_options().parse_args()
+
+    try:
+        roots = repoloadutil.find_project_roots(args.source_dir)
+        repo = repoloadutil.load_repo(roots)
+    except blderror.BldError as e:
+        print('Error: %s' % e, file=sys.stderr)
+        sys.exit(1)
+
+    if args.level == 'uor':
+        dep_graph = graph.build_uor_graph(repo)
+    else:
+        dep_graph = graph.build_package_graph(repo)
+
+    if args.format == 'json':
+        output = json.dumps(dep_graph.to_dict(), indent=1, sort_keys=True)
+    elif args.format == 'dot':
+        output = dep_graph.to_dot()
+    else:
+        output = format_summary(dep_graph)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    else:
+        print(output, end='' if output.endswith('\n') else '\n')
+
+    if args.check and dep_graph.cycles():
+        sys.exit(1)
+
+
+def get_cmdline_options():
+    """Get the command line options.
+
+    Returns:
+        ArgumentParser
+    """
+    parser = argparse.ArgumentParser(
+        prog=os.path.basename(sys.argv[0]),
+        description='Export and analyze the dependency graph of the package '
+                    'groups and packages of BDE-style repositories, using '
+                    'their .mem and .dep metadata files.')
+    parser.add_argument('source_dir', nargs='?', default=os.getcwd(),
+                        help='Path to a repository or to a workspace of '
+                             'repositories (default: current directory).')
+    parser.add_argument('-l', '--level', choices=['uor', 'package'],
+                        default='uor',
+                        help='Build the graph of the units of release or of '
+                             'the packages (default: uor).')
+    parser.add_argument('-f', '--format', choices=['summary', 'json', 'dot'],
+                        default='summary',
+                        help='Output format (default: summary).')
+    parser.add_argument('-o', '--output',
+                        help='Write the output to the specified file.')
+    parser.add_argument('--check', action='store_true',
+                        help='Exit with an error if the graph has cycles.')
+    return parser
+
+
+def format_summary(dep_graph):
+    """Return a human readable summary of the analysis of the graph."""
+    levels = dep_graph.levels()
+    widths = dep_graph.level_widths()
+    chain = dep_graph.longest_chain()
+    cycles = dep_graph.cycles()
+
+    lines = ['Nodes: %d' % len(dep_graph),
+             'Levels: %d' % (max(levels) if levels else 0)]
+    for level in sorted(widths):
+        names = sorted(dep_graph.names[i] for i, l in enumerate(levels)
+                       if l == level)
+        lines.append('  %3d: %s' % (level, ' '.join(names)))
+
+    lines.append('Longest dependency chain (%d): %s' %
+                 (len(chain), ' -> '.join(chain)))
+    lines.append('Build parallelism ceiling: %.2f (widest level: %d)' %
+                 (dep_graph.parallelism_ceiling(),
+                  max(widths.values()) if widths else 0))
+
+    external = sorted(set(d for deps in dep_graph.external.values()
+                          for d in deps))
+    if external:
+        lines.append('External dependencies: %s' % ' '.join(external))
+
+    if cycles:
+        lines.append('Cycles:')
+        lines.extend('  %s' % ' '.join(c) for c in cycles)
+    else:
+        lines.append('Cycles: none')
+    return '\n'.join(lines) + '\n'
+
+# -----------------------------------------------------------------------------
+# Copyright 2026 Bloomberg Finance L.P.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ----------------------------- END-OF-FILE -----------------------------------
@@ -0,0 +1,165 @@
+"""Query the diagnostics captured during a build.
+"""
+
+from __future__ import print_function
+
+import argparse
+import collections
+import json
+import os
+import re
+import sys
+
+from bdebuild.diagnostics import store
+
+
+def main():
+    """Print the diagnostics of a build directory matching the command line
+    filters.  Exit with a return code 1 if there is no diagnostics store in
+    the build directory.
+    """
+    args = get_cmdline_options().parse_args()
+
+    build_dir = args.build_dir or os.getenv('BDE_CMAKE_BUILD_DIR')
+    if not build_dir:
+        print('Error: The build directory was not specified using either a '
+              'command-line argument or environment variable '
+              'BDE_CMAKE_BUILD_DIR', file=sys.stderr)
+        sys.exit(1)
+
+    diag_store = store.DiagnosticsStore.from_build_dir(build_dir)
+    if not os.path.isfile(diag_store.path):
+        print('Error: Cannot find %s. Configure the build with the '
+              '"--diagnostics" option of cmake_build.py.' % diag_store.path,
+              file=sys.stderr)
+        sys.exit(1)
+
+    records = diag_store.read() if args.all_runs else diag_store.current()
+    records = [r for r in records if matches(r, args)]
+
+    if args.no_dedupe:
+        entries = [(r, [r['source']] if r.get('source') else [])
+                   for r in records]
+    else:
+        entries = store.dedupe(records)
+
+    if args.format == 'json':
+        print(json.dumps([dict(r, sources=sources) for r, sources in entries],
+                         indent=1, sort_keys=True))
+    elif args.format == 'summary':
+        print_summary(entries, len(records))
+    else:
+        for record, sources in entries:
+            print(format_record(record, sources))
+
+
+def get_cmdline_options():
+    """Get the command line options.
+
+    Returns:
+        ArgumentParser
+    """
+    parser = argparse.ArgumentParser(
+        prog=os.path.basename(sys.argv[0]),
+        description='Query the compiler diagnostics captured during a build '
+                    'configured with "cmake_build.py --diagnostics". The '
+                    'diagnostics reported for a header by several translation '
+                    'units are only listed once.')
+    parser.add_argument('--build_dir',
+                        help='Path to the build directory (default: the '
+                             'BDE_CMAKE_BUILD_DIR environment variable).')
+    parser.add_argument('-s', '--severity', action='append',
+                        choices=['warning', 'error', 'fatal error'],
+                        help='Only list diagnostics of the specified severity '
+                             '(can be repeated).')
+    parser.add_argument('-p', '--package', action='append',
+                        help='Only list diagnostics in the components of the '
+                             'specified package or package group (can be '
+                             'repeated).')
+    parser.add_argument('--file', type=re.compile,
+                        help='Only list diagnostics in files matching the '
+                             'specified regular expression.')
+    parser.add_argument('--flag', action='append',
+                        help='Only list diagnostics reported with the '
+                             'specified warning flag or code (e.g. '
+                             '"--flag=-Wunused-variable" or "--flag=C4996").')
+    parser.add_argument('-f', '--format', choices=['text', 'json', 'summary'],
+                        default='text',
+                        help='Output format (default: text).')
+    parser.add_argument('--no-dedupe', action='store_true',
+                        help='List every diagnostic as reported by each '
+                             'command.')
+    parser.add_argument('--all-runs', action='store_true',
+                        help='Include the diagnostics of earlier runs of the '
+                             'commands.')
+    return parser
+
+
+def package_name(path):
+    """Return the name of the package of a BDE component file, or None."""
+    if not path:
+        return None
+    stem = os.path.basename(path).split('.')[0]
+    return stem.split('_')[0] if '_' in stem else None
+
+
+def matches(record, args):
+    if args.severity and record['severity'] not in args.severity:
+        return False
+    if args.package:
+        package = package_name(record['file'])
+        if not package or not any(package == p or
+                                  (len(p) == 3 and package.startswith(p))
+                                  for p in args.package):
+            return False
+    if args.file and not args.file.search(record['file'] or ''):
+        return False
+    if args.flag and not set(args.flag) & set(record['flags']):
+        return False
+    return True
+
+
+def format_record(record, sources):
+    location = record['file'] or '<unknown>'
+    if record['line']:
+        location += ':%d' % record['line']
+        if record['column']:
+            location += ':%d' % record['column']
+
+    lines = ['%s: %s: %s%s' % (location, record['severity'],
+                               record['message'],
+                               ' [%s]' % ','.join(record['flags'])
+                               if record['flags'] else '')]
+    lines.extend('    note: %s' % note for note in record['notes'])
+    if len(sources) > 1:
+        lines.append('    (reported by %d translation units)' % len(sources))
+    return '\n'.join(lines)
+
+
+def print_summary(entries, total):
+    print('%d diagnostics (%d before deduplication)' % (len(entries), total))
+
+    for title, key in [
+            ('By severity:', lambda r: r['severity']),
+            ('By package:', lambda r: package_name(r['file']) or '<other>'),
+            ('By flag:', lambda r: ','.join(r['flags']) or '<none>')]:
+        counts = collections.Counter(key(r) for r, _ in entries)
+        print(title)
+        for name, count in counts.most_common():
+            print('  %6d  %s' % (count, name))
+
+# -----------------------------------------------------------------------------
+# Copyright 2026 Bloomberg Finance L.P.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ----------------------------- END-OF-FILE -----------------------------------
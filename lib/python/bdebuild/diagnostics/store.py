@@ -0,0 +1,231 @@
+"""Structured compiler diagnostics.
+
+The wafstyleout launcher parses the output of the compiles and links that
+print something into diagnostic records and appends them to a build-wide
+store, a file of JSON records (one per line) in the build directory.  Several
+launchers may append to the store at the same time, so every append is done
+under an exclusive lock.
+
+Each record has the following fields:
+
+- file, line, column: Location of the diagnostic (None if unknown).
+- severity: 'warning', 'error', 'fatal error' or, for output that cannot be
+  parsed, the marker of the wafstyleout report ('warning' or 'error').
+- message: The diagnostic message.
+- flags: The warning flags (e.g. '-Wunused-variable') or MSVC codes (e.g.
+  'C4996') reported with the diagnostic.
+- notes: The notes that follow the diagnostic.
+- source, output: The input and output of the command.
+- time: When the record was appended.
+"""
+
+import json
+import os
+import re
+import time
+
+if os.name == 'nt':
+    import msvcrt
+else:
+    import fcntl
+
+STORE_FILE = 'bde_diagnostics.jsonl'
+
+_GCC_RE = re.compile(r'^(?P<file>(?:[A-Za-z]:)?[^:]+):(?P<line>\d+):'
+                     r'(?:(?P<column>\d+):)?\s*'
+                     r'(?P<severity>warning|error|fatal error|note):\s*'
+                     r'(?P<message>.*)$')
+_GCC_FLAGS_RE = re.compile(r'\s*\[(?P<flags>-W[^\]]*)\]$')
+_MSVC_RE = re.compile(r'^(?P<file>.+?)\((?P<line>\d+)(?:,(?P<column>\d+))?\)'
+                      r'\s*:\s*(?P<severity>warning|error|fatal error|note)'
+                      r'\s*(?P<code>[A-Z]+\d+)?\s*:\s*(?P<message>.*)$')
+_MAX_UNPARSED_MESSAGE = 4096
+
+
+def parse(text, cwd=None):
+    """Parse the diagnostics printed by GCC, Clang or MSVC.
+
+    Args:
+        text (str): The output of the compiler.
+        cwd (str, optional): The directory relative paths are relative to.
+
+    Returns:
+        list of dict with the 'file', 'line', 'column', 'severity',
+        'message', 'flags' and 'notes' fields.
+    """
+    records = []
+    for line in text.splitlines():
+        m = _GCC_RE.match(line) or _MSVC_RE.match(line.strip())
+        if not m:
+            continue
+
+        message = m.group('message').strip()
+        flags = []
+        if 'code' in m.groupdict():
+            if m.group('code'):
+                flags.append(m.group('code'))
+        else:
+            fm = _GCC_FLAGS_RE.search(message)
+            if fm:
+                flags = fm.group('flags').split(',')
+                message = message[:fm.start()]
+
+        path = m.group('file').strip()
+        if cwd and not os.path.isabs(path):
+            path = os.path.normpath(os.path.join(cwd, path))
+
+        if m.group('severity') == 'note':
+            if records:
+                records[-1]['notes'].append('%s:%s: %s' % (
+                    path, m.group('line'), message))
+            continue
+
+        records.append({'file': path,
+                        'line': int(m.group('line')),
+                        'column': (int(m.group('column'))
+                                   if m.group('column') else None),
+                        'severity': m.group('severity'),
+                        'message': message,
+                        'flags': flags,
+                        'notes': []})
+    return records
+
+
+def unparsed_record(text, severity):
+    """Return a record holding output that contains no parsable diagnostic
+    (e.g. linker errors).
+    """
+    return {'file': None,
+            'line': None,
+            'column': None,
+            'severity': severity,
+            'message': text.strip()[:_MAX_UNPARSED_MESSAGE],
+            'flags': [],
+            'notes': []}
+
+
+class DiagnosticsStore(object):
+    """A build-wide store of diagnostic records.
+
+    Attributes:
+        path (str): Path to the store file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    @classmethod
+    def from_build_dir(cls, build_dir):
+        return cls(os.path.join(build_dir, STORE_FILE))
+
+    def _lock(self, f):
+        if os.name == 'nt':
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        else:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+
+    def _unlock(self, f):
+        if os.name == 'nt':
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    def append(self, records, source=None, output=None):
+        """Append the records of a single command to the store.
+
+        Args:
+            records (list of dict): The records to append.
+            source (str, optional): The input of the command.
+            output (str, optional): The output of the command.
+        """
+        now = time.time()
+        lines = []
+        for record in records:
+            record = dict(record, source=source, output=output, time=now)
+            lines.append(json.dumps(record, sort_keys=True) + '\n')
+
+        with open(self.path + '.lock', 'a') as lock:
+            self._lock(lock)
+            try:
+                with open(self.path, 'a') as f:
+                    f.write(''.join(lines))
+            finally:
+                self._unlock(lock)
+
+    def read(self):
+        """Return all records of the store, skipping corrupted lines."""
+        records = []
+        if not os.path.isfile(self.path):
+            return records
+        with open(self.path) as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+        return records
+
+    def current(self):
+        """Return the records reported by the latest run of each command.
+
+        Records of a command whose output was rebuilt later without printing
+        anything are dropped.
+        """
+        all_records = self.read()
+        latest = {}
+        for record in all_records:
+            key = record.get('output') or record.get('source')
+            if key not in latest or record['time'] > latest[key]:
+                latest[key] = record['time']
+
+        records = []
+        for record in all_records:
+            key = record.get('output') or record.get('source')
+            if record['time'] != latest[key]:
+                continue
+            output = record.get('output')
+            if (output and os.path.exists(output) and
+                    os.path.getmtime(output) > record['time'] + 1):
+                continue
+            records.append(record)
+        return records
+
+
+def dedupe(records):
+    """Merge the records of the same diagnostic reported by several commands
+    (e.g. a warning in a header included by many translation units).
+
+    Returns:
+        list of (record, list of sources reporting it), in the order the
+        diagnostics were first reported.
+    """
+    merged = {}
+    order = []
+    for record in records:
+        key = (record['file'], record['line'], record['column'],
+               record['severity'], record['message'])
+        if key not in merged:
+            merged[key] = (record, [])
+            order.append(key)
+        source = record.get('source')
+        if source and source not in merged[key][1]:
+            merged[key][1].append(source)
+    return [merged[key] for key in order]
+
+# -----------------------------------------------------------------------------
+# Copyright 2026 Bloomberg Finance L.P.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ----------------------------- END-OF-FILE -----------------------------------
@@ -0,0 +1,165 @@
+"""Include graph of the translation units of a build.
+
+The graph is the union of the include hierarchies of all translation units,
+with an edge from each file to the files it includes directly.  For each
+header, the following costs are computed:
+
+- fan-in: The number of translation units including the header (directly or
+  not), i.e. recompiled when the header changes.
+- own bytes: The number of preprocessed bytes of the header itself.
+- subtree bytes: The number of preprocessed bytes of the header and of all
+  headers it includes (directly or not) according to the graph.
+- rebuild bytes: The number of preprocessed bytes of all translation units
+  including the header, which are parsed again when the header changes.
+- inclusion bytes: The number of preprocessed bytes parsed in the whole build
+  because of the header, estimated as its fan-in times its subtree bytes.
+"""
+
+from bdebuild.depgraph import graph as depgraph
+
+
+class HeaderCost(object):
+    """The inclusion costs of a header (see the module documentation).
+
+    Attributes:
+        path (str): Path of the header.
+        fan_in (int): Number of translation units including the header.
+        includers (int): Number of files including the header directly.
+        own_bytes (int): Preprocessed bytes of the header.
+        subtree_bytes (int): Preprocessed bytes of the header and of all
+            headers it includes.
+        rebuild_bytes (int): Preprocessed bytes of the translation units
+            including the header.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.fan_in = 0
+        self.includers = 0
+        self.own_bytes = 0
+        self.subtree_bytes = 0
+        self.rebuild_bytes = 0
+
+    @property
+    def inclusion_bytes(self):
+        return self.fan_in * self.subtree_bytes
+
+    def to_dict(self):
+        return {'path': self.path,
+                'fan_in': self.fan_in,
+                'includers': self.includers,
+                'own_bytes': self.own_bytes,
+                'subtree_bytes': self.subtree_bytes,
+                'rebuild_bytes': self.rebuild_bytes,
+                'inclusion_bytes': self.inclusion_bytes}
+
+
+class IncludeGraph(object):
+    """The include graph of the translation units of a build.
+
+    Attributes:
+        graph (DependencyGraph): The files, with an edge from each file to
+            the files it includes directly.
+        own_bytes (dict of str to int): Preprocessed bytes of each file.
+        units (dict of str to int): Preprocessed bytes of each translation
+            unit, by source path.
+        unit_files (dict of str to set of str): The files of each translation
+            unit, by source path.
+        errors (dict of str to str): The error of the translation units that
+            could not be scanned.
+    """
+
+    def __init__(self):
+        self.graph = depgraph.DependencyGraph()
+        self.own_bytes = {}
+        self.units = {}
+        self.unit_files = {}
+        self.errors = {}
+
+    @classmethod
+    def from_scans(cls, results):
+        """Build the include graph from the results of the scans.
+
+        Args:
+            results (dict of str to dict): The results of the scans, by
+                source path (see 'scan.scan').
+        """
+        graph = cls()
+        for source in sorted(results):
+            result = results[source]
+            if result['error']:
+                graph.errors[source] = result['error']
+                continue
+            for path in result['includes']:
+                graph.graph.add_node(path, 'file')
+            for path, included in result['includes'].items():
+                for dep in included:
+                    graph.graph.add_edge(path, dep)
+            for path, size in result['bytes'].items():
+                graph.own_bytes[path] = max(size,
+                                            graph.own_bytes.get(path, 0))
+            graph.units[source] = sum(result['bytes'].values())
+            graph.unit_files[source] = set(result['includes']) - set([source])
+        return graph
+
+    def header_costs(self):
+        """Return the costs of all headers.
+
+        Returns:
+            list of HeaderCost
+        """
+        names = self.graph.names
+        costs = dict((path, HeaderCost(path)) for path in names
+                     if path not in self.units)
+
+        for source, files in self.unit_files.items():
+            for path in files:
+                cost = costs.get(path)
+                if cost:
+                    cost.fan_in += 1
+                    cost.rebuild_bytes += self.units[source]
+
+        for deps in self.graph.deps:
+            for d in deps:
+                cost = costs.get(names[d])
+                if cost:
+                    cost.includers += 1
+
+        # The set of files reachable from each file is computed as a bit set,
+        # in reverse topological order of the strongly connected components.
+        reach = [0] * len(names)
+        for scc in self.graph.strongly_connected_components():
+            mask = 0
+            for n in scc:
+                mask |= 1 << n
+                for d in self.graph.deps[n]:
+                    mask |= reach[d]
+            for n in scc:
+                reach[n] = mask
+
+        sizes = [self.own_bytes.get(path, 0) for path in names]
+        for n, path in enumerate(names):
+            cost = costs.get(path)
+            if not cost:
+                continue
+            cost.own_bytes = sizes[n]
+            bits = bin(reach[n])[:1:-1]
+            cost.subtree_bytes = sum(sizes[i] for i, bit in enumerate(bits)
+                                     if bit == '1')
+        return list(costs.values())
+
+# -----------------------------------------------------------------------------
+# Copyright 2026 Bloomberg Finance L.P.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ----------------------------- END-OF-FILE -----------------------------------
@@ -0,0 +1,135 @@
+"""Rank the headers of a build by their inclusion cost.
+"""
+
+from __future__ import print_function
+
+import argparse
+import json
+import os
+import re
+import sys
+
+from bdebuild.common import blderror
+from bdebuild.common import sysutil
+from bdebuild.includegraph import graph
+from bdebuild.includegraph import scan
+
+
+def main():
+    """Scan the translation units of a build directory and print the headers
+    with the highest inclusion costs.  Exit with a return code 1 if there is
+    no compilation database in the build directory.
+    """
+    args = get_cmdline_options().parse_args()
+
+    build_dir = args.build_dir or os.getenv('BDE_CMAKE_BUILD_DIR')
+    if not build_dir:
+        print('Error: The build directory was not specified using either a '
+              'command-line argument or environment variable '
+              'BDE_CMAKE_BUILD_DIR', file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        units = scan.read_compile_commands(build_dir)
+    except blderror.BldError as e:
+        print('Error: %s' % e, file=sys.stderr)
+        sys.exit(1)
+
+    cache = None if args.no_cache else scan.ScanCache(build_dir)
+    results, scanned = scan.scan_all(units, cache, args.jobs)
+    if cache:
+        cache.save()
+
+    include_graph = graph.IncludeGraph.from_scans(results)
+    costs = include_graph.header_costs()
+    if args.match:
+        costs = [c for c in costs if args.match.search(c.path)]
+
+    by_rebuild = sorted(costs, key=lambda c: (-c.rebuild_bytes, c.path))
+    by_inclusion = sorted(costs, key=lambda c: (-c.inclusion_bytes, c.path))
+
+    if args.format == 'json':
+        print(json.dumps({
+            'units': len(include_graph.units),
+            'scanned_units': scanned,
+            'preprocessed_bytes': sum(include_graph.units.values()),
+            'errors': include_graph.errors,
+            'rebuild': [c.to_dict() for c in by_rebuild[:args.top]],
+            'inclusion': [c.to_dict() for c in by_inclusion[:args.top]]},
+            indent=1, sort_keys=True))
+        return
+
+    total = sum(include_graph.units.values())
+    print('%d translation units (%d scanned), %d headers, %s preprocessed '
+          '(%s per translation unit)' % (
+              len(include_graph.units), scanned, len(costs),
+              sysutil.format_size(total),
+              sysutil.format_size(total // max(len(include_graph.units), 1))))
+    for source, error in sorted(include_graph.errors.items()):
+        print('Cannot scan %s: %s' % (source, error.splitlines()[-1]
+                                       if error else ''))
+
+    print('\nHeaders triggering the most recompilation:')
+    print('  %8s %12s  %s' % ('fan-in', 'rebuild', 'header'))
+    for c in by_rebuild[:args.top]:
+        print('  %8d %12s  %s' % (c.fan_in,
+                                  sysutil.format_size(c.rebuild_bytes),
+                                  c.path))
+
+    print('\nHeaders with the highest inclusion cost:')
+    print('  %8s %12s %12s  %s' % ('fan-in', 'subtree', 'total', 'header'))
+    for c in by_inclusion[:args.top]:
+        print('  %8d %12s %12s  %s' % (c.fan_in,
+                                       sysutil.format_size(c.subtree_bytes),
+                                       sysutil.format_size(c.inclusion_bytes),
+                                       c.path))
+
+
+def get_cmdline_options():
+    """Get the command line options.
+
+    Returns:
+        ArgumentParser
+    """
+    parser = argparse.ArgumentParser(
+        prog=os.path.basename(sys.argv[0]),
+        description='Preprocess the translation units of the '
+                    'compile_commands.json of a build directory in parallel, '
+                    'and rank the headers by the recompilation their changes '
+                    'trigger and by their total inclusion cost. The scans are '
+                    'cached in the build directory.')
+    parser.add_argument('--build_dir',
+                        help='Path to the build directory (default: the '
+                             'BDE_CMAKE_BUILD_DIR environment variable).')
+    parser.add_argument('-j', '--jobs', type=int, default=0,
+                        help='Number of worker processes (default: number of '
+                             'CPUs).')
+    parser.add_argument('--top', type=int, default=20,
+                        help='Number of headers listed in each ranking '
+                             '(default: 20).')
+    parser.add_argument('--match', type=re.compile,
+                        help='Only rank the headers whose path matches the '
+                             'specified regular expression.')
+    parser.add_argument('-f', '--format', choices=['summary', 'json'],
+                        default='summary',
+                        help='Output format (default: summary).')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Scan all translation units, ignoring and not '
+                             'updating the cache.')
+    return parser
+
+# -----------------------------------------------------------------------------
+# Copyright 2026 Bloomberg Finance L.P.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ----------------------------- END-OF-FILE -----------------------------------
@@ -0,0 +1,303 @@
+"""Scan the headers included by the translation units of a build.
+
+Each translation unit of the ``compile_commands.json`` of a build directory is
+preprocessed with its own compile command, printing the included headers
+(``-H`` with GCC and Clang, ``/showIncludes`` with MSVC).  The result of a
+scan records the headers each file includes directly and the number of
+preprocessed bytes each file contributes to the translation unit, which is
+measured from the line markers of the preprocessed output.
+
+Scans are cached in the build directory, and a translation unit is only
+scanned again if its command changed or if the modification time of its
+source or of one of the headers it included changed.
+"""
+
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+import shlex
+import subprocess
+import threading
+
+from bdebuild.common import blderror
+from bdebuild.common import sysutil
+
+CACHE_FILE = 'bde_includegraph.json'
+CACHE_VERSION = 1
+
+_GCC_LINE_MARKER_RE = re.compile(r'^# \d+ "(?P<file>.*)"')
+_MSVC_LINE_MARKER_RE = re.compile(r'^#line \d+ "(?P<file>.*)"')
+_GCC_INCLUDE_RE = re.compile(r'^(?P<depth>\.+)[!x]? (?P<file>.+)$')
+_MSVC_INCLUDE_RE = re.compile(r'^Note: including file:(?P<indent> +)'
+                              r'(?P<file>.+)$')
+
+# Arguments of the compile commands that are dropped when preprocessing,
+# mapped to whether the following argument (their value) is dropped too.
+_DROPPED_ARGS = {'-c': False, '-o': True, '-MD': False, '-MMD': False,
+                 '-MT': True, '-MQ': True, '-MF': True, '/c': False}
+_DROPPED_PREFIXES = ('/Fo', '-Fo', '/Fd', '/showIncludes', '-MF', '-MT')
+
+
+class TranslationUnit(object):
+    """A translation unit of the compilation database.
+
+    Attributes:
+        source (str): Absolute path of the source file.
+        cwd (str): Working directory of the command.
+        args (list of str): The compile command.
+    """
+
+    def __init__(self, source, cwd, args):
+        self.source = source
+        self.cwd = cwd
+        self.args = args
+
+    @property
+    def is_msvc(self):
+        tool = os.path.basename(self.args[0]).lower()
+        return tool in ('cl', 'cl.exe', 'clang-cl', 'clang-cl.exe')
+
+    @property
+    def command_hash(self):
+        return hashlib.sha1(json.dumps([self.cwd] + self.args).encode(
+            'utf-8')).hexdigest()
+
+    def preprocess_args(self):
+        """Return the command preprocessing the translation unit."""
+        args = [self.args[0]]
+        skip = False
+        for arg in self.args[1:]:
+            if skip:
+                skip = False
+                continue
+            if arg in _DROPPED_ARGS:
+                skip = _DROPPED_ARGS[arg]
+                continue
+            if arg.startswith(_DROPPED_PREFIXES):
+                continue
+            args.append(arg)
+        if self.is_msvc:
+            return args + ['/E', '/showIncludes']
+        return args + ['-E', '-H']
+
+
+def read_compile_commands(build_dir):
+    """Return the translation units of the compilation database of a build
+    directory.
+
+    Raises:
+        MissingFileError: There is no compilation database.
+    """
+    path = os.path.join(build_dir, 'compile_commands.json')
+    if not os.path.isfile(path):
+        raise blderror.MissingFileError(
+            'Cannot find %s. Configure the build with cmake_build.py.' % path)
+    with open(path) as f:
+        entries = json.load(f)
+
+    units = []
+    for entry in entries:
+        cwd = entry['directory']
+        args = entry.get('arguments') or shlex.split(entry['command'],
+                                                     posix=os.name != 'nt')
+        units.append(TranslationUnit(
+            os.path.normpath(os.path.join(cwd, entry['file'])), cwd, args))
+    return units
+
+
+def _norm(path, cwd):
+    return os.path.normpath(os.path.join(cwd, path.strip()))
+
+
+def parse_includes(text, source, cwd, msvc=False):
+    """Parse the include hierarchy printed by the compiler.
+
+    Returns:
+        dict of file path to the list of the files it includes directly, in
+        include order.
+    """
+    includes = {source: []}
+    stack = [source]
+    for line in text.splitlines():
+        if msvc:
+            m = _MSVC_INCLUDE_RE.match(line)
+            depth = len(m.group('indent')) if m else 0
+        else:
+            m = _GCC_INCLUDE_RE.match(line)
+            depth = len(m.group('depth')) if m else 0
+        if not m:
+            continue
+
+        path = _norm(m.group('file'), cwd)
+        del stack[depth:]
+        parent = stack[-1]
+        if path not in includes[parent]:
+            includes[parent].append(path)
+        includes.setdefault(path, [])
+        stack.append(path)
+    return includes
+
+
+def count_preprocessed_bytes(stream, cwd, msvc=False):
+    """Count the preprocessed bytes contributed by each file, using the line
+    markers of the preprocessed output read from a binary stream.
+
+    Returns:
+        dict of file path to number of bytes
+    """
+    marker_re = _MSVC_LINE_MARKER_RE if msvc else _GCC_LINE_MARKER_RE
+    marker = b'#line' if msvc else b'# '
+    counts = {}
+    current = None
+    for line in stream:
+        if line.startswith(marker):
+            m = marker_re.match(line.decode('utf-8', 'replace'))
+            if m:
+                current = _norm(m.group('file').replace('\\\\', '\\'), cwd)
+                continue
+        if current is not None and line.strip():
+            counts[current] = counts.get(current, 0) + len(line)
+    return counts
+
+
+def scan(unit):
+    """Preprocess a translation unit and return the result of the scan.
+
+    This function runs in the worker processes.
+
+    Returns:
+        dict with the 'includes' (see 'parse_includes'), the 'bytes' (see
+        'count_preprocessed_bytes') and the 'error' of the scan.
+    """
+    try:
+        p = subprocess.Popen(unit.preprocess_args(), cwd=unit.cwd,
+                             stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    except OSError as e:
+        return {'includes': {}, 'bytes': {}, 'error': str(e)}
+
+    # The include hierarchy is printed to stderr, which is drained by a
+    # thread while the preprocessed output is counted.
+    chunks = []
+    reader = threading.Thread(target=lambda: chunks.append(p.stderr.read()))
+    reader.start()
+    counts = count_preprocessed_bytes(p.stdout, unit.cwd, unit.is_msvc)
+    reader.join()
+    err = chunks[0]
+
+    if p.wait() != 0:
+        return {'includes': {}, 'bytes': {},
+                'error': err.decode('utf-8', 'replace').strip()[-4096:]}
+
+    includes = parse_includes(err.decode('utf-8', 'replace'),
+                              unit.source, unit.cwd, unit.is_msvc)
+    return {'includes': includes, 'bytes': counts, 'error': None}
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
+class ScanCache(object):
+    """The results of the scans of the translation units of a build
+    directory.
+
+    Attributes:
+        path (str): Path of the cache file.
+        entries (dict of str to dict): The cached scans by source path, with
+            the 'command' hash, the 'mtimes' of the scanned files and the
+            'result' of the scan.
+    """
+
+    def __init__(self, build_dir):
+        self.path = os.path.join(build_dir, CACHE_FILE)
+        self.entries = {}
+        if os.path.isfile(self.path):
+            try:
+                with open(self.path) as f:
+                    data = json.load(f)
+                if data.get('version') == CACHE_VERSION:
+                    self.entries = data['units']
+            except ValueError:
+                # A corrupt cache only costs a full scan.
+                self.entries = {}
+
+    def get(self, unit):
+        """Return the cached result of the scan of a translation unit, or
+        None if it is out of date.
+        """
+        entry = self.entries.get(unit.source)
+        if not entry or entry['command'] != unit.command_hash:
+            return None
+        for path, mtime in entry['mtimes'].items():
+            if _mtime(path) != mtime:
+                return None
+        return entry['result']
+
+    def put(self, unit, result):
+        files = set(result['includes']) | set([unit.source])
+        self.entries[unit.source] = {
+            'command': unit.command_hash,
+            'mtimes': dict((f, _mtime(f)) for f in files),
+            'result': result}
+
+    def save(self):
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'version': CACHE_VERSION, 'units': self.entries}, f)
+        sysutil.replace_file(tmp_path, self.path)
+
+
+def scan_all(units, cache=None, jobs=None):
+    """Scan the translation units that are not up to date in the cache, in
+    parallel.
+
+    Args:
+        units (list of TranslationUnit): The translation units.
+        cache (ScanCache, optional): The cache of the scans, which is updated.
+        jobs (int, optional): Number of worker processes.
+
+    Returns:
+        dict of source path to result of the scan, and the number of
+        translation units that were scanned.
+    """
+    results = {}
+    todo = []
+    for unit in units:
+        result = cache.get(unit) if cache else None
+        if result is None:
+            todo.append(unit)
+        else:
+            results[unit.source] = result
+
+    if todo:
+        pool = multiprocessing.Pool(jobs or multiprocessing.cpu_count())
+        try:
+            for unit, result in zip(todo, pool.imap(scan, todo)):
+                results[unit.source] = result
+                if cache and not result['error']:
+                    cache.put(unit, result)
+        finally:
+            pool.close()
+            pool.join()
+    return results, len(todo)
+
+# -----------------------------------------------------------------------------
+# Copyright 2026 Bloomberg Finance L.P.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ----------------------------- END-OF-FILE -----------------------------------
@@ -0,0 +1,159 @@
+"""Resolve the option rules of a build matrix.
+"""
+
+from __future__ import print_function
+
+import argparse
+import json
+import os
+import sys
+import time
+
+from bdebuild.common import blderror
+from bdebuild.meta import optionsevaluator
+from bdebuild.meta import optionsparser
+from bdebuild.meta import optionsutil
+from bdebuild.meta import optiontypes
+
+
+def main():
+    """Evaluate the option rules for every UPLID and UFID combination of a
+    build matrix and print the groups of configurations resolving to
+    identical options as JSON, with the requested traces and profile.  Exit
+    with a return code 1 if the option rules cannot be loaded or evaluated,
+    or if a UPLID or a UFID is invalid.
+    """
+    args = get_cmdline_options().parse_args()
+
+    start = time.time()
+    try:
+        if args.opts_files:
+            option_rules = list(
+                optionsparser.iter_option_rules_files(args.opts_files))
+        else:
+            # Keep the output clean of the messages listing the files used.
+            stdout = sys.stdout
+            sys.stdout = sys.stderr
+            try:
+                option_rules = optionsutil.get_default_option_rules()
+            finally:
+                sys.stdout = stdout
+
+        uplids = [optiontypes.Uplid.from_str(u) for u in args.uplids]
+        ufids = [optiontypes.Ufid.from_str(u) for u in args.ufids]
+        for ufid in ufids:
+            if not optiontypes.Ufid.is_valid(ufid.flags):
+                raise blderror.InvalidUfidError(
+                    'The UFID, "%s", is invalid.  Each part of a UFID must '
+                    'be in the following list of valid flags: %s.' %
+                    (ufid, ", ".join(sorted(
+                        optiontypes.Ufid.VALID_FLAGS.keys()))))
+
+        profile = None
+        if args.profile is not None:
+            profile = optionsevaluator.RuleProfile(option_rules)
+        groups = optionsevaluator.evaluate_matrix(option_rules, uplids, ufids,
+                                                  args.keys, args.jobs,
+                                                  profile)
+    except (IOError, blderror.BldError) as e:
+        print('Error: %s' % e, file=sys.stderr)
+        sys.exit(1)
+
+    result = {'rules': len(option_rules),
+              'uplids': [str(u) for u in uplids],
+              'ufids': [str(u) for u in ufids],
+              'groups': groups}
+
+    if args.trace:
+        evaluator = optionsevaluator.OptionsEvaluator(option_rules)
+        result['traces'] = []
+        for uplid in uplids:
+            for ufid in ufids:
+                trace = evaluator.trace(uplid, ufid)
+                if args.keys:
+                    trace = dict((k, trace[k]) for k in args.keys
+                                 if k in trace)
+                result['traces'].append({'uplid': str(uplid),
+                                         'ufid': str(ufid),
+                                         'trace': trace})
+
+    if profile is not None:
+        result['profile'] = {'tests': sum(profile.tests),
+                             'matches': sum(profile.matches),
+                             'hot_rules': profile.hot_rules(args.profile)}
+
+    output = json.dumps(result, indent=1, sort_keys=True,
+                        separators=(',', ': '))
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+    print('%d configurations resolved to %d distinct sets of options in '
+          '%.2fs' % (len(uplids) * len(ufids), len(groups),
+                     time.time() - start), file=sys.stderr)
+
+
+def get_cmdline_options():
+    """Get the command line options.
+
+    Returns:
+        ArgumentParser
+    """
+    parser = argparse.ArgumentParser(
+        prog=os.path.basename(sys.argv[0]),
+        description='Evaluate option rules for every combination of the '
+                    'specified UPLIDs and UFIDs in parallel, and print the '
+                    'configurations grouped by the options they resolve to, '
+                    'as JSON.')
+    parser.add_argument('opts_files', nargs='*',
+                        help='Options files to evaluate, in order (default: '
+                             'default.opts, and '
+                             '$BDE_ROOT/etc/default_internal.opts if it '
+                             'exists).')
+    parser.add_argument('--uplids', type=lambda x: x.split(','),
+                        required=True,
+                        help='Comma-separated list of the UPLIDs of the '
+                             'build matrix, e.g. '
+                             '"unix-linux-x86_64-3.10.0-gcc-9.2.0,'
+                             'unix-darwin-arm64-22.3.0-clang-14.0.3".')
+    parser.add_argument('--ufids', type=lambda x: x.split(','),
+                        required=True,
+                        help='Comma-separated list of the UFIDs of the build '
+                             'matrix, e.g. "dbg_64,opt_64_safe".')
+    parser.add_argument('-k', '--keys', type=lambda x: x.split(','),
+                        help='Comma-separated list of the variables to '
+                             'evaluate, e.g. "BDEBUILD_CXXFLAGS". All '
+                             'variables are evaluated by default.')
+    parser.add_argument('-j', '--jobs', type=int, default=0,
+                        help='Number of worker processes (default: number of '
+                             'CPUs).')
+    parser.add_argument('--trace', action='store_true',
+                        help='Also list for each configuration the rules '
+                             'contributing to each variable, with their '
+                             'location and command.')
+    parser.add_argument('--profile', type=int, metavar='N',
+                        help='Also list the N rules tested the most without '
+                             'matching during the evaluation, which is done '
+                             'in a single process.')
+    parser.add_argument('-o', '--output',
+                        help='Path to the output file (default: standard '
+                             'output).')
+    return parser
+
+# -----------------------------------------------------------------------------
+# Copyright 2026 Bloomberg Finance L.P.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ----------------------------- END-OF-FILE -----------------------------------
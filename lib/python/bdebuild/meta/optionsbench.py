@@ -0,0 +1,227 @@
+"""Benchmark the evaluation of option rules for a build matrix.
+
+The option rules are evaluated for every UPLID and UFID combination of a
+build matrix, once by testing each rule ('optionsevaluator.
+evaluate_option_rules') and once with an 'optionsevaluator.OptionsEvaluator',
+and the results of both are compared.  The time taken to match the UPLID of
+every rule against each UPLID of the matrix, which is dominated by the
+comparison of the versions, is reported too.
+
+The option rules are read from the specified options files, or are generated
+to mimic a typical "default.opts": a few hundred variables set on platform,
+compiler and flag specific lines.
+"""
+
+from __future__ import print_function
+
+import argparse
+import itertools
+import os
+import random
+import sys
+import time
+
+from bdebuild.common import blderror
+from bdebuild.meta import optionsevaluator
+from bdebuild.meta import optionsparser
+from bdebuild.meta import optionsutil
+from bdebuild.meta import optiontypes
+
+DEFAULT_UPLIDS = [
+    'unix-linux-x86_64-3.10.0-gcc-7.3.0',
+    'unix-linux-x86_64-3.10.0-gcc-9.2.0',
+    'unix-linux-x86_64-4.18.0-gcc-11.2.0',
+    'unix-linux-x86_64-4.18.0-clang-10.0.0',
+    'unix-linux-x86_64-5.15.0-clang-15.0.7',
+    'unix-linux-powerpc-4.18.0-gcc-10.2.0',
+    'unix-darwin-x86_64-19.6.0-clang-12.0.0',
+    'unix-darwin-arm64-22.3.0-clang-14.0.3',
+    'unix-aix-powerpc-7.2-xlc-16.1.0',
+    'unix-sunos-sparc-5.11-cc-5.15',
+    'windows-windows_nt-x86_64-10.0-cl-19.29',
+    'windows-windows_nt-x86_64-10.0-cl-19.38',
+]
+
+DEFAULT_UFIDS = [
+    '_'.join(flags) for flags in itertools.product(
+        ['dbg', 'opt', 'opt_dbg'], ['64'], ['exc'], ['mt'],
+        ['', 'safe'], ['', 'shr'], ['cpp03', 'cpp17', 'cpp20'])
+]
+
+
+def generate_option_rules(count, seed=0):
+    """Generate option rules resembling those of a "default.opts".
+
+    Args:
+        count (int): The number of rules.
+        seed (int, optional): The seed of the generator.
+
+    Returns:
+        list of OptionRule
+    """
+    rand = random.Random(seed)
+    platforms = [('unix', 'linux', ['x86_64', 'powerpc'],
+                  ['3.10.0', '4.18.0'], {'gcc': ['4.8', '7.3', '9', '11'],
+                                         'clang': ['3.6', '10', '15']}),
+                 ('unix', 'darwin', ['x86_64', 'arm64'], ['19.6.0'],
+                  {'clang': ['10', '12', '14']}),
+                 ('unix', 'aix', ['powerpc'], ['7.1'], {'xlc': ['12', '16']}),
+                 ('unix', 'sunos', ['sparc'], ['5.10'], {'cc': ['5.12']}),
+                 ('windows', 'windows_nt', ['x86', 'x86_64'], ['6.1'],
+                  {'cl': ['18', '19.20', '19.30']})]
+    keys = ['BDEBUILD_CXXFLAGS', 'BDEBUILD_CFLAGS', 'BDEBUILD_LINKFLAGS',
+            'BDEBUILD_CXX_STANDARD', 'BDE_COMPILER_FLAG', 'CXX', 'CC',
+            'CXXFLAGS', 'CFLAGS', 'LINKFLAGS', 'LIBS', 'COMPONENT_DEFS',
+            'EXC_CXXFLAGS', 'NOEXC_CXXFLAGS', 'SHARED_CXXFLAGS',
+            'DEBUG_CXXFLAGS', 'OPT_CXXFLAGS', 'ABI_BITS_CXXFLAGS',
+            'SANITIZER_FLAGS', 'TEST_RUNNER_ARGS']
+    keys += ['PKG_%03d_DEFS' % i for i in range(200)]
+    flags = ['dbg', 'opt', 'exc', 'mt', '64', 'safe', 'safe2', 'shr', 'pic',
+             'ndebug', 'asan', 'tsan', 'ubsan', 'cpp03', 'cpp11', 'cpp14',
+             'cpp17', 'cpp20']
+    commands = ([optiontypes.OptionCommand.ADD] * 12 +
+                [optiontypes.OptionCommand.OVERRIDE] * 3 +
+                [optiontypes.OptionCommand.INSERT,
+                 optiontypes.OptionCommand.APPEND,
+                 optiontypes.OptionCommand.PREPEND])
+
+    rules = []
+    for i in range(count):
+        os_type, os_name, cpu_types, os_vers, compilers = \
+            rand.choice(platforms)
+        comp_type = rand.choice(sorted(compilers))
+        parts = {}
+        level = rand.random()
+        if level > 0.1:
+            parts['os_type'] = os_type
+        if level > 0.3:
+            parts['os_name'] = os_name
+        if level > 0.5:
+            parts['comp_type'] = comp_type
+        if level > 0.7:
+            parts['comp_ver'] = rand.choice(compilers[comp_type])
+        if rand.random() > 0.9:
+            parts['cpu_type'] = rand.choice(cpu_types)
+        if rand.random() > 0.95:
+            parts['os_ver'] = rand.choice(os_vers)
+        uplid = optiontypes.Uplid(**parts)
+
+        ufid = optiontypes.Ufid(rand.sample(flags,
+                                            rand.choice([0, 0, 0, 1, 1, 2])))
+        key = rand.choice(keys)
+        value = '-D%s_%d' % (key, i)
+        if key.startswith('PKG_') and rand.random() > 0.8:
+            value += ' $(%s)' % rand.choice(keys[:12])
+        rules.append(optiontypes.OptionRule(rand.choice(commands), uplid,
+                                            ufid, key, value))
+    return rules
+
+
+def _time(func):
+    start = time.time()
+    result = func()
+    return result, time.time() - start
+
+
+def main():
+    """Run the benchmark.  Exit with a return code 1 if the evaluators do not
+    produce the same results.
+    """
+    args = get_cmdline_options().parse_args()
+
+    try:
+        if args.opts_files:
+            option_rules = list(
+                optionsparser.iter_option_rules_files(args.opts_files))
+        else:
+            option_rules = generate_option_rules(args.rules)
+        uplids = [optiontypes.Uplid.from_str(u) for u in args.uplids]
+    except (IOError, blderror.BldError) as e:
+        print('Error: %s' % e, file=sys.stderr)
+        sys.exit(1)
+    ufids = [optiontypes.Ufid.from_str(u) for u in args.ufids]
+    configs = [(uplid, ufid) for uplid in uplids for ufid in ufids]
+
+    print('%d rules, %d configurations (%d UPLIDs x %d UFIDs)' % (
+        len(option_rules), len(configs), len(uplids), len(ufids)))
+
+    _, match_time = _time(lambda: [
+        optionsutil.match_uplid(uplid, rule.uplid)
+        for uplid in uplids for rule in option_rules])
+    print('  %-28s %9.1f ms  (%.2f us per rule test)' % (
+        'UPLID matching', match_time * 1000,
+        match_time * 1e6 / max(len(uplids) * len(option_rules), 1)))
+
+    linear, linear_time = _time(lambda: [
+        optionsevaluator.evaluate_option_rules(option_rules, uplid, ufid)
+        for uplid, ufid in configs])
+
+    evaluator, index_time = _time(
+        lambda: optionsevaluator.OptionsEvaluator(option_rules))
+    indexed, indexed_time = _time(lambda: [
+        evaluator.evaluate(uplid, ufid) for uplid, ufid in configs])
+    _, memoized_time = _time(lambda: [
+        evaluator.evaluate(uplid, ufid) for uplid, ufid in configs])
+
+    print('  %-28s %9.1f ms' % ('linear evaluation', linear_time * 1000))
+    print('  %-28s %9.1f ms' % ('indexing', index_time * 1000))
+    print('  %-28s %9.1f ms  (%.1fx)' % (
+        'indexed evaluation', indexed_time * 1000,
+        linear_time / max(index_time + indexed_time, 1e-9)))
+    print('  %-28s %9.1f ms' % ('memoized evaluation',
+                                memoized_time * 1000))
+
+    mismatches = [str(c) for c, l, i in zip(configs, linear, indexed)
+                  if l != i]
+    if mismatches:
+        print('Error: The evaluators disagree on %d configurations, e.g. '
+              '%s' % (len(mismatches), mismatches[0]), file=sys.stderr)
+        sys.exit(1)
+
+
+def get_cmdline_options():
+    """Get the command line options.
+
+    Returns:
+        ArgumentParser
+    """
+    parser = argparse.ArgumentParser(
+        prog=os.path.basename(sys.argv[0]),
+        description='Compare the time taken to evaluate option rules for '
+                    'every UPLID and UFID combination of a build matrix by '
+                    'testing each rule, and with the indexed evaluator.')
+    parser.add_argument('opts_files', nargs='*',
+                        help='Options files to evaluate (default: generated '
+                             'option rules).')
+    parser.add_argument('--rules', type=int, default=2000,
+                        help='Number of generated option rules '
+                             '(default: 2000).')
+    parser.add_argument('--uplids', type=lambda x: x.split(','),
+                        default=DEFAULT_UPLIDS,
+                        help='Comma-separated list of the UPLIDs of the '
+                             'build matrix.')
+    parser.add_argument('--ufids', type=lambda x: x.split(','),
+                        default=DEFAULT_UFIDS,
+                        help='Comma-separated list of the UFIDs of the build '
+                             'matrix.')
+    return parser
+
+
+if __name__ == '__main__':
+    main()
+
+# -----------------------------------------------------------------------------
+# Copyright 2026 Bloomberg Finance L.P.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ----------------------------- END-OF-FILE -----------------------------------
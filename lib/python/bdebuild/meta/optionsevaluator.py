@@ -0,0 +1,474 @@
+"""Evaluate option rules for build configurations.
+
+The option rules of an options file are evaluated for a configuration, which
+is a UPLID and a UFID, by applying the rules matching the configuration from
+top to bottom, and then expanding the references to other variables in the
+resulting values (see "Options File Format" in the documentation of BDE-style
+repositories).
+
+'evaluate_option_rules' is the reference implementation, which tests every
+rule against the configuration with 'optionsutil.match_uplid' and
+'optionsutil.match_ufid'.  'OptionsEvaluator' produces the same results, but
+indexes the rules once so that the rules matching a configuration are found
+with a few set operations:
+
+- The rules are numbered in order, and sets of rules are bit sets of their
+  numbers stored in python integers.
+- For each of the string parts of the UPLID (OS type, OS name, CPU type and
+  compiler type), the rules are indexed by their lowercase value, and the
+  rules with a wildcard are kept in a separate set.  The rules matching a
+  configuration are the intersection of the matching sets of each part.
+- For each UFID flag bit, the set of rules requiring the flag is indexed.
+  The rules requiring a flag that is not part of the configuration are
+  removed.
+- Only the remaining rules having a version constraint are tested one by one,
+  and the results of the version comparisons are memoized.
+
+The results of the evaluation of a configuration are memoized too, so
+evaluating the same configuration again is cheap.
+
+Both evaluators can record in a 'RuleProfile' how many times each rule is
+tested and matched.  'OptionsEvaluator.trace' lists the rules contributing to
+each variable of a configuration.
+"""
+
+import collections
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+
+from bdebuild.common import blderror
+from bdebuild.meta import optionsutil
+from bdebuild.meta import optiontypes
+
+_VAR_RE = re.compile(r'\$\((?P<name>[^)]+)\)')
+
+_STR_PARTS = ('os_type', 'os_name', 'cpu_type', 'comp_type')
+_VER_PARTS = ('os_version', 'comp_version')
+
+
+def apply_option_command(value, command, rule_value):
+    """Combine the accumulated value of a variable with the value of a rule.
+
+    Args:
+        value (str): The accumulated value, or None if no rule contributed to
+            the variable yet.
+        command (OptionCommand): The command of the rule.
+        rule_value (str): The value of the rule.
+
+    Returns:
+        The new value of the variable.
+    """
+    if value is None or command == optiontypes.OptionCommand.OVERRIDE:
+        return rule_value
+    if command == optiontypes.OptionCommand.INSERT:
+        return rule_value + ' ' + value
+    if command == optiontypes.OptionCommand.APPEND:
+        return value + rule_value
+    if command == optiontypes.OptionCommand.PREPEND:
+        return rule_value + value
+    return value + ' ' + rule_value
+
+
+def expand_options(options, environ=None):
+    """Expand recursively the references to variables, e.g. "$(FOO)", in the
+    values of a set of options.
+
+    A referenced variable that is not an option takes the value of the
+    environment variable having the same name, or an empty value.
+
+    Args:
+        options (dict of str to str): The unexpanded options.
+        environ (dict, optional): The environment (default: os.environ).
+
+    Returns:
+        dict of str to str
+
+    Raises:
+        CycleError: A variable refers to itself.
+    """
+    if environ is None:
+        environ = os.environ
+
+    expanded = {}
+    expanding = set()
+
+    def expand(key):
+        if key in expanded:
+            return expanded[key]
+        if key not in options:
+            return environ.get(key, '')
+        if key in expanding:
+            raise blderror.CycleError(
+                'The option variable "%s" refers to itself.' % key)
+
+        value = options[key]
+        if '$(' in value:
+            expanding.add(key)
+            value = _VAR_RE.sub(lambda m: expand(m.group('name')), value)
+            expanding.discard(key)
+        expanded[key] = value
+        return value
+
+    for key in options:
+        expand(key)
+    return expanded
+
+
+class RuleProfile(object):
+    """The number of times each option rule was tested against a
+    configuration, and matched it.
+
+    The linear evaluation tests every rule.  The indexed evaluation counts
+    the rules it selects as tested and matched, and the rules it tests one by
+    one (the rules having a version constraint) as tested.  The rules tested
+    the most without matching are the candidates to reorder or index.
+
+    Attributes:
+        option_rules (list of OptionRule): The option rules, in order.
+        tests (list of int): Number of tests of each rule.
+        matches (list of int): Number of matches of each rule.
+    """
+
+    def __init__(self, option_rules):
+        self.option_rules = list(option_rules)
+        self.tests = [0] * len(self.option_rules)
+        self.matches = [0] * len(self.option_rules)
+
+    def record(self, index, matched):
+        """Record a test of the rule having the specified number."""
+        self.tests[index] += 1
+        if matched:
+            self.matches[index] += 1
+
+    def record_bits(self, tested, matched):
+        """Record the tests of the rules in a bit set of rule numbers, of
+        which the rules in a second bit set matched.
+        """
+        for i in _bit_indices(tested):
+            self.tests[i] += 1
+        for i in _bit_indices(matched):
+            self.matches[i] += 1
+
+    def hot_rules(self, top=None):
+        """Return the rules by decreasing number of tests that did not match.
+
+        Returns:
+            list of dict with the 'location', the 'rule', the number of
+            'tests' and the number of 'matches' of each rule that was tested.
+        """
+        order = sorted((i for i, t in enumerate(self.tests) if t),
+                       key=lambda i: (self.matches[i] - self.tests[i], i))
+        return [{'location': self.option_rules[i].location(),
+                 'rule': repr(self.option_rules[i]),
+                 'tests': self.tests[i],
+                 'matches': self.matches[i]} for i in order[:top]]
+
+
+def evaluate_option_rules(option_rules, uplid, ufid, profile=None):
+    """Evaluate option rules for a configuration by testing each rule.
+
+    Args:
+        option_rules (list of OptionRule): The option rules.
+        uplid (Uplid): The platform of the configuration.
+        ufid (Ufid): The build flags of the configuration.
+        profile (RuleProfile, optional): Record the tests of the rules.
+
+    Returns:
+        dict of str to str: The expanded value of each variable.
+    """
+    options = {}
+    for i, rule in enumerate(option_rules):
+        matched = (optionsutil.match_uplid(uplid, rule.uplid) and
+                   optionsutil.match_ufid(ufid, rule.ufid))
+        if profile is not None:
+            profile.record(i, matched)
+        if matched:
+            options[rule.key] = apply_option_command(options.get(rule.key),
+                                                     rule.command, rule.value)
+    return expand_options(options)
+
+
+def _bit_indices(bits):
+    digits = bin(bits)[:1:-1]
+    indices = []
+    i = digits.find('1')
+    while i != -1:
+        indices.append(i)
+        i = digits.find('1', i + 1)
+    return indices
+
+
+class OptionsEvaluator(object):
+    """Evaluate indexed option rules for configurations.
+
+    Attributes:
+        option_rules (list of OptionRule): The option rules, in order.
+        profile (RuleProfile): Record the tests of the rules, or None.
+    """
+
+    def __init__(self, option_rules, profile=None):
+        """Index a list of option rules.
+
+        Args:
+            option_rules (list of OptionRule): The option rules, in order.
+            profile (RuleProfile, optional): Record the tests of the rules.
+        """
+        self.option_rules = list(option_rules)
+        self.profile = profile
+        self._all = (1 << len(self.option_rules)) - 1
+
+        self._by_key = {}
+        self._by_part = dict((p, {}) for p in _STR_PARTS)
+        self._wildcard = dict((p, 0) for p in _STR_PARTS)
+        self._by_flag = {}
+        self._versioned = 0
+        for i, rule in enumerate(self.option_rules):
+            bit = 1 << i
+            self._by_key[rule.key] = self._by_key.get(rule.key, 0) | bit
+            for part in _STR_PARTS:
+                value = getattr(rule.uplid, part).lower()
+                if value == '*':
+                    self._wildcard[part] |= bit
+                else:
+                    index = self._by_part[part]
+                    index[value] = index.get(value, 0) | bit
+            for flag in rule.ufid.flags:
+                flag_bit = optiontypes.Ufid.flag_bit(flag)
+                self._by_flag[flag_bit] = self._by_flag.get(flag_bit, 0) | bit
+            if any(getattr(rule.uplid, p) is not None for p in _VER_PARTS):
+                self._versioned |= bit
+
+        self._version_matches = {}
+        self._matches = {}
+        self._results = {}
+
+    @property
+    def keys(self):
+        """The names of the variables set by the rules."""
+        return list(self._by_key)
+
+    def _match_version(self, uplid_ver, mask_ver):
+        if mask_ver is None or uplid_ver is None:
+            return True
+        key = (uplid_ver, mask_ver)
+        match = self._version_matches.get(key)
+        if match is None:
+            match = uplid_ver.in_range(mask_ver)
+            self._version_matches[key] = match
+        return match
+
+    def match(self, uplid, ufid):
+        """Return the rules matching a configuration.
+
+        Args:
+            uplid (Uplid): The platform of the configuration.
+            ufid (Ufid): The build flags of the configuration.
+
+        Returns:
+            The bit set of the numbers of the matching rules.
+        """
+        config_key = (uplid, ufid)
+        bits = self._matches.get(config_key)
+        if bits is not None:
+            return bits
+
+        bits = self._all
+        for part in _STR_PARTS:
+            value = getattr(uplid, part).lower()
+            if value != '*':
+                bits &= (self._wildcard[part] |
+                         self._by_part[part].get(value, 0))
+
+        for flag_bit, flag_bits in self._by_flag.items():
+            if not ufid.bits & flag_bit:
+                bits &= ~flag_bits
+
+        tested = bits
+        for i in _bit_indices(bits & self._versioned):
+            mask = self.option_rules[i].uplid
+            if not all(self._match_version(getattr(uplid, p), getattr(mask, p))
+                       for p in _VER_PARTS):
+                bits &= ~(1 << i)
+
+        if self.profile is not None:
+            self.profile.record_bits(tested, bits)
+        self._matches[config_key] = bits
+        return bits
+
+    def matching_rules(self, uplid, ufid, key=None):
+        """Return the rules matching a configuration, in order.
+
+        Args:
+            uplid (Uplid): The platform of the configuration.
+            ufid (Ufid): The build flags of the configuration.
+            key (str, optional): Only return the rules of this variable.
+
+        Returns:
+            list of OptionRule
+        """
+        bits = self.match(uplid, ufid)
+        if key is not None:
+            bits &= self._by_key.get(key, 0)
+        return [self.option_rules[i] for i in _bit_indices(bits)]
+
+    def evaluate(self, uplid, ufid):
+        """Evaluate the option rules for a configuration.
+
+        Args:
+            uplid (Uplid): The platform of the configuration.
+            ufid (Ufid): The build flags of the configuration.
+
+        Returns:
+            dict of str to str: The expanded value of each variable.
+
+        Raises:
+            CycleError: A variable refers to itself.
+        """
+        config_key = (uplid, ufid)
+        result = self._results.get(config_key)
+        if result is None:
+            options = {}
+            for rule in self.matching_rules(uplid, ufid):
+                options[rule.key] = apply_option_command(
+                    options.get(rule.key), rule.command, rule.value)
+            result = expand_options(options)
+            self._results[config_key] = result
+        return dict(result)
+
+    def trace(self, uplid, ufid):
+        """Return the rules contributing to each variable for a
+        configuration.
+
+        Args:
+            uplid (Uplid): The platform of the configuration.
+            ufid (Ufid): The build flags of the configuration.
+
+        Returns:
+            OrderedDict of variable name to the list of the rules applied, in
+            order, as dicts with the 'location' of the rule ("file:line"),
+            the 'command' applied, the 'value' of the rule and the unexpanded
+            'result'.
+        """
+        trace = collections.OrderedDict()
+        values = {}
+        for rule in self.matching_rules(uplid, ufid):
+            values[rule.key] = apply_option_command(
+                values.get(rule.key), rule.command, rule.value)
+            trace.setdefault(rule.key, []).append({
+                'location': rule.location(),
+                'command': optiontypes.OptionCommand.to_str(rule.command),
+                'value': rule.value,
+                'result': values[rule.key]})
+        return trace
+
+    def clear_cache(self):
+        """Forget the memoized results, e.g. after the environment used to
+        expand the variables changed.
+        """
+        self._version_matches.clear()
+        self._matches.clear()
+        self._results.clear()
+
+
+# The state of the worker processes of 'evaluate_matrix'.
+_worker_evaluator = None
+_worker_keys = None
+_worker_digests = set()
+
+
+def _init_worker(option_rules, keys, profile=None):
+    global _worker_evaluator, _worker_keys, _worker_digests
+    _worker_evaluator = OptionsEvaluator(option_rules, profile)
+    _worker_keys = keys
+    _worker_digests = set()
+
+
+def _evaluate_config(config):
+    """Evaluate a configuration in a worker process.
+
+    Returns:
+        The digest of the options, and the options if the worker did not
+        return them yet.
+    """
+    uplid, ufid = config
+    options = _worker_evaluator.evaluate(uplid, ufid)
+    if _worker_keys is not None:
+        options = dict((k, options[k]) for k in _worker_keys if k in options)
+    digest = hashlib.sha1(json.dumps(options, sort_keys=True).encode(
+        'utf-8')).hexdigest()
+    if digest in _worker_digests:
+        return digest, None
+    _worker_digests.add(digest)
+    return digest, options
+
+
+def evaluate_matrix(option_rules, uplids, ufids, keys=None, jobs=None,
+                    profile=None):
+    """Evaluate option rules for every combination of a set of UPLIDs and
+    UFIDs with a pool of worker processes, and group the configurations
+    resolving to identical options.
+
+    Args:
+        option_rules (list of OptionRule): The option rules.
+        uplids (list of Uplid): The platforms of the matrix.
+        ufids (list of Ufid): The build flags of the matrix.
+        keys (list of str, optional): Only evaluate these variables.
+        jobs (int, optional): Number of worker processes (default: number of
+            CPUs).  The configurations are evaluated in this process if 1.
+        profile (RuleProfile, optional): Record the tests of the rules.  The
+            configurations are then evaluated in this process.
+
+    Returns:
+        list of dict with the 'digest' (SHA-1 of the options serialized to
+        JSON), the 'options' (dict of str to str) and the 'configurations'
+        (list of (str, str) UPLID and UFID pairs) of each group of
+        configurations, in the order of their first configuration.
+
+    Raises:
+        CycleError: A variable refers to itself.
+    """
+    configs = [(uplid, ufid) for uplid in uplids for ufid in ufids]
+    jobs = jobs or multiprocessing.cpu_count()
+
+    if jobs == 1 or profile is not None:
+        _init_worker(option_rules, keys, profile)
+        results = [_evaluate_config(c) for c in configs]
+    else:
+        pool = multiprocessing.Pool(jobs, _init_worker, (option_rules, keys))
+        try:
+            results = pool.map(_evaluate_config, configs,
+                               max(1, len(configs) // (jobs * 4)))
+        finally:
+            pool.close()
+            pool.join()
+
+    groups = collections.OrderedDict()
+    for (uplid, ufid), (digest, options) in zip(configs, results):
+        group = groups.get(digest)
+        if group is None:
+            group = groups[digest] = {'digest': digest,
+                                      'options': None,
+                                      'configurations': []}
+        if options is not None:
+            group['options'] = options
+        group['configurations'].append((str(uplid), str(ufid)))
+    return list(groups.values())
+
+# -----------------------------------------------------------------------------
+# Copyright 2026 Bloomberg Finance L.P.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ----------------------------- END-OF-FILE -----------------------------------
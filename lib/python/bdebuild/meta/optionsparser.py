@@ -2,20 +2,36 @@
 
 Attibutes:
     is_verbose (bool): Warn about invalid UPLIDs. Default to False.
+    use_cache (bool): Cache the option rules parsed from each options file
+        (see 'OptionRulesCache').  Default to True.
 """
 
+import hashlib
+import io
+import itertools
+import os
 import re
+import tempfile
+import time
 
 from bdebuild.common import blderror
 from bdebuild.common import logutil
+from bdebuild.common import mixins
+from bdebuild.common import sysutil
 from bdebuild.meta import optiontypes
 
 is_verbose = False
+use_cache = True
+
+CACHE_VERSION = 5
 
 
 def parse_option_rules_file(file_path):
     """Parse the option rules file.
 
+    Unless warnings are requested with 'is_verbose', the parsed option rules
+    are cached (see 'OptionRulesCache').
+
     Args:
         file_path (str): Path to the options file.
 
@@ -26,21 +42,199 @@ def parse_option_rules_file(file_path):
         IOError: Error accessing the file.
         InvalidOptionFileError: Invalid option file.
     """
+    global is_verbose
+    if not use_cache or is_verbose:
+        return list(_iter_parsed_option_rules(file_path))
+
+    cache = OptionRulesCache()
+    entry = cache.load(file_path)
+    if entry and entry.is_up_to_date():
+        return entry.option_rules
+
+    read_time = time.time()
+    with open(file_path) as f:
+        content = f.read()
+    if isinstance(content, bytes):
+        # Python 2 reads the native str, which must stay unchanged to give
+        # the same option rules as the uncached parse.
+        digest = hashlib.sha1(content).hexdigest()
+        opts_file = io.BytesIO(content)
+    else:
+        digest = hashlib.sha1(content.encode('utf-8')).hexdigest()
+        opts_file = io.StringIO(content)
+
+    if entry and entry.digest == digest:
+        option_rules = entry.option_rules
+    else:
+        parser = OptionsParser(opts_file, file_path)
+        try:
+            parser.parse()
+        except blderror.InvalidOptionRuleError as e:
+            raise blderror.InvalidOptionFileError(file_path, e)
+        option_rules = parser.option_rules
+
+    cache.save(file_path, read_time, digest, option_rules)
+    return option_rules
+
+
+def iter_option_rules_file(file_path):
+    """Return an iterator over the option rules of an options file.
+
+    The rules are parsed lazily while the file is read, unless they are
+    cached (see 'parse_option_rules_file').
+
+    Args:
+        file_path (str): Path to the options file.
+
+    Raises:
+        IOError: Error accessing the file.
+        InvalidOptionFileError: Invalid option file.
+    """
+    global is_verbose
+    if use_cache and not is_verbose:
+        return iter(parse_option_rules_file(file_path))
+    return _iter_parsed_option_rules(file_path)
+
+
+def iter_option_rules_files(file_paths):
+    """Return an iterator over the option rules of several options files, in
+    order (see 'iter_option_rules_file').
+
+    Args:
+        file_paths (list of str): Paths to the options files.
+    """
+    return itertools.chain.from_iterable(
+        iter_option_rules_file(path) for path in file_paths)
 
+
+def _iter_parsed_option_rules(file_path):
     def log_warn(line, msg):
         logutil.warn("%s %d: %s" % (file_path, line, msg))
 
     with open(file_path) as f:
-        parser = OptionsParser(f)
+        parser = OptionsParser(f, file_path)
         try:
-            global is_verbose
-            if is_verbose:
-                parser.parse(log_warn)
-            else:
-                parser.parse()
+            for rule in parser.iter_rules(log_warn if is_verbose else None):
+                yield rule
         except blderror.InvalidOptionRuleError as e:
             raise blderror.InvalidOptionFileError(file_path, e)
-        return parser.option_rules
+
+
+def get_cache_dir():
+    """Return the path to the directory of the option rules cache.
+
+    This is $XDG_CACHE_HOME/bde-tools/opts, where XDG_CACHE_HOME defaults to
+    ~/.cache.
+    """
+    return os.path.join(sysutil.get_cache_dir(), 'opts')
+
+
+class ParsedOptionsFile(mixins.BasicSerializeMixin):
+    """The option rules parsed from an options file.
+
+    Attributes:
+        version (int): Version of the cache format.
+        path (str): Absolute path to the options file.
+        size (int): Size of the file when it was parsed.
+        mtime (float): Modification time of the file.
+        read_time (float): Time at which the file was read.
+        digest (str): SHA-1 digest of the content of the file.
+        option_rules (list of OptionRule): The parsed option rules.
+    """
+
+    def __init__(self, path, size, mtime, read_time, digest, option_rules):
+        self.version = CACHE_VERSION
+        self.path = path
+        self.size = size
+        self.mtime = mtime
+        self.read_time = read_time
+        self.digest = digest
+        self.option_rules = option_rules
+
+    def is_up_to_date(self):
+        """Return whether the options file is known to be unchanged without
+        reading it, i.e. its size and modification time did not change, and
+        it was not modified within a second of the time at which it was
+        read, which could go unnoticed with a coarse file system timestamp.
+        """
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return False
+        return (st.st_size == self.size and st.st_mtime == self.mtime and
+                st.st_mtime < self.read_time - 1)
+
+
+class OptionRulesCache(object):
+    """A persistent cache of the option rules parsed from options files.
+
+    Each options file has its own pickled entry, keyed on its path, its size,
+    its modification time and the digest of its content.  An entry is used
+    without reading the options file if it is up to date (see
+    'ParsedOptionsFile.is_up_to_date'), and otherwise if the digest of the
+    content of the file did not change.
+
+    Attributes:
+        cache_dir (str): Path to the cache directory.
+    """
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir or get_cache_dir()
+
+    def entry_path(self, file_path):
+        path = os.path.abspath(file_path)
+        if not isinstance(path, bytes):
+            path = path.encode('utf-8')
+        name = hashlib.sha1(path).hexdigest()
+        return os.path.join(self.cache_dir, name + '.pickle')
+
+    def load(self, file_path):
+        """Return the cache entry of an options file, or None.
+
+        Returns:
+            ParsedOptionsFile
+        """
+        try:
+            with open(self.entry_path(file_path), 'rb') as f:
+                entry = ParsedOptionsFile.from_pickle_str(f.read())
+        except Exception:
+            # A missing, corrupt or incompatible entry only costs a parse.
+            return None
+        if (not isinstance(entry, ParsedOptionsFile) or
+                entry.version != CACHE_VERSION or
+                entry.path != os.path.abspath(file_path)):
+            return None
+        return entry
+
+    def save(self, file_path, read_time, digest, option_rules):
+        """Cache the option rules parsed from an options file.  The entry is
+        replaced atomically, and failures to write it are ignored.
+
+        Args:
+            file_path (str): Path to the options file.
+            read_time (float): Time at which the file was read.
+            digest (str): SHA-1 digest of the content that was read.
+            option_rules (list of OptionRule): The parsed option rules.
+        """
+        tmp_path = None
+        try:
+            st = os.stat(file_path)
+            entry = ParsedOptionsFile(os.path.abspath(file_path),
+                                      st.st_size, st.st_mtime, read_time,
+                                      digest, option_rules)
+            if not os.path.isdir(self.cache_dir):
+                os.makedirs(self.cache_dir)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir,
+                                            suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(entry.to_pickle_str())
+            sysutil.replace_file(tmp_path, self.entry_path(file_path))
+        except Exception:
+            try:
+                if tmp_path and os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+            except OSError:
+                pass
 
 
 class OptionsParser(object):
@@ -51,7 +245,8 @@ class OptionsParser(object):
     Attributes:
         option_rules (list of OptionRule): Parsed options rules
         all_lines (list of (str, OptionRule)): List of line and associated
-            option rule, which may be None for a particular line.
+            option rule, which may be None for a particular line.  Only
+            filled if 'keep_lines' is specified on construction.
     """
     _OPT_LINE_RE = re.compile(r'''^\s*(?P<command>!!|--|\+\+|>>|<<)?
                                  \s* (?P<uplid>\S+)
@@ -68,13 +263,19 @@ class OptionsParser(object):
 
     is_verbose = False
 
-    def __init__(self, opts_file):
+    def __init__(self, opts_file, file_path=None, keep_lines=False):
         """Initialize the object with an options file.
 
         Args:
             opts_file (File): The file handle from which to read option rules.
+            file_path (str, optional): The path to the options file, recorded
+                in the option rules.
+            keep_lines (bool, optional): Keep the source lines in
+                'all_lines'.
         """
         self.opts_file = opts_file
+        self.file_path = file_path
+        self.keep_lines = keep_lines
         self.option_rules = []
         self.all_lines = []
 
@@ -84,6 +285,17 @@ class OptionsParser(object):
         Raises:
            InvalidOptionRuleError: The option rule is invalid.
         """
+        self.option_rules.extend(self.iter_rules(log))
+
+    def iter_rules(self, log=None):
+        """Parse the options file specified on construction, yielding each
+        option rule as soon as it is parsed.  The rules are not added to
+        'option_rules'.
+
+        Raises:
+           InvalidOptionRuleError: The option rule is invalid.
+        """
+        keep_lines = self.keep_lines
         continuation = False
         got_line = False
 
@@ -92,14 +304,16 @@ class OptionsParser(object):
             line_num += 1
             line = line.rstrip('\n')
             if not continuation:
-                rule = optiontypes.OptionRule()
                 if self._OPT_COMMENT_OR_EMTPY_RE.match(line):
-                    self.all_lines.append((line.rstrip(), None))
+                    if keep_lines:
+                        self.all_lines.append((line.rstrip(), None))
                     got_line = False
                 else:
                     m = self._OPT_LINE_RE.match(line)
                     if m:
                         got_line = True
+                        rule = optiontypes.OptionRule(
+                            file_path=self.file_path, line_num=line_num)
                         if m.group('command'):
                             rule.command = optiontypes.OptionCommand.from_str(
                                 m.group('command'))
@@ -136,8 +350,9 @@ class OptionsParser(object):
 
             if got_line and not continuation:
                 rule.value = rule.value.strip()
-                self.option_rules.append(rule)
-                self.all_lines.append((line, rule))
+                if keep_lines:
+                    self.all_lines.append((line, rule))
+                yield rule
 
 # -----------------------------------------------------------------------------
 # Copyright 2015 Bloomberg Finance L.P.
@@ -40,7 +40,7 @@ def get_default_option_rules():
     if not found_default_opts:
         raise blderror.MissingFileError('Cannot find default.opts.')
 
-    option_rules = optionsparser.parse_option_rules_file(default_opts_path)
+    opts_paths = [default_opts_path]
 
     if bde_root:
         default_internal_opts_path = os.path.join(bde_root, 'etc',
@@ -48,13 +48,14 @@ def get_default_option_rules():
 
         if os.path.isfile(default_internal_opts_path):
             found_default_internal_opts = True
-            option_rules += optionsparser.parse_option_rules_file(
-                default_internal_opts_path)
+            opts_paths.append(default_internal_opts_path)
         else:
             logutil.warn('The BDE_ROOT environment variable is set to "%s", '
                          'but $BDE_ROOT/etc/default_internal.opts ("%s") does '
                          'not exist.'%(bde_root, default_internal_opts_path))
 
+    option_rules = list(optionsparser.iter_option_rules_files(opts_paths))
+
     logutil.msg("Using default option rules from", default_opts_path)
     if found_default_internal_opts:
         logutil.msg("Using default option rules from",
@@ -236,7 +237,7 @@ def match_ufid(ufid, mask):
          ufid (Ufid): The build configuration being used.
          mask (Ufid): The configuration mask in a build rule.
     """
-    return mask.flags.issubset(ufid.flags)
+    return not mask.bits & ~ufid.bits
 
 
 def match_uplid(uplid, mask):
@@ -262,8 +263,10 @@ def match_uplid(uplid, mask):
     if not _match_uplid_str(uplid.comp_type, mask.comp_type):
         return False
 
-    if not all(_match_uplid_ver(getattr(uplid, part), getattr(mask, part)) for
-               part in ('os_ver', 'comp_ver')):
+    if not _match_uplid_ver(uplid.os_version, mask.os_version):
+        return False
+
+    if not _match_uplid_ver(uplid.comp_version, mask.comp_version):
         return False
 
     return True
@@ -274,10 +277,10 @@ def _match_uplid_str(uplid, mask):
 
 
 def _match_uplid_ver(uplid, mask):
-    if mask == '*' or uplid == '*':
+    if mask is None or uplid is None:
         return True
 
-    return sysutil.match_version_strs(uplid, mask)
+    return uplid.in_range(mask)
 
 # -----------------------------------------------------------------------------
 # Copyright 2015 Bloomberg Finance L.P.
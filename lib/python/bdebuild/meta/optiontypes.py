@@ -7,6 +7,7 @@ BDE-style repository.
 
 from bdebuild.common import blderror
 from bdebuild.common import mixins
+from bdebuild.common import sysutil
 
 
 class OptionCommand(object):
@@ -69,10 +70,12 @@ class OptionRule(mixins.BasicEqualityMixin):
         ufid (Ufid): UFID to be matched.
         key (str): Name of the variable to which the rule applies.
         value (str): The value contributed by the rule.
+        file_path (str): Path to the options file defining the rule, or None.
+        line_num (int): Line number of the rule in the options file, or None.
     """
 
     def __init__(self, command=None, uplid=None, ufid=None, key=None,
-                 value=None):
+                 value=None, file_path=None, line_num=None):
         """Initialize the object with the specified arguments.
 
         Args:
@@ -81,12 +84,26 @@ class OptionRule(mixins.BasicEqualityMixin):
             ufid (Ufid): UFID to be matched
             key (str): Name of the variable to which the rule applies.
             value (str): The value contributed by the rule.
+            file_path (str, optional): Path to the options file defining the
+                rule.
+            line_num (int, optional): Line number of the rule in the options
+                file.
         """
         self.command = command
         self.uplid = uplid
         self.ufid = ufid
         self.key = key
         self.value = value
+        self.file_path = file_path
+        self.line_num = line_num
+
+    def location(self):
+        """Return the location of the rule as "file:line", or None if it is
+        unknown.
+        """
+        if self.file_path is None:
+            return None
+        return '%s:%d' % (self.file_path, self.line_num)
 
     def __repr__(self):
         return '%s %s %s %s %s' % (OptionCommand.to_str(self.command),
@@ -94,14 +111,18 @@ class OptionRule(mixins.BasicEqualityMixin):
                                    self.ufid, self.key, self.value)
 
 
-class Ufid(mixins.BasicEqualityMixin):
+class Ufid(object):
     """This class represents an Unified Flag ID.
 
-    The UFID is used to identify the build configuration used.
+    The UFID is used to identify the build configuration used.  Ufid objects
+    are immutable and interned per set of flags, so they can be compared and
+    hashed cheaply, e.g. to key caches.
 
     Attributes:
-        flags (set of str): Set of string flags.
+        flags (frozenset of str): Set of string flags.
+        bits (int): Bit mask of the flags (see 'flag_bit').
     """
+    __slots__ = ('flags', 'bits', '_repr', '_hash')
 
     # The following variables are copied from bde_build.pl to preserve the
     # display order of flags.
@@ -151,27 +172,65 @@ class Ufid(mixins.BasicEqualityMixin):
         'cpp20':  (BACK + 14, 'Build with support for C++20 features')
     }
 
-    def __init__(self, flags=[]):
-        """Initialize the object with the specified flags.
+    _flag_bits = {}
+    _interned = {}
+    _interned_strs = {}
+
+    def __new__(cls, flags=()):
+        """Return the Ufid having the specified flags.
 
         Args:
             flags (list of str): Flags to add.
         """
+        flags = frozenset(flags)
+        ufid = cls._interned.get(flags)
+        if ufid is not None:
+            return ufid
 
-        self.flags = set()
+        def get_rank(key):
+            if key in cls.VALID_FLAGS:
+                return cls.VALID_FLAGS[key][0]
+            else:
+                return cls.BACK - 100
 
+        bits = 0
         for f in flags:
-            self.flags.add(f)
+            bits |= cls.flag_bit(f)
+
+        ufid = object.__new__(cls)
+        object.__setattr__(ufid, 'flags', flags)
+        object.__setattr__(ufid, 'bits', bits)
+        object.__setattr__(ufid, '_repr', '_'.join(
+            sorted(flags, key=lambda f: (get_rank(f), f))) or '_')
+        object.__setattr__(ufid, '_hash', hash(flags))
+        return cls._interned.setdefault(flags, ufid)
+
+    @classmethod
+    def flag_bit(cls, flag):
+        """Return the bit representing a flag in the bit mask of the flags.
+
+        The valid flags are assigned a bit in the order in which they are
+        displayed, and other flags are assigned one when they are first
+        seen.
+        """
+        bit = cls._flag_bits.get(flag)
+        if bit is None:
+            bit = cls._flag_bits.setdefault(flag, 1 << len(cls._flag_bits))
+        return bit
 
     @classmethod
     def from_str(cls, config_str):
+        ufid = cls._interned_strs.get(config_str)
+        if ufid is not None:
+            return ufid
+
         flags = []
 
         # Properly handle the case when config_str == '_'.
         for f in config_str.split('_'):
             if f:
                 flags.append(f)
-        return cls(flags)
+        return cls._interned_strs.setdefault(config_str, cls(flags))
 
     @classmethod
     def is_valid(cls, flags):
@@ -186,39 +245,79 @@ class Ufid(mixins.BasicEqualityMixin):
 
         return all(f in cls.VALID_FLAGS for f in flags)
 
+    def __setattr__(self, name, value):
+        raise AttributeError('Ufid objects are immutable')
+
+    def __reduce__(self):
+        return (Ufid, (sorted(self.flags),))
+
+    def __eq__(self, other):
+        return self is other or (isinstance(other, Ufid) and
+                                 self.flags == other.flags)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return self._hash
+
     def __repr__(self):
-        if len(self.flags) == 0:
-            return '_'
+        return self._repr
 
-        def get_rank(key):
-            if key in self.VALID_FLAGS:
-                return self.VALID_FLAGS[key][0]
-            else:
-                return self.BACK - 100
 
-        sorted_flags = sorted(self.flags,
-                              key=get_rank)
-        return '_'.join(sorted_flags)
+for _flag in sorted(Ufid.VALID_FLAGS, key=lambda f: Ufid.VALID_FLAGS[f][0]):
+    Ufid.flag_bit(_flag)
+del _flag
 
 
-class Uplid(mixins.BasicEqualityMixin):
+class Uplid(object):
     """This class represents an Universal Platform ID.
 
     Uplids are used to identify the platform and toolchain used for a build.
+    Uplid objects are immutable and interned, so they can be compared and
+    hashed cheaply, e.g. to key caches.
+
+    Attributes:
+        os_type (str): OS type.
+        os_name (str): OS name.
+        cpu_type (str): CPU type.
+        os_ver (str): OS version.
+        comp_type (str): Compiler type.
+        comp_ver (str): Compiler version.
+        os_version (Version): The parsed OS version, or None if it is '*'.
+        comp_version (Version): The parsed compiler version, or None if it is
+            '*'.
     """
+    __slots__ = ('os_type', 'os_name', 'cpu_type', 'os_ver', 'comp_type',
+                 'comp_ver', 'os_version', 'comp_version', '_parts', '_repr',
+                 '_hash')
 
     VALID_OS_TYPES = ('*', 'unix', 'windows')
     VALID_OS_NAMES = ('*', 'linux', 'darwin', 'aix', 'sunos', 'windows_nt')
     VALID_COMP_TYPES = ('*', 'gcc', 'clang', 'xlc', 'cc', 'cl')
 
-    def __init__(self, os_type='*', os_name='*', cpu_type='*', os_ver='*',
-                 comp_type='*', comp_ver='*'):
-        self.os_type = os_type
-        self.os_name = os_name
-        self.cpu_type = cpu_type
-        self.os_ver = os_ver
-        self.comp_type = comp_type
-        self.comp_ver = comp_ver
+    _interned = {}
+    _interned_strs = {}
+
+    def __new__(cls, os_type='*', os_name='*', cpu_type='*', os_ver='*',
+                comp_type='*', comp_ver='*'):
+        parts = (os_type, os_name, cpu_type, os_ver, comp_type, comp_ver)
+        uplid = cls._interned.get(parts)
+        if uplid is not None:
+            return uplid
+
+        uplid = object.__new__(cls)
+        for name, value in zip(cls.__slots__, parts):
+            object.__setattr__(uplid, name, value)
+        object.__setattr__(uplid, 'os_version',
+                           None if os_ver == '*' else sysutil.Version(os_ver))
+        object.__setattr__(uplid, 'comp_version',
+                           None if comp_ver == '*' else
+                           sysutil.Version(comp_ver))
+        object.__setattr__(uplid, '_parts', parts)
+        object.__setattr__(uplid, '_repr', '-'.join(parts))
+        object.__setattr__(uplid, '_hash', hash(parts))
+        return cls._interned.setdefault(parts, uplid)
 
     @classmethod
     def is_valid(cls, uplid):
@@ -249,6 +348,10 @@ class Uplid(mixins.BasicEqualityMixin):
         Raises:
             InvalidUplidError
         """
+        uplid = cls._interned_strs.get(platform_str)
+        if uplid is not None:
+            return uplid
+
         parts = platform_str.split('-')
 
         if len(parts) > 6:
@@ -265,11 +368,26 @@ class Uplid(mixins.BasicEqualityMixin):
          comp_ver) = (p.lower() for p in parts)
 
         uplid = cls(os_type, os_name, cpu_type, os_ver, comp_type, comp_ver)
-        return uplid
+        return cls._interned_strs.setdefault(platform_str, uplid)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('Uplid objects are immutable')
+
+    def __reduce__(self):
+        return (Uplid, self._parts)
+
+    def __eq__(self, other):
+        return self is other or (isinstance(other, Uplid) and
+                                 self._parts == other._parts)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return self._hash
 
     def __repr__(self):
-        return '-'.join([self.os_type, self.os_name, self.cpu_type,
-                         self.os_ver, self.comp_type, self.comp_ver])
+        return self._repr
 
 # -----------------------------------------------------------------------------
 # Copyright 2015 Bloomberg Finance L.P.
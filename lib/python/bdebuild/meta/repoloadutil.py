@@ -0,0 +1,187 @@
+"""Load the metadata of BDE-style repositories.
+
+The repositories are discovered the same way as the CMake build system does:
+package groups are found under the ``groups``, ``enterprise`` and ``wrappers``
+directories, standalone packages under ``adapters`` and ``standalones`` and
+applications under ``applications`` (each optionally prefixed with ``src/``).
+"""
+
+import glob
+import os
+
+from bdebuild.common import blderror
+from bdebuild.meta import repounits
+
+GROUP_DIRS = ('groups', 'enterprise', 'wrappers')
+STANDALONE_DIRS = ('adapters', 'standalones')
+APPLICATION_DIRS = ('applications',)
+
+
+def read_meta_file(path):
+    """Read the tokens of a metadata (.mem or .dep) file.
+
+    Text following a '#' is ignored and tokens are separated by spaces.
+
+    Args:
+        path (str): Path to the metadata file.
+
+    Returns:
+        list of str
+    """
+    tokens = []
+    with open(path) as f:
+        for line in f:
+            tokens.extend(line.split('#', 1)[0].split())
+    return tokens
+
+
+def _read_optional_meta_file(path):
+    return read_meta_file(path) if os.path.isfile(path) else []
+
+
+def load_package(path, type_, group=None):
+    """Load a package from its root directory.
+
+    Args:
+        path (str): Path to the root directory of the package.
+        type_ (PackageType): Type of the package.
+        group (str, optional): Name of the package group of the package.
+
+    Returns:
+        Package
+
+    Raises:
+        MissingFileError: The package has no .mem file.
+    """
+    name = os.path.basename(os.path.normpath(path))
+    base = os.path.join(path, 'package', name)
+    if not os.path.isfile(base + '.mem'):
+        raise blderror.MissingFileError('Cannot find %s.mem' % base)
+
+    package = repounits.Package(name, path, type_, group)
+    package.mem = read_meta_file(base + '.mem')
+    package.dep = set(_read_optional_meta_file(base + '.dep'))
+    package.test_dep = set(_read_optional_meta_file(base + '.t.dep'))
+    return package
+
+
+def load_package_group(path):
+    """Load a package group and its packages from its root directory.
+
+    Args:
+        path (str): Path to the root directory of the package group.
+
+    Returns:
+        PackageGroup, list of Package
+
+    Raises:
+        MissingFileError: The package group or one of its packages has no
+            .mem file.
+    """
+    name = os.path.basename(os.path.normpath(path))
+    base = os.path.join(path, 'group', name)
+    if not os.path.isfile(base + '.mem'):
+        raise blderror.MissingFileError('Cannot find %s.mem' % base)
+
+    group = repounits.PackageGroup(name, path)
+    group.mem = read_meta_file(base + '.mem')
+    group.dep = set(_read_optional_meta_file(base + '.dep'))
+    group.test_dep = set(_read_optional_meta_file(base + '.t.dep'))
+
+    packages = [load_package(os.path.join(path, p),
+                             repounits.PackageType.PACKAGE_GROUPED,
+                             name)
+                for p in group.mem]
+    return group, packages
+
+
+def find_uor_paths(project_root, dir_names):
+    """Return the unit of release directories of a project found in the
+    specified directories (and their 'src/' counterparts).
+    """
+    paths = []
+    for dir_name in dir_names:
+        for parent in (os.path.join(project_root, dir_name),
+                       os.path.join(project_root, 'src', dir_name)):
+            paths.extend(p for p in sorted(glob.glob(os.path.join(parent,
+                                                                  '*')))
+                         if os.path.isdir(p))
+    return paths
+
+
+def is_project_root(path):
+    """Return True if the specified directory contains units of release."""
+    return any(find_uor_paths(path, dirs) for dirs in (GROUP_DIRS,
+                                                       STANDALONE_DIRS,
+                                                       APPLICATION_DIRS))
+
+
+def find_project_roots(source_dir):
+    """Return the project roots of a source directory.
+
+    The source directory can either be a project itself or a workspace whose
+    sub-directories are projects.
+    """
+    if is_project_root(source_dir):
+        return [source_dir]
+    return [p for p in sorted(glob.glob(os.path.join(source_dir, '*')))
+            if os.path.isdir(p) and is_project_root(p)]
+
+
+def load_repo(project_roots):
+    """Load the units of the specified projects.
+
+    Args:
+        project_roots (list of str): Paths to the project roots.
+
+    Returns:
+        RepoContext
+
+    Raises:
+        DuplicateUnitError: A unit is defined more than once.
+        MissingFileError: A unit has no .mem file.
+    """
+    ctx = repounits.RepoContext()
+
+    def add_package(package):
+        if package.name in ctx.packages:
+            raise blderror.DuplicateUnitError(
+                'Duplicate package %s in %s and %s' %
+                (package.name, ctx.packages[package.name].path,
+                 package.path))
+        ctx.packages[package.name] = package
+
+    for root in project_roots:
+        for path in find_uor_paths(root, GROUP_DIRS):
+            group, packages = load_package_group(path)
+            if group.name in ctx.package_groups:
+                raise blderror.DuplicateUnitError(
+                    'Duplicate package group %s in %s and %s' %
+                    (group.name, ctx.package_groups[group.name].path, path))
+            ctx.package_groups[group.name] = group
+            for package in packages:
+                add_package(package)
+
+        for dirs, type_ in (
+                (STANDALONE_DIRS, repounits.PackageType.PACKAGE_STANDALONE),
+                (APPLICATION_DIRS, repounits.PackageType.PACKAGE_APPLICATION)):
+            for path in find_uor_paths(root, dirs):
+                add_package(load_package(path, type_))
+
+    return ctx
+
+# -----------------------------------------------------------------------------
+# Copyright 2026 Bloomberg Finance L.P.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ----------------------------- END-OF-FILE -----------------------------------
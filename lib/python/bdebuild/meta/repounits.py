@@ -0,0 +1,128 @@
+"""Units of a BDE-style repository.
+
+This module defines types that represent the package groups, packages and
+applications of a BDE-style repository, as described by their ``.mem`` and
+``.dep`` metadata files.
+"""
+
+from bdebuild.common import mixins
+
+
+class PackageType(object):
+    """This class enumerates over the types of packages.
+
+    Enumerators:
+        PACKAGE_GROUPED: A package that is a member of a package group.
+        PACKAGE_STANDALONE: A standalone package (an adapter or a standalone).
+        PACKAGE_APPLICATION: An application.
+    """
+    PACKAGE_GROUPED = 0
+    PACKAGE_STANDALONE = 1
+    PACKAGE_APPLICATION = 2
+
+
+class PackageGroup(mixins.BasicEqualityMixin, mixins.BasicReprMixin):
+    """This class represents a package group.
+
+    Attributes:
+        name (str): Name of the package group.
+        path (str): Path to the root directory of the package group.
+        mem (list of str): Names of the member packages.
+        dep (set of str): Names of the units of release the package group
+            depends on.
+        test_dep (set of str): Names of the additional units of release the
+            test drivers of the package group depend on.
+    """
+
+    def __init__(self, name, path):
+        self.name = name
+        self.path = path
+        self.mem = []
+        self.dep = set()
+        self.test_dep = set()
+
+
+class Package(mixins.BasicEqualityMixin, mixins.BasicReprMixin):
+    """This class represents a package.
+
+    Attributes:
+        name (str): Name of the package.
+        path (str): Path to the root directory of the package.
+        type_ (PackageType): Type of the package.
+        mem (list of str): Names of the components.
+        dep (set of str): For a grouped package, names of the packages of the
+            same group it depends on; otherwise, names of the units of release
+            it depends on.
+        test_dep (set of str): Names of the additional units of release the
+            test drivers of the package depend on.
+        group (str): Name of the package group of a grouped package, or None.
+    """
+
+    def __init__(self, name, path, type_, group=None):
+        self.name = name
+        self.path = path
+        self.type_ = type_
+        self.mem = []
+        self.dep = set()
+        self.test_dep = set()
+        self.group = group
+
+    @property
+    def uor_name(self):
+        """Return the name of the unit of release containing the package."""
+        return self.group if self.group else self.name
+
+
+class RepoContext(mixins.BasicReprMixin):
+    """This class represents the units of one or more BDE-style repositories.
+
+    Attributes:
+        package_groups (dict of str to PackageGroup): The package groups.
+        packages (dict of str to Package): All packages, including standalone
+            packages and applications.
+    """
+
+    def __init__(self):
+        self.package_groups = {}
+        self.packages = {}
+
+    def uor_names(self):
+        """Return the names of all units of release."""
+        return (set(self.package_groups) |
+                set(p.name for p in self.packages.values() if not p.group))
+
+    def uor_packages(self, uor_name):
+        """Return the packages of the specified unit of release."""
+        if uor_name in self.package_groups:
+            return [self.packages[p]
+                    for p in self.package_groups[uor_name].mem
+                    if p in self.packages]
+        if uor_name in self.packages:
+            return [self.packages[uor_name]]
+        return []
+
+    def uor_dep(self, uor_name):
+        """Return the names of the units of release the specified unit of
+        release depends on.
+        """
+        if uor_name in self.package_groups:
+            return self.package_groups[uor_name].dep
+        if uor_name in self.packages:
+            return self.packages[uor_name].dep
+        return set()
+
+# -----------------------------------------------------------------------------
+# Copyright 2026 Bloomberg Finance L.P.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ----------------------------- END-OF-FILE -----------------------------------